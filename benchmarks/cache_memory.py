@@ -0,0 +1,86 @@
+"""Measure the memory that cached translations occupy.
+
+Loads a synthetic project into `MemoryCache` and into the layout it used
+to have, which kept the decoded CDS payload of each language as it was,
+and reports the memory retained by each one, as measured by tracemalloc.
+
+Each language is decoded from its own JSON document, like responses of the
+CDS are, so keys are not shared between languages unless the cache does so.
+
+Usage:
+    python benchmarks/cache_memory.py [--strings 60000] [--languages 10]
+"""
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transifex.native.cache import MemoryCache  # noqa: E402
+
+
+class PayloadMemoryCache(object):
+    """The previous layout of MemoryCache, kept here for comparison."""
+
+    def __init__(self):
+        self._translations_by_lang = {}
+
+    def update(self, data):
+        for lang_code, (should_update, translations) in data.items():
+            if should_update:
+                self._translations_by_lang[lang_code] = {
+                    'translations': translations,
+                }
+
+
+def build_payloads(strings, languages):
+    payloads = {}
+    for lang in range(languages):
+        payloads['lang{}'.format(lang)] = json.dumps({'data': {
+            u'Source string number {}'.format(i): {
+                'string': u'Translation {} of string {}'.format(lang, i),
+            }
+            for i in range(strings)
+        }})
+    return payloads
+
+
+def measure(cache_class, payloads):
+    gc.collect()
+    tracemalloc.start()
+    cache = cache_class()
+    for lang_code, payload in payloads.items():
+        cache.update({lang_code: (True, json.loads(payload)['data'])})
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--strings', type=int, default=60000,
+                        help='number of source strings in the project')
+    parser.add_argument('--languages', type=int, default=10,
+                        help='number of languages in the project')
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.strings, args.languages)
+    for cache_class in (PayloadMemoryCache, MemoryCache):
+        cache, current, peak = measure(cache_class, payloads)
+        print('{:<20} retained: {:8.1f} MB, peak: {:8.1f} MB'.format(
+            cache_class.__name__, current / 2.0 ** 20, peak / 2.0 ** 20,
+        ))
+
+    usage = cache.memory_usage()
+    for lang_code, size in sorted(usage.items()):
+        print('  {:<18} {:8.1f} MB'.format(lang_code, size / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Measure the cost of looking up untranslated strings.
+
+Compares the miss path of `MemoryCache` against the nested layout it used
+to have, where every miss walked
+`_translations_by_lang[lang]['translations'][key]['string']` once for the
+source based key and once for the hashed key, and reports the cost of a
+full `TxNative.translate()` call that ends up in the missing policy.
+
+Usage:
+    python benchmarks/cache_miss.py [--strings 60000] [--ratio 0.5]
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transifex.common.utils import generate_hashed_key  # noqa: E402
+from transifex.native.cache import MemoryCache  # noqa: E402
+from transifex.native.core import TxNative  # noqa: E402
+
+
+class NestedMemoryCache(object):
+    """The previous layout of MemoryCache, kept here for comparison."""
+
+    def __init__(self):
+        self._translations_by_lang = {}
+
+    def update(self, data):
+        for lang_code, (should_update, translations) in data.items():
+            if should_update:
+                self._translations_by_lang[lang_code] = {
+                    'translations': translations,
+                }
+
+    def get(self, key, language_code):
+        try:
+            return self._translations_by_lang\
+                .get(language_code, {})\
+                .get('translations', {})\
+                .get(key)\
+                .get('string', None)
+        except (ValueError, AttributeError):
+            return None
+
+    def get_aliased(self, key, alias, language_code):
+        return self.get(key, language_code) or self.get(alias, language_code)
+
+
+def build_data(total, ratio):
+    translated = int(total * ratio)
+    return {
+        'el': (True, {
+            u'String {}'.format(i): {'string': u'Μετάφραση {}'.format(i)}
+            for i in range(translated)
+        }),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--strings', type=int, default=60000,
+                        help='number of source strings in the project')
+    parser.add_argument('--ratio', type=float, default=0.5,
+                        help='the ratio of translated strings')
+    parser.add_argument('--number', type=int, default=200000,
+                        help='number of lookups per measurement')
+    args = parser.parse_args()
+
+    data = build_data(args.strings, args.ratio)
+    missing = u'String {}'.format(args.strings - 1)
+    missing_hash = generate_hashed_key(missing)
+
+    for cache in (NestedMemoryCache(), MemoryCache()):
+        cache.update(data)
+        seconds = timeit.timeit(
+            lambda: cache.get_aliased(missing, missing_hash, 'el'),
+            number=args.number,
+        )
+        print('{:<20} miss: {:8.1f} ns/lookup'.format(
+            cache.__class__.__name__, seconds / args.number * 1e9,
+        ))
+
+    tx = TxNative()
+    tx.init(['el'], 'token')
+    tx._cache.update(data)
+    number = args.number // 10
+    seconds = timeit.timeit(
+        lambda: tx.translate(missing, 'el'), number=number,
+    )
+    print('{:<20} miss: {:8.1f} us/call'.format(
+        'TxNative.translate', seconds / number * 1e6,
+    ))
+
+
+if __name__ == '__main__':
+    main()
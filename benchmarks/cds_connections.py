@@ -0,0 +1,136 @@
+"""Measure the cost of opening a new connection for each CDS request.
+
+Starts a stub CDS on localhost that serves the translations of a number of
+languages and fetches all of them, first with a new connection per request,
+as `CDSHandler` used to do by calling `requests.get()`, and then with the
+pooled session of `CDSHandler`. Reports the number of connections the stub
+CDS accepted and the time each fetch took.
+
+The stub CDS serves plain HTTP, so the savings reported only include TCP
+handshakes; against the real CDS each connection also costs a TLS handshake.
+Use `--latency` to delay each response, simulating the round-trip time to
+the CDS, and `--pool-size 1` to fetch the languages one at a time.
+
+Usage:
+    python benchmarks/cds_connections.py [--languages 50] [--strings 1000]
+        [--latency 0] [--pool-size 10]
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transifex.native.cds import CDSHandler  # noqa: E402
+
+
+class StubCDSServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, languages, strings, latency=0):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubCDSRequestHandler)
+        self.latency = latency
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.languages = json.dumps({'data': [
+            {'code': language_code} for language_code in languages
+        ]}).encode('utf-8')
+        self.content = json.dumps({'data': {
+            'key{}'.format(i): {'string': 'translation {}'.format(i)}
+            for i in range(strings)
+        }}).encode('utf-8')
+
+    def process_request_thread(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        ThreadingMixIn.process_request_thread(self, request, client_address)
+
+
+class StubCDSRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, which would otherwise delay
+    # responses on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        if self.path == '/languages':
+            body = self.server.languages
+        else:
+            body = self.server.content
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', 'etag')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class UnpooledCDSHandler(CDSHandler):
+    """Opens a new connection per request, as `requests.get()` does."""
+
+    def _request(self, method, url, **kwargs):
+        import requests
+        return requests.request(method, url, **kwargs)
+
+
+def measure(server, handler_class, languages, pool_size):
+    server.connections = 0
+    handler = handler_class(
+        languages, 'token',
+        host='http://{}:{}'.format(*server.server_address),
+        pool_size=pool_size,
+    )
+    start = time.time()
+    translations = handler.fetch_translations()
+    elapsed = time.time() - start
+    assert len(translations) == len(languages)
+    assert all(refreshed for refreshed, _ in translations.values())
+    return server.connections, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--languages', type=int, default=50)
+    parser.add_argument('--strings', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0,
+                        help='milliseconds to delay each response by')
+    parser.add_argument('--pool-size', type=int, default=10)
+    args = parser.parse_args()
+
+    languages = ['lang{}'.format(i) for i in range(args.languages)]
+    server = StubCDSServer(languages, args.strings, args.latency / 1000.0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        print('Fetching {} languages of {} strings each'.format(
+            args.languages, args.strings,
+        ))
+        for label, handler_class in (
+            ('connection per request', UnpooledCDSHandler),
+            ('pooled session', CDSHandler),
+        ):
+            connections, elapsed = measure(
+                server, handler_class, languages, args.pool_size,
+            )
+            print('{:<24}{:>5} connections {:>9.1f}ms'.format(
+                label, connections, elapsed * 1000,
+            ))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
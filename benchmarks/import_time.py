@@ -0,0 +1,73 @@
+"""Measure the time it takes to import the SDK.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the best cumulative import time of the module, along with any of
+the heavy dependencies that are deferred until first use but were imported
+anyway.
+
+Usage:
+    python benchmarks/import_time.py [--module transifex.native]
+        [--runs 5] [--budget 150]
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that should only be imported when they are first used
+DEFERRED_MODULES = ('requests', 'pyseeyou', 'parsimonious', 'pytz', 'sqlite3')
+
+
+def measure(module):
+    """Import the given module in a fresh interpreter.
+
+    :param str module: the module to import
+    :return: a tuple of the cumulative import time of the module, in
+        milliseconds, and the names of all modules imported
+    :rtype: tuple
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.STDOUT, cwd=ROOT,
+    ).decode('utf-8')
+    cumulative, imported = None, set()
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total, name = [
+            part.strip() for part in line[len('import time:'):].split('|')
+        ]
+        imported.add(name)
+        if name == module:
+            cumulative = int(total) / 1000.0
+    return cumulative, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--module', default='transifex.native')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=None,
+                        help='fail if the import takes longer (in ms)')
+    args = parser.parse_args()
+
+    results = [measure(args.module) for _ in range(args.runs)]
+    best = min(cumulative for cumulative, _ in results)
+    deferred = sorted(
+        name for name in DEFERRED_MODULES
+        if any(name in imported for _, imported in results)
+    )
+    print('import {}: {:.1f}ms (best of {})'.format(
+        args.module, best, args.runs))
+    print('deferred dependencies imported: {}'.format(
+        ', '.join(deferred) or 'none'))
+    if deferred or (args.budget is not None and best > args.budget):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Measure the peak memory of fetching a large language.
+
+Fetches the translations of a single language with `CDSHandler`, decoding
+the response as a whole and streaming it, stores them in a `MemoryCache`
+and reports the peak memory allocated while doing so, next to the size of
+the cached translations (see `MemoryCache.memory_usage()`).
+
+The response is served by an in-process fake of `requests.Response`, which
+holds the body the way `requests` does: as bytes, decoded to a string
+by `json()`.
+
+Usage:
+    python benchmarks/stream_memory.py [--strings 100000]
+"""
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transifex.native.cache import MemoryCache  # noqa: E402
+from transifex.native.cds import CDSHandler  # noqa: E402
+
+
+class FakeResponse(object):
+    ok = True
+    status_code = 200
+    reason = 'OK'
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.headers = {'ETag': 'etag'}
+
+    def iter_content(self, chunk_size):
+        for chunk in self._chunks:
+            yield chunk
+
+    def json(self):
+        content = b''.join(self._chunks)
+        return json.loads(content.decode('utf-8'))
+
+    def close(self):
+        pass
+
+
+def build_payload(strings):
+    content = json.dumps({'data': {
+        'key_{}'.format(i): {
+            'string': u'Translation number {} of a long sentence'.format(i),
+            'occurrences': ['app/views.py:{}'.format(i)],
+            'tags': ['web'],
+        }
+        for i in range(strings)
+    }}).encode('utf-8')
+    # Chunks of the size requests reads the body in
+    return [content[i:i + 10240] for i in range(0, len(content), 10240)]
+
+
+def measure(chunks, stream):
+    handler = CDSHandler(['el'], 'token', stream=stream)
+    handler.retry_get_request = lambda *args, **kwargs: FakeResponse(chunks)
+    cache = MemoryCache()
+    gc.collect()
+    tracemalloc.start()
+    cache.update(handler.fetch_translations('el'))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cache.memory_usage()['el'], peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--strings', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Import the modules of both modes ahead of measuring them
+    for stream in (False, True):
+        measure(build_payload(10), stream)
+
+    chunks = build_payload(args.strings)
+    print('Payload of {} strings: {:.1f}MB'.format(
+        args.strings, sum(len(chunk) for chunk in chunks) / 1e6,
+    ))
+    for label, stream in (('decoded as a whole', False), ('streamed', True)):
+        cached, peak = measure(chunks, stream)
+        print('{:<20} peak {:>7.1f}MB, cached {:>7.1f}MB ({:.1f}x)'.format(
+            label, peak / 1e6, cached / 1e6, float(peak) / cached,
+        ))
+
+
+if __name__ == '__main__':
+    main()
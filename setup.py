@@ -22,4 +22,5 @@ setup(
     ],
     url="https://github.com/transifex/transifex-python",
     install_requires=["pyseeyou", "pytz", "requests", "click", "asttokens"],
+    extras_require={"async": ["aiohttp"]},
 )
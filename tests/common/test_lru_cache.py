@@ -0,0 +1,61 @@
+from transifex.common.utils import LRUCache
+
+
+def test_get_and_set():
+    cache = LRUCache(maxsize=2)
+    assert cache.get('a') is None
+    assert cache.get('a', 'default') == 'default'
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.info() == {
+        'hits': 1, 'misses': 2, 'maxsize': 2, 'currsize': 1,
+    }
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Touch 'a' so that 'b' becomes the least recently used entry
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+
+def test_set_without_evicting():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1, evict=False)
+    cache.set('b', 2, evict=False)
+    cache.set('c', 3, evict=False)
+    assert cache.get('c') is None
+    cache.set('a', 4, evict=False)
+    assert cache.get('a') == 4
+    assert cache.get('b') == 2
+
+
+def test_zero_size_disables_cache():
+    cache = LRUCache(maxsize=0)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_resize_discard_and_clear():
+    cache = LRUCache(maxsize=None)
+    for i in range(10):
+        cache.set(i, i)
+    assert len(cache) == 10
+
+    cache.resize(5)
+    assert len(cache) == 5
+    assert cache.get(4) is None
+    assert cache.get(9) == 9
+
+    cache.discard(lambda key: key % 2 == 0)
+    assert sorted(cache._data) == [5, 7, 9]
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info()['hits'] == cache.info()['misses'] == 0
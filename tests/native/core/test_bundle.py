@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import gzip
+import json
+
+import pytest
+from transifex.native.bundle import (BUNDLE_FORMAT, BundleError, read_bundle,
+                                     write_bundle)
+
+
+class TestBundle(object):
+    """Tests the bundle file format."""
+
+    def test_write_and_read(self, tmpdir):
+        path = str(tmpdir.join('bundle.json.gz'))
+        write_bundle(path, {
+            'el': {
+                u'Table': {'string': u'Τραπέζι'},
+                u'Chair': {'string': u''},
+            },
+            'fr': {u'Table': {'string': u'Table'}},
+        }, etags={'el': 'etag_el'})
+
+        data, etags = read_bundle(path)
+        assert data == {
+            'el': (True, {u'Table': {'string': u'Τραπέζι'}}),
+            'fr': (True, {u'Table': {'string': u'Table'}}),
+        }
+        assert etags == {'el': 'etag_el', 'fr': ''}
+        assert tmpdir.listdir() == [tmpdir.join('bundle.json.gz')]
+
+    def test_unsupported_format(self, tmpdir):
+        path = tmpdir.join('bundle.json.gz')
+        with gzip.open(str(path), 'wb') as f:
+            f.write(json.dumps({
+                'format': BUNDLE_FORMAT + 1, 'languages': {},
+            }).encode('utf-8'))
+        with pytest.raises(BundleError):
+            read_bundle(str(path))
+
+    @pytest.mark.parametrize('content', [b'', b'not gzipped'])
+    def test_malformed_files(self, tmpdir, content):
+        path = tmpdir.join('bundle.json.gz')
+        path.write(content, mode='wb')
+        with pytest.raises(BundleError):
+            read_bundle(str(path))
+
+    def test_missing_file(self, tmpdir):
+        with pytest.raises(BundleError):
+            read_bundle(str(tmpdir.join('missing.json.gz')))
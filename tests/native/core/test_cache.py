@@ -1,5 +1,56 @@
 # -*- coding: utf-8 -*-
-from transifex.native.cache import MemoryCache
+import json
+import os
+import threading
+
+import pytest
+from mock import patch
+from transifex.common._compat import text_type
+from transifex.common.utils import generate_hashed_key, generate_key
+from transifex.native.cache import (AbstractCache, FileCache, MemoryCache,
+                                    SharedFileCache, SQLiteCache, TieredCache,
+                                    build_alias_table, get_key_aliases)
+from transifex.native.snapshot import HEADER, MAGIC, SLOT, Snapshot
+
+
+class DictCache(AbstractCache):
+    """A custom cache that does not index aliases."""
+
+    def __init__(self, data):
+        self._data = data
+
+    def get(self, key, language_code):
+        return self._data.get(language_code, {}).get(key)
+
+
+class TestAliases(object):
+    """Tests the indexing of source based keys under their hashed keys."""
+
+    def test_key_aliases(self):
+        assert get_key_aliases(u'Table') == {generate_hashed_key(u'Table')}
+        key = generate_key(u'Table', [u'furniture', u'home'])
+        assert get_key_aliases(key) == {
+            generate_hashed_key(key),
+            generate_hashed_key(u'Table', [u'furniture', u'home']),
+        }
+
+    def test_source_based_key_takes_precedence(self):
+        hashed_key = generate_hashed_key(u'Table')
+        table = build_alias_table({
+            u'Table': {'string': u'Τραπέζι'},
+            hashed_key: {'string': u'Παλιό τραπέζι'},
+            u'Chair': {'string': u''},
+        })
+        assert table[u'Table'] == u'Τραπέζι'
+        assert table[hashed_key] == u'Τραπέζι'
+        # Empty translations are not stored at all
+        assert u'Chair' not in table
+        assert generate_hashed_key(u'Chair') not in table
+
+    def test_abstract_cache_falls_back_to_alias(self):
+        cache = DictCache({'el': {'hashed': u'Τραπέζι'}})
+        assert cache.get_aliased('Table', 'hashed', 'el') == u'Τραπέζι'
+        assert cache.get_aliased('Table', 'other', 'el') is None
 
 
 class TestMemoryCache(object):
@@ -37,3 +88,487 @@ class TestMemoryCache(object):
         assert cache.get('chair', 'el') == u'Μια καρέκλα'
         assert cache.get('invalid', 'en') is None
         assert cache.get('invalid', 'el') is None
+
+    @patch('transifex.native.cache.StringRenderer.invalidate')
+    def test_update_invalidates_compiled_templates(self, mock_invalidate):
+        cache = MemoryCache()
+        cache.update({
+            'en': (True, {'table': {'string': u'A table'}}),
+            'el': (False, {}),
+        })
+        mock_invalidate.assert_called_once_with(['en'])
+
+        mock_invalidate.reset_mock()
+        cache.update({'el': (False, {})})
+        assert mock_invalidate.call_count == 0
+
+    @patch('transifex.native.cache.MemoryCache.get')
+    def test_get_aliased_is_a_single_lookup(self, mock_get):
+        cache = MemoryCache()
+        cache.get_aliased('Table', 'hashed', 'el')
+        mock_get.assert_called_once_with('hashed', 'el')
+
+    def test_get_aliased_resolves_both_key_styles(self):
+        cache = MemoryCache()
+        cache.update({
+            'el': (True, {
+                u'Table': {'string': u'Τραπέζι'},
+                generate_hashed_key(u'Chair'): {'string': u'Καρέκλα'},
+            }),
+        })
+        assert cache.get_aliased(
+            u'Table', generate_hashed_key(u'Table'), 'el',
+        ) == u'Τραπέζι'
+        assert cache.get_aliased(
+            u'Chair', generate_hashed_key(u'Chair'), 'el',
+        ) == u'Καρέκλα'
+        assert cache.get_aliased(
+            u'Sofa', generate_hashed_key(u'Sofa'), 'el',
+        ) is None
+
+    def test_untranslated_keys_are_not_stored(self):
+        cache = MemoryCache()
+        cache.update({
+            'el': (True, {
+                u'Table': {'string': u'Τραπέζι'},
+                u'Chair': {'string': u''},
+                u'Sofa': {'string': None},
+            }),
+        })
+        assert u'Chair' not in cache._translations_by_lang['el']
+        assert u'Sofa' not in cache._translations_by_lang['el']
+        assert cache.get(u'Chair', 'el') is None
+        assert cache.get(u'Table', 'fr') is None
+
+    def test_update_increases_version(self):
+        cache = MemoryCache()
+        assert cache.version == 0
+        cache.update({'el': (False, {})})
+        assert cache.version == 0
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        assert cache.version == 1
+
+    def test_update_keeps_other_languages(self):
+        cache = MemoryCache()
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        cache.update({'fr': (True, {u'Table': {'string': u'Table'}})})
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        assert cache.get(u'Table', 'fr') == u'Table'
+        assert cache.version == 2
+
+    def test_readers_never_see_half_applied_updates(self):
+        cache = MemoryCache()
+        keys = [u'key{}'.format(i) for i in range(200)]
+        errors = []
+        done = threading.Event()
+
+        def build(value):
+            return {
+                'el': (True, {key: {'string': value} for key in keys}),
+                'fr': (True, {key: {'string': value} for key in keys}),
+            }
+
+        def read():
+            last_version = 0
+            lookups = [(key, None) for key in keys]
+            while not done.is_set():
+                version = cache.version
+                values = set(cache.get_many(lookups, 'el'))
+                if len(values) > 1:
+                    errors.append(values)
+                if version < last_version:
+                    errors.append((version, last_version))
+                last_version = version
+
+        cache.update(build(u'0'))
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(1, 50):
+            cache.update(build(text_type(i)))
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        assert errors == []
+        assert cache.version == 50
+        assert cache.get(u'key0', 'el') == u'49'
+
+    def test_keys_and_strings_are_shared_between_languages(self):
+        cache = MemoryCache()
+        cache.update(json.loads(json.dumps({
+            'el': [True, {u'Brand': {'string': u'Transifex'}}],
+            'fr': [True, {u'Brand': {'string': u'Transifex'}}],
+        })))
+        el_table = cache._translations_by_lang['el']
+        fr_table = cache._translations_by_lang['fr']
+        el_key = [key for key in el_table if key == u'Brand'][0]
+        fr_key = [key for key in fr_table if key == u'Brand'][0]
+        assert el_key is fr_key
+        assert el_table[u'Brand'] is fr_table[u'Brand']
+
+    def test_iter_strings(self):
+        cache = MemoryCache()
+        assert list(cache.iter_strings('el')) == []
+        cache.update({'el': (True, {
+            u'Table': {'string': u'Τραπέζι'},
+            u'Desk': {'string': u'Τραπέζι'},
+            u'Chair': {'string': u'Καρέκλα'},
+        })})
+        assert sorted(cache.iter_strings('el')) == [u'Καρέκλα', u'Τραπέζι']
+
+    def test_memory_usage(self):
+        cache = MemoryCache()
+        assert cache.memory_usage() == {}
+        cache.update({
+            'el': (True, {u'Table': {'string': u'Τραπέζι'}}),
+            'fr': (True, {u'Table': {'string': u'Table'}}),
+        })
+        usage = cache.memory_usage()
+        assert set(usage) == {'el', 'fr'}
+        # The shared keys are only counted for the first language
+        assert usage['el'] > usage['fr'] > 0
+
+
+class TestFileCache(object):
+    """Tests the functionality of the FileCache class."""
+
+    def test_update_persists_translations(self, tmpdir):
+        path = str(tmpdir.join('translations'))
+        cache = FileCache(path)
+        assert cache.version == 0
+        assert cache.get(u'Table', 'el') is None
+        cache.update({
+            'el': (True, {
+                u'Table': {'string': u'Τραπέζι'},
+                u'Chair': {'string': u''},
+            }),
+            'fr': (False, {}),
+        })
+        assert cache.version == 1
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        assert cache.get(u'Chair', 'el') is None
+        assert cache.get_aliased(
+            u'Table', generate_hashed_key(u'Table'), 'el',
+        ) == u'Τραπέζι'
+        assert cache.get_many(
+            [(u'Table', None), (u'Chair', None)], 'el',
+        ) == [u'Τραπέζι', None]
+        assert isinstance(cache._snapshot[1]['el'], Snapshot)
+        assert os.listdir(path) == ['el.txs']
+
+    def test_snapshots_are_loaded_on_start(self, tmpdir):
+        path = str(tmpdir)
+        FileCache(path).update({
+            'el': (True, {u'Table': {'string': u'Τραπέζι'}}),
+            'fr': (True, {u'Table': {'string': u'Table'}}),
+        })
+        tmpdir.join('de.txs').write(b'garbage', mode='wb')
+
+        cache = FileCache(path)
+        assert cache.version == 1
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        assert cache.get(u'Table', 'fr') == u'Table'
+        assert cache.get(u'Table', 'de') is None
+
+        # Languages that were not fetched keep their snapshot
+        cache.update({
+            'el': (False, {}),
+            'fr': (True, {u'Table': {'string': u'Tableau'}}),
+        })
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        assert cache.get(u'Table', 'fr') == u'Tableau'
+        assert FileCache(path).get(u'Table', 'fr') == u'Tableau'
+
+    def test_unwritable_path_falls_back_to_memory(self, tmpdir):
+        path = tmpdir.join('file')
+        path.write('')
+        cache = FileCache(str(path))
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+
+    def test_etag_store(self, tmpdir):
+        cache = FileCache(str(tmpdir))
+        etags = cache.get_etag_store()
+        etags.set('el', 'etag_el')
+        assert etags.get('el') == ''
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        assert etags.get('el') == 'etag_el'
+        etags.save()
+        assert FileCache(str(tmpdir)).get_etag_store().get('el') == 'etag_el'
+
+        # The ETags of languages that could not be written are not used
+        path = tmpdir.join('file')
+        path.write('')
+        cache = FileCache(str(path))
+        etags = cache.get_etag_store()
+        etags.set('el', 'etag_el')
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        assert etags.get('el') == ''
+
+    @patch('transifex.native.cache.logger')
+    def test_corrupted_snapshots_miss_translations(self, mock_logger, tmpdir):
+        # A valid header, followed by slots that are all taken
+        tmpdir.join('el.txs').write(
+            HEADER.pack(MAGIC, 0, 8) + SLOT.pack(0, 0, 0, 0, 0) * 8,
+            mode='wb',
+        )
+        cache = FileCache(str(tmpdir))
+        assert cache.get(u'Table', 'el') is None
+        assert cache.get_aliased(u'Table', u'alias', 'el') is None
+        assert cache.get_many([(u'Table', None)], 'el') == [None]
+        # The error is logged once per interval
+        assert mock_logger.error.call_count == 1
+
+    def test_reload_loads_snapshots_written_by_others(self, tmpdir):
+        path = str(tmpdir)
+        reader, writer = FileCache(path), FileCache(path)
+        writer.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        assert reader.get(u'Table', 'el') is None
+
+        reader.reload()
+        assert reader.version == 1
+        assert reader.get(u'Table', 'el') == u'Τραπέζι'
+        # Unchanged snapshots are not loaded again
+        reader.reload()
+        assert reader.version == 1
+
+        writer.update({'el': (True, {u'Table': {'string': u'Τραπεζάκι'}})})
+        reader.reload()
+        assert reader.version == 2
+        assert reader.get(u'Table', 'el') == u'Τραπεζάκι'
+
+
+class TestSharedFileCache(object):
+    """Tests the functionality of the SharedFileCache class."""
+
+    def test_only_one_process_fetches_per_interval(self, tmpdir):
+        path = str(tmpdir)
+        leader, follower = SharedFileCache(path), SharedFileCache(path)
+        with leader.fetch_lock() as should_fetch:
+            assert should_fetch
+            leader.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+
+        with follower.fetch_lock() as should_fetch:
+            assert not should_fetch
+        # The follower loads the snapshots fetched by the leader
+        assert follower.get(u'Table', 'el') == u'Τραπέζι'
+
+        follower.fetch_interval = 0
+        with follower.fetch_lock() as should_fetch:
+            assert should_fetch
+
+    def test_failed_fetches_count_as_fetches(self, tmpdir):
+        cache = SharedFileCache(str(tmpdir))
+        try:
+            with cache.fetch_lock():
+                raise ValueError()
+        except ValueError:
+            pass
+        with cache.fetch_lock() as should_fetch:
+            assert not should_fetch
+
+    def test_default_caches_always_fetch(self):
+        with MemoryCache().fetch_lock() as should_fetch:
+            assert should_fetch
+
+
+class TestTieredCache(object):
+    """Tests the functionality of the TieredCache class."""
+
+    def test_translations_are_kept_in_memory(self):
+        cache = TieredCache(MemoryCache(), maxsize=10)
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        with patch.object(cache._backend, 'get',
+                          wraps=cache._backend.get) as mock_get:
+            for _ in range(3):
+                assert cache.get(u'Table', 'el') == u'Τραπέζι'
+                assert cache.get(u'Chair', 'el') is None
+            assert mock_get.call_count == 2
+        assert cache.cache_info() == {
+            'hits': 4, 'misses': 2, 'maxsize': 10, 'currsize': 2,
+        }
+
+    def test_backend_updates_invalidate_memory(self):
+        backend = MemoryCache()
+        cache = TieredCache(backend)
+        backend.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        assert cache.version == 1
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        # e.g. updated by another process
+        backend.update({'el': (True, {u'Table': {'string': u'Τραπεζάκι'}})})
+        assert cache.get(u'Table', 'el') == u'Τραπεζάκι'
+
+    def test_unversioned_backend(self):
+        backend = DictCache({'el': {u'Table': u'Τραπέζι'}})
+        cache = TieredCache(backend)
+        assert cache.version is None
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        backend._data['el'][u'Table'] = u'Τραπεζάκι'
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        cache.update({})
+        assert cache.get(u'Table', 'el') == u'Τραπεζάκι'
+
+    def test_get_aliased_and_get_many(self):
+        cache = TieredCache(MemoryCache())
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        hashed_key = generate_hashed_key(u'Table')
+        assert cache.get_aliased(u'Table', hashed_key, 'el') == u'Τραπέζι'
+        assert cache.get_many(
+            [(u'Table', hashed_key), (u'Chair', None)], 'el',
+        ) == [u'Τραπέζι', None]
+        with patch.object(cache._backend, 'get_many') as mock_get_many:
+            assert cache.get_many(
+                [(u'Table', hashed_key), (u'Chair', None)], 'el',
+            ) == [u'Τραπέζι', None]
+            assert mock_get_many.call_count == 0
+
+    def test_backend_from_settings(self, tmpdir):
+        cache = TieredCache(
+            ('transifex.native.cache.FileCache', {'path': str(tmpdir)}),
+        )
+        assert isinstance(cache._backend, FileCache)
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        assert FileCache(str(tmpdir)).get(u'Table', 'el') == u'Τραπέζι'
+
+
+class TestSQLiteCache(object):
+    """Tests the functionality of the SQLiteCache class."""
+
+    def test_etag_store(self, tmpdir):
+        path = str(tmpdir.join('translations.db'))
+        cache = TieredCache((
+            'transifex.native.cache.SQLiteCache', {'path': path},
+        ))
+        etags = cache.get_etag_store()
+        etags.set('el', 'etag_el')
+        assert etags.get('el') == ''
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        etags.save()
+        assert SQLiteCache(path).get_etag_store().get('el') == 'etag_el'
+
+    def test_update_and_get(self, tmpdir):
+        cache = SQLiteCache(str(tmpdir.join('tx', 'translations.db')))
+        assert cache.version == 0
+        assert cache.get(u'Table', 'el') is None
+        cache.update({
+            'el': (True, {
+                u'Table': {'string': u'Τραπέζι'},
+                u'Chair': {'string': u'Καρέκλα'},
+                u'Sofa': {'string': u''},
+            }),
+            'fr': (False, {}),
+        })
+        assert cache.version == 1
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        assert cache.get(u'Sofa', 'el') is None
+        assert cache.get_aliased(
+            u'Table', generate_hashed_key(u'Table'), 'el',
+        ) == u'Τραπέζι'
+        assert cache.get_many(
+            [(u'Table', None), (u'Chair', None), (u'Sofa', None)], 'el',
+        ) == [u'Τραπέζι', u'Καρέκλα', None]
+
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπεζάκι'}})})
+        assert cache.version == 2
+        assert cache.get(u'Table', 'el') == u'Τραπεζάκι'
+        assert cache.get(u'Chair', 'el') is None
+
+    def test_translations_are_persisted(self, tmpdir):
+        path = str(tmpdir.join('translations.db'))
+        SQLiteCache(path).update({
+            'el': (True, {u'Table': {'string': u'Τραπέζι'}}),
+            'fr': (True, {u'Table': {'string': u'Table'}}),
+        })
+        cache = SQLiteCache(path)
+        assert cache.version == 1
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        assert cache.get(u'Table', 'fr') == u'Table'
+
+        # Translations kept in memory are refreshed on reload
+        SQLiteCache(path).update({'fr': (True, {})})
+        assert cache.get(u'Table', 'fr') == u'Table'
+        cache.reload()
+        assert cache.version == 2
+        assert cache.get(u'Table', 'fr') is None
+        assert cache.get(u'Table', 'el') == u'Τραπέζι'
+
+    def test_hot_translations_are_kept_in_memory(self, tmpdir):
+        cache = SQLiteCache(str(tmpdir.join('translations.db')), maxsize=2)
+        cache.update({'el': (True, {
+            u'key{}'.format(i): {'string': u'{}'.format(i)} for i in range(600)
+        })})
+        lookups = [(u'key{}'.format(i), None) for i in range(600)]
+        assert cache.get_many(lookups, 'el') == [
+            u'{}'.format(i) for i in range(600)
+        ]
+        cache.get(u'key0', 'el')
+        cache.get(u'key0', 'el')
+        info = cache.cache_info()
+        assert info['currsize'] == 2
+        assert info['hits'] == 1
+
+    def test_connections_are_per_thread(self, tmpdir):
+        cache = SQLiteCache(str(tmpdir.join('translations.db')), maxsize=0)
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get(u'Table', 'el'))
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [u'Τραπέζι'] * 4
+
+    def test_connection_is_recreated_after_fork(self, tmpdir):
+        cache = SQLiteCache(str(tmpdir.join('translations.db')), maxsize=0)
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        connection = cache._get_connection()
+        with patch('transifex.native.cache.os.getpid',
+                   return_value=cache._local.pid + 1):
+            assert cache._get_connection() is not connection
+            assert cache.get(u'Table', 'el') == u'Τραπέζι'
+        # The connection of the parent process is left open
+        assert cache._inherited_connections == [connection]
+        connection.execute('SELECT 1')
+
+
+@pytest.mark.parametrize('make_cache', [
+    lambda path: FileCache(path),
+    lambda path: SQLiteCache(os.path.join(path, 'translations.db')),
+    lambda path: TieredCache(MemoryCache()),
+    lambda path: DictCache({}),
+])
+def test_iter_strings(tmpdir, make_cache):
+    cache = make_cache(str(tmpdir))
+    assert list(cache.iter_strings('el')) == []
+    cache.update({'el': (True, {
+        u'Table': {'string': u'Τραπέζι'},
+        u'Desk': {'string': u'Τραπέζι'},
+        u'Chair': {'string': u'Καρέκλα'},
+    })})
+    expected = [] if isinstance(cache, DictCache) else [u'Καρέκλα', u'Τραπέζι']
+    assert sorted(cache.iter_strings('el')) == expected
+
+
+@pytest.mark.parametrize('make_cache', [
+    lambda path: MemoryCache(),
+    lambda path: FileCache(path),
+    lambda path: SQLiteCache(os.path.join(path, 'translations.db')),
+    lambda path: TieredCache(MemoryCache()),
+    lambda path: DictCache({}),
+])
+def test_has_language(tmpdir, make_cache):
+    cache = make_cache(str(tmpdir))
+    assert not cache.has_language('el')
+    cache.update({
+        'el': (True, {u'Table': {'string': u'Τραπέζι'}}),
+        'fr': (False, {}),
+    })
+    assert cache.has_language('el') == (not isinstance(cache, DictCache))
+    assert not cache.has_language('fr')
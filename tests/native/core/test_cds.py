@@ -1,9 +1,13 @@
+import json
+import threading
+import time
 from operator import itemgetter
 
 import pytest
+import requests
 import responses
 from mock import patch
-from transifex.native.cds import CDSHandler
+from transifex.native.cds import CDSHandler, FileEtagStore
 from transifex.native.parsing import SourceString
 
 
@@ -231,8 +235,11 @@ class TestCDSHandler(object):
 
         # test fetch_languages fails with connection error
         responses.add(responses.GET, cds_host + '/languages', status=500)
-        resp = cds_handler.fetch_translations()
+        failed = set()
+        resp = cds_handler.fetch_translations(failed=failed)
         assert resp == {}
+        # None of the configured languages could be fetched
+        assert failed == set(cds_handler.configured_language_codes)
 
         patched_logger.error.assert_called_with(
             'Error retrieving languages from CDS: UnknownError '
@@ -281,6 +288,33 @@ class TestCDSHandler(object):
         )
         assert resp == {'el': (False, {})}
 
+    @responses.activate
+    def test_fetch_translations_for_language_codes(self):
+        cds_host = 'https://some.host'
+        cds_handler = CDSHandler(
+            ['el', 'en', 'fr'],
+            'some_token',
+            host=cds_host
+        )
+        responses.add(
+            responses.GET, cds_host + '/content/el',
+            json={'data': {'key1': {'string': 'key1_el'}}}, status=200
+        )
+        responses.add(
+            responses.GET, cds_host + '/content/fr',
+            json={'data': {'key1': {'string': 'key1_fr'}}}, status=200
+        )
+
+        resp = cds_handler.fetch_translations(
+            language_codes=['el', 'fr', 'de'])
+        assert resp == {
+            'el': (True, {'key1': {'string': 'key1_el'}}),
+            'fr': (True, {'key1': {'string': 'key1_fr'}}),
+        }
+        # The languages endpoint is not requested
+        assert len(responses.calls) == 2
+        assert cds_handler.fetch_translations(language_codes=[]) == {}
+
     @responses.activate
     @patch('transifex.native.cds.logger')
     def test_fetch_translations_etags_management(self, patched_logger):
@@ -495,6 +529,167 @@ class TestCDSHandler(object):
         assert (translations ==
                 {'el': (True, {'source': {'string': "translation"}})})
 
+    @responses.activate
+    @patch('transifex.native.cds.time.sleep')
+    def test_retry_stops_at_deadline(self, mock_sleep):
+        cds_host = 'https://some.host'
+        cds_handler = CDSHandler(
+            ['el', 'en'],
+            'some_token',
+            host=cds_host,
+        )
+        responses.add(responses.GET, cds_host + '/content/el', status=500)
+        translations = cds_handler.fetch_translations(
+            'el', deadline=time.time() + 1,
+        )
+        assert translations == {'el': (False, {})}
+        # Retrying would sleep past the deadline
+        assert mock_sleep.call_count == 0
+        assert len(responses.calls) == 1
+
+    @patch('requests.Session.request')
+    def test_retry_passes_remaining_time(self, mock_get):
+        cds_handler = CDSHandler(['el', 'en'], 'some_token')
+        mock_get.return_value.status_code = 200
+        cds_handler.retry_get_request('https://some.host',
+                                      deadline=time.time() + 10)
+        assert 0 < mock_get.call_args[1]['timeout'] <= 10
+
+        with pytest.raises(requests.Timeout):
+            cds_handler.retry_get_request('https://some.host',
+                                          deadline=time.time() - 1)
+        assert mock_get.call_count == 1
+
+    @patch('requests.Session.request')
+    def test_timeout(self, mock_request):
+        mock_request.return_value.status_code = 200
+        cds_handler = CDSHandler(['el', 'en'], 'some_token', timeout=(3, 20))
+        cds_handler.retry_get_request('https://some.host')
+        assert mock_request.call_args[1]['timeout'] == (3, 20)
+
+        cds_handler.retry_get_request('https://some.host',
+                                      deadline=time.time() + 10)
+        connect_timeout, read_timeout = mock_request.call_args[1]['timeout']
+        assert connect_timeout == 3
+        assert 0 < read_timeout <= 10
+
+    @responses.activate
+    def test_session_is_reused(self):
+        cds_host = 'https://some.host'
+        cds_handler = CDSHandler(['el', 'fr'], 'some_token', host=cds_host,
+                                 pool_size=4)
+        responses.add(responses.GET, cds_host + '/content/el',
+                      json={'data': {}}, status=200)
+        responses.add(responses.GET, cds_host + '/content/fr',
+                      json={'data': {}}, status=200)
+        session = cds_handler.session
+        with patch.object(session, 'request',
+                          wraps=session.request) as mock_request:
+            cds_handler.fetch_translations(language_codes=['el', 'fr'])
+            assert mock_request.call_count == 2
+        assert cds_handler.session is session
+        adapter = session.get_adapter(cds_host)
+        assert adapter._pool_maxsize == 4
+
+    def test_session_is_recreated_after_fork(self):
+        cds_handler = CDSHandler(['el', 'en'], 'some_token')
+        session = cds_handler.session
+        assert cds_handler.session is session
+        with patch('transifex.native.cds.os.getpid',
+                   return_value=cds_handler._session_pid + 1):
+            assert cds_handler.session is not session
+
+    def test_fetch_languages_concurrently(self):
+        languages = ['lang{}'.format(i) for i in range(8)]
+        cds_handler = CDSHandler(languages, 'some_token', pool_size=3)
+        lock = threading.Lock()
+        active = []
+        peak = [0]
+
+        def fetch(language_code, deadline=None, failed=None):
+            with lock:
+                active.append(language_code)
+                peak[0] = max(peak[0], len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(language_code)
+            return True, {'key': {'string': language_code}}
+
+        with patch.object(cds_handler, '_fetch_language', side_effect=fetch):
+            translations = cds_handler.fetch_translations(
+                language_codes=languages,
+            )
+        assert translations == {
+            language_code: (True, {'key': {'string': language_code}})
+            for language_code in languages
+        }
+        assert 1 < peak[0] <= 3
+
+    @responses.activate
+    @patch('transifex.native.cds.logger')
+    def test_fetch_errors_are_isolated(self, patched_logger):
+        cds_host = 'https://some.host'
+        cds_handler = CDSHandler(['el', 'fr', 'de', 'it'], 'some_token',
+                                 host=cds_host)
+        cds_handler.etags.set('de', 'de-etag')
+        responses.add(responses.GET, cds_host + '/content/el',
+                      json={'data': {'key': {'string': 'el'}}}, status=200,
+                      headers={'ETag': 'el-etag'})
+        responses.add(responses.GET, cds_host + '/content/fr',
+                      body=requests.ConnectionError())
+        responses.add(responses.GET, cds_host + '/content/de', status=304)
+        responses.add(responses.GET, cds_host + '/content/it',
+                      body='not json', status=200,
+                      headers={'ETag': 'it-etag'})
+        failed = set()
+        translations = cds_handler.fetch_translations(
+            language_codes=['el', 'fr', 'de', 'it'], failed=failed,
+        )
+        assert translations == {
+            'el': (True, {'key': {'string': 'el'}}),
+            'fr': (False, {}),
+            'de': (False, {}),
+            'it': (False, {}),
+        }
+        # Unchanged languages are not failures
+        assert failed == {'fr', 'it'}
+        assert patched_logger.error.call_count == 2
+        assert cds_handler.etags.get('el') == 'el-etag'
+        assert cds_handler.etags.get('de') == 'de-etag'
+        # A malformed response must be fetched again next time
+        assert cds_handler.etags.get('it') == ''
+
+    @responses.activate
+    @patch('transifex.native.cds.logger')
+    def test_fetch_translations_streamed(self, patched_logger):
+        cds_host = 'https://some.host'
+        cds_handler = CDSHandler(['el', 'fr'], 'some_token', host=cds_host,
+                                 stream=True)
+        responses.add(
+            responses.GET, cds_host + '/content/el',
+            headers={'ETag': 'el-etag'},
+            json={'data': {
+                'key1': {'string': u'Γεια'},
+                'key2': {'string': ''},
+                'key3': {},
+            }},
+        )
+        responses.add(
+            responses.GET, cds_host + '/content/fr',
+            headers={'ETag': 'fr-etag'},
+            body='{"data": {"key1": {"string": "Salut"}',
+        )
+        translations = cds_handler.fetch_translations(
+            language_codes=['el', 'fr'],
+        )
+        assert translations == {
+            'el': (True, {'key1': u'Γεια'}),
+            'fr': (False, {}),
+        }
+        assert patched_logger.error.call_count == 1
+        assert cds_handler.etags.get('el') == 'el-etag'
+        assert cds_handler.etags.get('fr') == ''
+
     def test_invalidate_no_secret(self):
         cds_handler = CDSHandler(
             ['el', 'en'],
@@ -551,3 +746,58 @@ class TestCDSHandler(object):
             for x in ('Unprocessable Entity', 'None')
         ]
         assert patched_logger.error.call_args[0][0] in messages
+
+
+class TestFileEtagStore(object):
+    """Tests the functionality of the FileEtagStore class."""
+
+    def test_save_and_load(self, tmpdir):
+        path = str(tmpdir.join('etags', 'etags.json'))
+        store = FileEtagStore(path)
+        store.set('el', 'etag_el')
+        assert store.get('el') == 'etag_el'
+        assert FileEtagStore(path).get('el') == ''
+
+        store.save()
+        assert FileEtagStore(path).get('el') == 'etag_el'
+        assert FileEtagStore(path).get('fr') == ''
+
+    def test_only_stored_languages_are_used(self, tmpdir):
+        path = str(tmpdir.join('etags.json'))
+        stored = {'el'}
+        store = FileEtagStore(path, is_stored=stored.__contains__)
+        store.set('el', 'etag_el')
+        store.set('fr', 'etag_fr')
+        assert store.get('el') == 'etag_el'
+        assert store.get('fr') == ''
+        store.save()
+        with open(path) as f:
+            assert json.load(f) == {'el': 'etag_el'}
+
+    def test_changes_by_others_are_loaded(self, tmpdir):
+        path = str(tmpdir.join('etags.json'))
+        reader, writer = FileEtagStore(path), FileEtagStore(path)
+        reader.set('fr', 'etag_fr')
+        writer.set('el', 'etag_el')
+        writer.save()
+        assert reader.get('el') == 'etag_el'
+        assert reader.get('fr') == 'etag_fr'
+
+        writer.set('el', 'etag_el_2')
+        writer.save()
+        assert reader.get('el') == 'etag_el_2'
+
+    @patch('transifex.native.cds.logger')
+    def test_errors_are_logged(self, patched_logger, tmpdir):
+        path = tmpdir.join('etags.json')
+        path.write('garbage')
+        store = FileEtagStore(str(path))
+        assert store.get('el') == ''
+        assert patched_logger.warning.call_count == 1
+
+        tmpdir.join('file').write('')
+        store = FileEtagStore(str(tmpdir.join('file', 'etags.json')))
+        store.set('el', 'etag_el')
+        store.save()
+        assert patched_logger.error.call_count == 1
+        assert store.get('el') == 'etag_el'
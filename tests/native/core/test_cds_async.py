@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from mock import patch
+from transifex.common.utils import generate_hashed_key
+from transifex.native.cds import AsyncCDSHandler
+from transifex.native.core import TxNative
+from transifex.native.parsing import SourceString
+
+web = pytest.importorskip('aiohttp.web')
+
+
+class StubCDS(object):
+    """A local CDS that serves the given translations."""
+
+    def __init__(self, translations, delay=0):
+        self.translations = translations
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+
+    async def languages(self, request):
+        return web.json_response({'data': [
+            {'code': language_code} for language_code in self.translations
+        ]})
+
+    async def content(self, request):
+        language_code = request.match_info['language_code']
+        self.requests.append(
+            (language_code, request.headers.get('If-None-Match')),
+        )
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        data = self.translations.get(language_code)
+        if data is None:
+            return web.Response(status=404)
+        if data == 'malformed':
+            return web.Response(text='{"data":', headers={'ETag': 'bad'})
+        etag = 'etag-' + language_code
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304)
+        return web.json_response({'data': data}, headers={'ETag': etag})
+
+    async def push(self, request):
+        content = await request.json()
+        return web.json_response(
+            {'data': {'strings': len(content['data'])}}, status=202,
+        )
+
+    async def invalidate(self, request):
+        if request.headers['Authorization'] != 'Bearer token:secret':
+            return web.Response(status=403)
+        return web.json_response({'data': {'count': 1}})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/languages', self.languages)
+        app.router.add_get('/content/{language_code}', self.content)
+        app.router.add_post('/content/', self.push)
+        app.router.add_post('/invalidate', self.invalidate)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return 'http://127.0.0.1:{}'.format(port)
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def run_in_new_loop(coroutine):
+    """Run the given coroutine in a new event loop; unlike `asyncio.run()`,
+    available in Python 3.6 as well."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def run(stub, test):
+    """Start the stub CDS and run the given coroutine function with its
+    host, in a new event loop."""
+    async def main():
+        host = await stub.start()
+        try:
+            return await test(host)
+        finally:
+            await stub.stop()
+    return run_in_new_loop(main())
+
+
+class TestAsyncCDSHandler(object):
+
+    @patch('transifex.native.cds.logger')
+    def test_fetch_translations(self, patched_logger):
+        stub = StubCDS({
+            'el': {'key': {'string': u'Καλημέρα'}},
+            'fr': {'key': {'string': u'Bonjour'}},
+            'de': 'malformed',
+            'it': {},
+        })
+
+        async def test(host):
+            handler = AsyncCDSHandler(['el', 'fr', 'de', 'es'], 'token',
+                                      host=host)
+            try:
+                translations = await handler.fetch_translations()
+                assert translations == {
+                    'el': (True, {'key': {'string': u'Καλημέρα'}}),
+                    'fr': (True, {'key': {'string': u'Bonjour'}}),
+                    'de': (False, {}),
+                }
+                assert handler.etags.get('el') == 'etag-el'
+                assert handler.etags.get('de') == ''
+
+                # Unchanged languages are not downloaded again
+                translations = await handler.fetch_translations(
+                    language_codes=['el', 'it'],
+                )
+                assert translations == {'el': (False, {})}
+            finally:
+                await handler.close()
+
+        run(stub, test)
+        assert patched_logger.error.call_count == 1
+        assert ('el', 'etag-el') in stub.requests
+
+    @patch('transifex.native.cds.logger')
+    def test_fetch_errors_are_isolated(self, patched_logger):
+        stub = StubCDS({'el': {'key': {'string': u'Καλημέρα'}}})
+
+        async def test(host):
+            handler = AsyncCDSHandler(['el', 'fr'], 'token', host=host)
+            try:
+                return await handler.fetch_translations(
+                    language_codes=['el', 'fr'],
+                )
+            finally:
+                await handler.close()
+
+        assert run(stub, test) == {
+            'el': (True, {'key': {'string': u'Καλημέρα'}}),
+            'fr': (False, {}),
+        }
+        assert patched_logger.error.call_count == 2
+
+    def test_fetch_concurrently(self):
+        languages = ['lang{}'.format(i) for i in range(8)]
+        stub = StubCDS({
+            language_code: {} for language_code in languages
+        }, delay=0.05)
+
+        async def test(host):
+            handler = AsyncCDSHandler(languages, 'token', host=host,
+                                      pool_size=3)
+            try:
+                return await handler.fetch_translations()
+            finally:
+                await handler.close()
+
+        translations = run(stub, test)
+        assert translations == {
+            language_code: (True, {}) for language_code in languages
+        }
+        assert stub.peak == 3
+
+    @patch('transifex.native.cds.logger')
+    def test_fetch_deadline(self, patched_logger):
+        stub = StubCDS({'el': {}}, delay=1)
+
+        async def test(host):
+            handler = AsyncCDSHandler(['el'], 'token', host=host)
+            try:
+                return await handler.fetch_translations(
+                    'el', deadline=time.time() + 0.1,
+                )
+            finally:
+                await handler.close()
+
+        assert run(stub, test) == {'el': (False, {})}
+        assert patched_logger.error.call_count == 1
+
+    @patch('transifex.native.cds.logger')
+    def test_push_and_invalidate(self, patched_logger):
+        stub = StubCDS({})
+
+        async def test(host):
+            handler = AsyncCDSHandler(['el'], 'token', secret='secret',
+                                      host=host)
+            try:
+                response = await handler.push_source_strings(
+                    [SourceString(u'Hello'), SourceString(u'World')],
+                )
+                assert response.status == 202
+                assert json.loads(await response.text()) == \
+                    {'data': {'strings': 2}}
+                response = await handler.invalidate_cache()
+                assert response.status == 200
+                assert patched_logger.error.call_count == 0
+
+                handler.secret = 'wrong'
+                response = await handler.invalidate_cache()
+                assert response.status == 403
+                assert patched_logger.error.call_count == 1
+
+                handler.secret = None
+                with pytest.raises(Exception):
+                    await handler.invalidate_cache()
+            finally:
+                await handler.close()
+
+        run(stub, test)
+
+    def test_session_per_event_loop(self):
+        handler = AsyncCDSHandler(['el'], 'token')
+
+        async def get_session():
+            return handler.session
+
+        session = run_in_new_loop(get_session())
+        assert run_in_new_loop(get_session()) is not session
+        # The session of the closed loop is released
+        assert session.closed
+
+    def test_session_of_running_loop_is_closed(self):
+        handler = AsyncCDSHandler(['el'], 'token')
+
+        async def get_session():
+            return handler.session
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        try:
+            session = asyncio.run_coroutine_threadsafe(
+                get_session(), loop,
+            ).result(5)
+            assert run_in_new_loop(get_session()) is not session
+            for _ in range(500):
+                if session.closed:
+                    break
+                time.sleep(0.01)
+            assert session.closed
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(5)
+            loop.close()
+
+
+class TestAsyncFetchTranslations(object):
+
+    def test_afetch_translations(self):
+        stub = StubCDS({
+            'el': {generate_hashed_key(u'Hello'): {'string': u'Γεια'}},
+        })
+        mytx = TxNative()
+
+        async def test(host):
+            mytx.init(['el'], 'token', cds_host=host)
+            try:
+                await mytx.afetch_translations()
+                assert mytx.translations_ready.is_set()
+                assert mytx.translate(u'Hello', 'el') == u'Γεια'
+
+                with patch.object(mytx._cache, 'update') as mock_update:
+                    await mytx.afetch_translations()
+                    mock_update.assert_called_once_with({'el': (False, {})})
+            finally:
+                await mytx._async_cds_handler.close()
+
+        run(stub, test)
+        # The asynchronous handler shares the ETags of the synchronous one
+        assert mytx._cds_handler.etags.get('el') == 'etag-el'
+
+    def test_afetch_translations_lock(self):
+        mytx = TxNative()
+        mytx.init(['el'], 'token', cds_host='http://127.0.0.1:1')
+        threads, errors = [], []
+
+        @contextmanager
+        def fetch_lock():
+            threads.append(threading.current_thread())
+            try:
+                yield True
+            except Exception as e:
+                errors.append(e)
+                raise
+            finally:
+                threads.append(threading.current_thread())
+
+        error = ValueError()
+
+        async def fetch_translations(**kwargs):
+            raise error
+
+        with patch.object(mytx._cache, 'fetch_lock', fetch_lock), \
+                patch.object(mytx._async_cds_handler, 'fetch_translations',
+                             fetch_translations):
+            with pytest.raises(ValueError):
+                run_in_new_loop(mytx.afetch_translations())
+
+        # The lock is released by the thread that acquired it, along with
+        # the error that was raised while holding it
+        assert len(threads) == 2 and threads[0] is threads[1]
+        assert errors == [error]
+        assert not mytx.translations_ready.is_set()
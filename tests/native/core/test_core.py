@@ -1,15 +1,24 @@
 # -*- coding: utf-8 -*-
 
+import json
+import os
+import threading
+import time
+
 import pytest
-from mock import MagicMock, call, patch
+import responses
+from mock import MagicMock, patch
 from transifex.common.utils import generate_hashed_key, generate_key
-from transifex.native.cache import MemoryCache
-from transifex.native.cds import TRANSIFEX_CDS_HOST
+from transifex.native.bundle import write_bundle
+from transifex.native.cache import FileCache, MemoryCache, SharedFileCache
+from transifex.native.cds import TRANSIFEX_CDS_HOST, FileEtagStore
 from transifex.native.core import NotInitializedError, TxNative
 from transifex.native.parsing import SourceString
 from transifex.native.rendering import (PseudoTranslationPolicy,
-                                        SourceStringPolicy)
+                                        SourceStringPolicy, StringRenderer,
+                                        compiled_templates)
 from transifex.native.settings import parse_error_policy
+from transifex.native.snapshot import HEADER, MAGIC, SLOT
 
 
 class TestSourceString(object):
@@ -104,10 +113,11 @@ class TestNative(object):
         mock_cache.return_value = None
         mytx = self._get_tx()
         mytx.translate('My String', 'en', is_source=False)
-        mock_cache.assert_has_calls([
-            call(generate_key(string='My String'), 'en'),
-            call(generate_hashed_key(string='My String'), 'en')
-        ])
+        # The alias table of the cache resolves both key styles with a single
+        # lookup of the hashed key
+        mock_cache.assert_called_once_with(
+            generate_hashed_key(string='My String'), 'en',
+        )
         mock_render.assert_called_once_with(
             source_string='My String',
             string_to_render=None,
@@ -387,3 +397,580 @@ class TestNative(object):
                                    u"fr_FR",
                                    params={'cnt': 2})
         assert translation == u'OTHER'
+
+    @patch('transifex.native.core.generate_hashed_key')
+    @patch('transifex.native.core.parse_plurals')
+    def test_keys_are_resolved_once(self, mock_parse_plurals, mock_hash):
+        mock_parse_plurals.return_value = (False, {5: u'My String'})
+        mock_hash.return_value = 'hashed'
+        mytx = self._get_tx()
+        for _ in range(3):
+            mytx.translate(u'My String', 'el', _context=['a', 'b'])
+        assert mock_parse_plurals.call_count == 1
+        assert mock_hash.call_count == 1
+
+        resolved = mytx.resolve_keys(u'My String', ['a', 'b'])
+        assert resolved.pluralized is False
+        assert resolved.variable is None
+        assert resolved.key == generate_key(u'My String', ['a', 'b'])
+        assert resolved.hashed_key == 'hashed'
+
+    def test_resolve_plural_keys(self):
+        mytx = self._get_tx()
+        source_string = u'{cnt, plural, one {one} other {other}}'
+        resolved = mytx.resolve_keys(source_string)
+        assert resolved.pluralized is True
+        assert resolved.variable == 'cnt'
+        assert resolved.key == generate_key(source_string)
+        assert resolved.hashed_key == generate_hashed_key(source_string)
+
+    def test_empty_string_requires_custom_key(self):
+        mytx = self._get_tx()
+        with pytest.raises(ValueError):
+            mytx.translate(u'', 'el')
+        assert mytx.translate(u'', 'el', _key='custom') == u''
+
+    def test_key_index_size(self):
+        mytx = self._get_tx(key_index_size=1)
+        mytx.resolve_keys(u'One')
+        mytx.resolve_keys(u'Two')
+        assert mytx._key_index.info()['currsize'] == 1
+
+    @patch('transifex.native.core.StringRenderer.render')
+    def test_render_cache_is_opt_in(self, mock_render):
+        mock_render.return_value = u'rendered'
+        mytx = self._get_tx()
+        mytx.translate(u'My String', 'el')
+        mytx.translate(u'My String', 'el')
+        assert mock_render.call_count == 2
+
+    def test_render_cache_memoizes_parameterless_translations(self):
+        cache = MemoryCache()
+        cache.update({'el': (True, {u'Table': {'string': u'Τραπέζι'}})})
+        mytx = self._get_tx(cache=cache, render_cache_size=10)
+        with patch('transifex.native.core.StringRenderer.render',
+                   wraps=StringRenderer.render) as mock_render:
+            assert mytx.translate(u'Table', 'el') == u'Τραπέζι'
+            assert mytx.translate(u'Table', 'el') == u'Τραπέζι'
+            assert mock_render.call_count == 1
+
+            # Different escaping or parameters are rendered
+            mytx.translate(u'Table', 'el', escape=False)
+            mytx.translate(u'Table', 'el', params={'cnt': 1})
+            assert mock_render.call_count == 3
+
+            # Updating the cache invalidates the memoized strings
+            cache.update({'el': (True, {u'Table': {'string': u'Τραπεζάκι'}})})
+            assert mytx.translate(u'Table', 'el') == u'Τραπεζάκι'
+            assert mock_render.call_count == 4
+
+    @patch('transifex.native.core.StringRenderer.render')
+    def test_render_cache_requires_versioned_cache(self, mock_render):
+        mock_render.return_value = u'rendered'
+        cache = MagicMock()
+        cache.version = None
+        mytx = self._get_tx(cache=cache, render_cache_size=10)
+        mytx.translate(u'My String', 'el')
+        mytx.translate(u'My String', 'el')
+        assert mock_render.call_count == 2
+
+    def test_translate_many(self):
+        cache = MemoryCache()
+        cache.update({
+            'el': (True, {
+                u'Table': {'string': u'Τραπέζι'},
+                generate_hashed_key(u'Hello {name}'): {
+                    'string': u'Γεια σου {name}',
+                },
+                u'Chair::furniture': {'string': u'Καρέκλα'},
+                u'custom': {'string': u'Προσαρμοσμένο'},
+                generate_key(u'{cnt, plural, one {duck} other {ducks}}'): {
+                    'string': u'{???, plural, one {παπί} other {παπιά}}',
+                },
+            }),
+        })
+        mytx = self._get_tx(cache=cache, render_cache_size=10)
+        items = [
+            (u'Table', None, None, None),
+            (u'Hello {name}', {'name': u'<b>'}, None, None),
+            (u'Chair', {}, u'furniture', None),
+            (u'Whatever', None, None, u'custom'),
+            (u'{cnt, plural, one {duck} other {ducks}}', {'cnt': 2}, None,
+             None),
+            (u'Missing', None, None, None),
+        ]
+        expected = [
+            u'Τραπέζι', u'Γεια σου <b>', u'Καρέκλα', u'Προσαρμοσμένο',
+            u'παπιά', u'Missing',
+        ]
+        assert mytx.translate_many(items, 'el') == expected
+        assert [
+            mytx.translate(source_string, 'el', _context=_context,
+                           params=params, _key=_key)
+            for source_string, params, _context, _key in items
+        ] == expected
+        # Served from the memoized rendered strings the second time
+        with patch('transifex.native.core.MemoryCache.get_many',
+                   wraps=cache.get_many) as mock_get_many:
+            assert mytx.translate_many(items, 'el') == expected
+            assert len(mock_get_many.call_args[0][0]) == 2
+
+    def test_translate_many_source_language(self):
+        mytx = self._get_tx()
+        assert mytx.translate_many(
+            [(u'<b>{cnt} ducks</b>', {'cnt': 2}, None, None)], 'en',
+            is_source=True, escape=False,
+        ) == [u'<b>2 ducks</b>']
+        with pytest.raises(ValueError):
+            mytx.translate_many([(u'', None, None, None)], 'en')
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_lazy_languages_are_fetched_on_first_use(self, mock_cds):
+        mock_cds.return_value = {
+            'el': (True, {generate_hashed_key('hello'): {'string': u'γεια'}}),
+        }
+        mytx = self._get_tx(lazy_languages=True)
+        mytx.fetch_translations()
+        assert mock_cds.call_count == 0
+
+        assert mytx.translate(u'hello', 'el') == u'γεια'
+        mock_cds.assert_called_once_with(language_code='el')
+        assert mytx.translate(u'hello', 'el') == u'γεια'
+        assert mytx.translate_many([(u'hello', None, None, None)], 'el') == \
+            [u'γεια']
+        assert mock_cds.call_count == 1
+
+        # Only the requested languages are refreshed
+        mock_cds.reset_mock()
+        mytx.fetch_translations()
+        mock_cds.assert_called_once_with(language_codes=['el'], failed=set())
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_lazy_languages_are_fetched_once_concurrently(self, mock_cds):
+        def fetch(language_code):
+            time.sleep(0.05)
+            return {language_code: (True, {
+                generate_hashed_key('hello'): {'string': u'γεια'},
+            })}
+
+        mock_cds.side_effect = fetch
+        mytx = self._get_tx(lazy_languages=True)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(mytx.translate(u'hello', 'el'))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [u'γεια'] * 8
+        assert mock_cds.call_count == 1
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_shared_cache_is_fetched_once(self, mock_cds, tmpdir):
+        mock_cds.return_value = {
+            'el': (True, {generate_hashed_key('hello'): {'string': u'γεια'}}),
+        }
+        workers = [
+            self._get_tx(cache=SharedFileCache(str(tmpdir)))
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.fetch_translations()
+        assert mock_cds.call_count == 1
+        for worker in workers:
+            assert worker.translate(u'hello', 'el') == u'γεια'
+
+    @responses.activate
+    def test_persistent_etags(self, tmpdir):
+        cds_url = TRANSIFEX_CDS_HOST + '/content/el'
+        responses.add(
+            responses.GET, TRANSIFEX_CDS_HOST + '/languages',
+            json={'data': [{'code': 'el'}]},
+        )
+        responses.add(
+            responses.GET, cds_url, headers={'ETag': 'etag_el'},
+            json={'data': {
+                generate_hashed_key('hello'): {'string': u'γεια'},
+            }},
+        )
+        mytx = self._get_tx(cache=FileCache(str(tmpdir)))
+        assert isinstance(mytx._cds_handler.etags, FileEtagStore)
+        mytx.fetch_translations()
+        assert mytx.translate(u'hello', 'el') == u'γεια'
+
+        # A restarted process only asks for translations that have changed
+        responses.replace(responses.GET, cds_url, status=304)
+        mytx = self._get_tx(cache=FileCache(str(tmpdir)))
+        mytx.fetch_translations()
+        assert responses.calls[-1].request.headers['If-None-Match'] == \
+            'etag_el'
+        assert mytx.translate(u'hello', 'el') == u'γεια'
+
+    @responses.activate
+    def test_persistent_etags_of_other_processes(self, tmpdir):
+        cds_url = TRANSIFEX_CDS_HOST + '/content/el'
+        responses.add(
+            responses.GET, TRANSIFEX_CDS_HOST + '/languages',
+            json={'data': [{'code': 'el'}]},
+        )
+        responses.add(responses.GET, cds_url, status=304)
+        # Both processes fetch on every refresh
+        for make_cache in (
+            FileCache, lambda path: SharedFileCache(path, fetch_interval=0),
+        ):
+            path = str(tmpdir.mkdir(str(len(tmpdir.listdir()))))
+            responses.replace(
+                responses.GET, cds_url, headers={'ETag': 'etag_old'},
+                json={'data': {
+                    generate_hashed_key('hello'): {'string': u'old'},
+                }},
+            )
+            first = self._get_tx(cache=make_cache(path))
+            first.fetch_translations()
+            second = self._get_tx(cache=make_cache(path))
+            assert second.translate(u'hello', 'el') == u'old'
+
+            # The first process refreshes the translations...
+            responses.replace(
+                responses.GET, cds_url, headers={'ETag': 'etag_new'},
+                json={'data': {
+                    generate_hashed_key('hello'): {'string': u'new'},
+                }},
+            )
+            first.fetch_translations()
+
+            # ...so the second one is told that nothing has changed, but
+            # serves the translations that the new ETag refers to
+            responses.replace(responses.GET, cds_url, status=304)
+            second.fetch_translations()
+            assert responses.calls[-1].request.headers['If-None-Match'] == \
+                'etag_new'
+            assert second.translate(u'hello', 'el') == u'new'
+
+    @responses.activate
+    def test_stream_translations(self, tmpdir):
+        responses.add(
+            responses.GET, TRANSIFEX_CDS_HOST + '/languages',
+            json={'data': [{'code': 'el'}]},
+        )
+        responses.add(
+            responses.GET, TRANSIFEX_CDS_HOST + '/content/el',
+            json={'data': {
+                generate_hashed_key('hello'): {'string': u'γεια'},
+                'source::context': {'string': u'πηγή'},
+            }},
+        )
+        mytx = self._get_tx(lazy_languages=True, stream_translations=True)
+        assert mytx.translate(u'hello', 'el') == u'γεια'
+        assert mytx.translate(u'source', 'el', _context='context') == u'πηγή'
+
+        path = str(tmpdir.join('bundle.json.gz'))
+        assert mytx.save_bundle(path) == (['el'], [])
+        mytx = self._get_tx(bundle=path)
+        assert mytx.translate(u'hello', 'el') == u'γεια'
+
+    def test_save_and_load_bundle(self, tmpdir):
+        path = str(tmpdir.join('bundle.json.gz'))
+
+        def fetch(handler, *args, **kwargs):
+            # The translations are downloaded regardless of known ETags
+            assert handler.etags.get('el') == ''
+            handler.etags.set('el', 'etag_el')
+            return {
+                'el': (True, {
+                    generate_hashed_key('hello'): {'string': u'γεια'},
+                }),
+                'en': (False, {}),
+            }
+
+        with patch('transifex.native.core.CDSHandler.fetch_translations',
+                   autospec=True, side_effect=fetch) as mock_fetch:
+            mytx = self._get_tx()
+            mytx._cds_handler.etags.set('el', 'stale_etag')
+            assert mytx.save_bundle(path) == (['el'], ['en'])
+            assert mytx._cds_handler.etags.get('el') == 'stale_etag'
+
+            mock_fetch.reset_mock()
+            mytx = self._get_tx(bundle=path)
+            assert mock_fetch.call_count == 0
+            assert mytx.translate(u'hello', 'el') == u'γεια'
+            assert mytx._cds_handler.etags.get('el') == 'etag_el'
+
+    def test_load_bundle_into_persistent_cache(self, tmpdir):
+        path = str(tmpdir.join('cache'))
+        key = generate_hashed_key('hello')
+        cache = FileCache(path)
+        cache.update({'el': (True, {key: {'string': u'fresh'}})})
+        etags = cache.get_etag_store()
+        etags.set('el', 'etag-new')
+        etags.save()
+
+        bundle_path = str(tmpdir.join('bundle.json.gz'))
+        write_bundle(bundle_path, {
+            'el': {key: {'string': u'stale'}},
+            'fr': {key: {'string': u'bonjour'}},
+        }, {'el': 'etag-old', 'fr': 'etag-fr'})
+
+        # The restarted process keeps the newer content of the cache and
+        # only seeds the languages it does not hold
+        cache = FileCache(path)
+        mytx = self._get_tx(cache=cache, bundle=bundle_path)
+        assert mytx.translate(u'hello', 'el') == u'fresh'
+        assert mytx._cds_handler.etags.get('el') == 'etag-new'
+        assert cache.get(key, 'fr') == u'bonjour'
+        assert mytx._cds_handler.etags.get('fr') == 'etag-fr'
+        with open(os.path.join(path, 'etags.json')) as f:
+            assert json.load(f) == {'el': 'etag-new', 'fr': 'etag-fr'}
+
+    @patch('transifex.native.cache.logger')
+    def test_corrupted_snapshots_render_source_strings(self, mock_logger,
+                                                       tmpdir):
+        # A valid header, followed by slots that are all taken
+        tmpdir.join('el.txs').write(
+            HEADER.pack(MAGIC, 0, 8) + SLOT.pack(0, 0, 0, 0, 0) * 8,
+            mode='wb',
+        )
+        mytx = self._get_tx(cache=FileCache(str(tmpdir)))
+        assert mytx.translate(u'hello', 'el') == u'hello'
+        assert mytx.translate_many(
+            [(u'hello', None, None, None)], 'el',
+        ) == [u'hello']
+        assert mock_logger.error.call_count == 1
+
+    @patch('transifex.native.core.logger')
+    def test_load_missing_bundle(self, mock_logger, tmpdir):
+        mytx = self._get_tx(bundle=str(tmpdir.join('missing.json.gz')))
+        assert mytx.initialized
+        assert mock_logger.error.call_count == 1
+        assert mytx.translate(u'hello', 'el') == u'hello'
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_fetch_translations_timeout(self, mock_cds):
+        mytx = self._get_tx()
+        assert not mytx.translations_ready.is_set()
+        mytx.fetch_translations(timeout=5)
+        deadline = mock_cds.call_args[1]['deadline']
+        assert time.time() < deadline <= time.time() + 5
+        assert mytx.translations_ready.is_set()
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_failed_languages_do_not_make_translations_ready(self, mock_cds):
+        def fetch(failed, **kwargs):
+            # E.g. the timeout was reached before `el` was fetched
+            failed.add('el')
+            return {'el': (False, {})}
+
+        mock_cds.side_effect = fetch
+        mytx = self._get_tx()
+        mytx.fetch_translations(timeout=5)
+        assert not mytx.translations_ready.is_set()
+
+        mock_cds.side_effect = None
+        mock_cds.return_value = {'el': (False, {})}
+        mytx.fetch_translations(timeout=5)
+        assert mytx.translations_ready.is_set()
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_fetch_translations_in_background(self, mock_cds):
+        fetching = threading.Event()
+
+        def fetch(**kwargs):
+            fetching.wait(5)
+            return {'el': (True, {
+                generate_hashed_key('hello'): {'string': u'γεια'},
+            })}
+
+        mock_cds.side_effect = fetch
+        callback = MagicMock()
+        mytx = self._get_tx()
+        thread = mytx.fetch_translations_in_background(callback=callback)
+        # Source strings are served until translations are fetched
+        assert mytx.translate(u'hello', 'el') == u'hello'
+        assert not mytx.translations_ready.is_set()
+
+        fetching.set()
+        assert mytx.translations_ready.wait(5)
+        thread.join(5)
+        callback.assert_called_once_with(None)
+        assert mytx.translate(u'hello', 'el') == u'γεια'
+
+    @patch('transifex.native.core.logger')
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_fetch_translations_in_background_errors(self, mock_cds,
+                                                     mock_logger):
+        error = ValueError()
+        mock_cds.side_effect = error
+        callback = MagicMock()
+        mytx = self._get_tx()
+        mytx.fetch_translations_in_background(callback=callback).join(5)
+        assert mock_logger.exception.call_count == 1
+        # Failing to fetch does not make translations ready
+        assert not mytx.translations_ready.is_set()
+        callback.assert_called_once_with(error)
+
+    def test_warm_up(self):
+        StringRenderer.invalidate()
+        mytx = self._get_tx()
+        mytx._cache.update({'el': (True, {
+            'plain': {'string': u'Τραπέζι'},
+            'simple': {'string': u'<b>{cnt}</b> τραπέζια'},
+            # Plurals are served by the CDS without their variable
+            'plural': {'string': u'{???, plural, one {Ένα} other {Πολλά}}'},
+            'broken': {'string': u'{???, plural, one {'},
+        })})
+        with patch('transifex.native.core.logger') as mock_logger:
+            assert mytx.warm_up(['el']) == [
+                ('el', u'{???, plural, one {'),
+            ]
+            assert mock_logger.warning.call_count == 1
+        assert set(compiled_templates._data) == {
+            (u'<b>{cnt}</b> τραπέζια', 'el'),
+            (u'&lt;b&gt;{cnt}&lt;/b&gt; τραπέζια', 'el'),
+            (u'{???, plural, one {Ένα} other {Πολλά}}', 'el'),
+            (u'{???, plural, one {', 'el'),
+        }
+        # Plurals are rendered with the variable of their source string,
+        # and broken templates through the error policy, without being
+        # parsed again
+        with patch('pyseeyou.grammar.ICUMessageFormat.parse') as mock_parse:
+            assert mytx.translate(
+                u'{num, plural, one {Table} other {Tables}}', 'el',
+                _key='plural', params={'num': 2},
+            ) == u'Πολλά'
+            assert mytx.translate(u'{cnt} tables', 'el', _key='broken',
+                                  params={'cnt': 1}) == u'1 tables'
+            assert mock_parse.call_count == 0
+        StringRenderer.invalidate()
+
+    def test_warm_up_is_limited_by_template_cache_share(self):
+        mytx = self._get_tx()
+        mytx._cache.update({'el': (True, {
+            'key{}'.format(i): {'string': u'{{cnt}} {}'.format(i)}
+            for i in range(10)
+        })})
+        try:
+            compiled_templates.resize(4)
+            StringRenderer.invalidate()
+            with patch('transifex.native.core.StringRenderer.compile') as \
+                    mock_compile:
+                mytx.warm_up(['el'])
+                # Half of the cache is left to the templates in use
+                assert mock_compile.call_count == 2
+        finally:
+            compiled_templates.resize(4096)
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_warm_up_after_fetch(self, mock_cds):
+        mock_cds.return_value = {'el': (True, {
+            'key': {'string': u'{???, plural, one {Ένα} other {Πολλά}}'},
+        })}
+        StringRenderer.invalidate()
+        mytx = self._get_tx(warmup=True)
+        with patch.object(mytx, 'warm_up',
+                          wraps=mytx.warm_up) as mock_warm_up:
+            mytx.fetch_translations()
+            for _ in range(500):
+                if mytx._warmup_thread is None:
+                    break
+                time.sleep(0.01)
+            # Only the languages with fresh content are warmed up
+            mock_warm_up.assert_called_once_with(['el'])
+        # The template is compiled in the form it is rendered in
+        with patch('pyseeyou.grammar.ICUMessageFormat.parse') as mock_parse:
+            assert StringRenderer.format_template(
+                u'{cnt, plural, one {Ένα} other {Πολλά}}', {'cnt': 1}, 'el',
+            ) == u'Ένα'
+            assert mock_parse.call_count == 0
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_no_warm_up_without_changes(self, mock_cds):
+        mock_cds.return_value = {'el': (False, {}), 'en': (False, {})}
+        mytx = self._get_tx(warmup=True)
+        with patch.object(mytx, 'warm_up') as mock_warm_up:
+            mytx.fetch_translations()
+            assert mytx._warmup_thread is None
+            assert mock_warm_up.call_count == 0
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_invalid_translations_reach_error_policy(self, mock_cds):
+        mock_cds.return_value = {'el': (True, {
+            generate_hashed_key(u'{cnt} tables'): {
+                'string': u'{cnt, plural, one {',
+            },
+            generate_hashed_key(u'{cnt} chairs'): {
+                'string': u'{cnt} καρέκλες',
+            },
+        })}
+        mytx = self._get_tx()
+        with patch('transifex.native.core.logger') as mock_logger:
+            mytx.fetch_translations()
+            assert mock_logger.warning.call_count == 1
+        assert mytx._invalid_templates == {
+            'el': frozenset([u'{???, plural, one {']),
+        }
+
+        with patch('transifex.native.core.StringRenderer.render',
+                   wraps=StringRenderer.render) as mock_render:
+            for _ in range(3):
+                assert mytx.translate(u'{cnt} tables', 'el',
+                                      params={'cnt': 2}) == u'2 tables'
+            # Only the error policy renders the source string
+            assert all(
+                call[1]['string_to_render'] == u'{cnt} tables'
+                for call in mock_render.call_args_list
+            )
+            assert mytx.translate(u'{cnt} chairs', 'el',
+                                  params={'cnt': 2}) == u'2 καρέκλες'
+
+        # Translations are validated again only when they change
+        with patch.object(mytx, 'validate') as mock_validate:
+            mock_cds.return_value = {'el': (False, {})}
+            mytx.fetch_translations()
+            assert mock_validate.call_count == 0
+            mock_cds.return_value = {'el': (True, {})}
+            mytx.fetch_translations()
+            # Only the refreshed languages are validated
+            mock_validate.assert_called_once_with(['el'])
+        mytx.validate(['el'])
+        assert mytx._invalid_templates == {}
+
+    @patch('transifex.native.core.CDSHandler.fetch_translations')
+    def test_validate_cds_plurals(self, mock_cds):
+        mock_cds.return_value = {'el': (True, {
+            generate_hashed_key(u'{cnt, plural, one {table} other {tables}}'): {
+                'string': u'{???, plural, one {τραπέζι} other {τραπέζια}}',
+            },
+            generate_hashed_key(u'{num, plural, one {chair} other {chairs}}'): {
+                'string': u'{???, plural, one {',
+            },
+        })}
+        mytx = self._get_tx()
+        with patch('transifex.native.core.logger') as mock_logger:
+            mytx.fetch_translations()
+            # Only the broken plural is reported
+            assert mock_logger.warning.call_count == 1
+        assert mytx._invalid_templates == {
+            'el': frozenset([u'{???, plural, one {']),
+        }
+
+        assert mytx.translate(
+            u'{cnt, plural, one {table} other {tables}}', 'el',
+            params={'cnt': 2},
+        ) == u'τραπέζια'
+        with patch('transifex.native.core.StringRenderer.render',
+                   wraps=StringRenderer.render) as mock_render:
+            assert mytx.translate(
+                u'{num, plural, one {chair} other {chairs}}', 'el',
+                params={'num': 2},
+            ) == u'chairs'
+            # The finalized translation is passed to the error policy
+            # without rendering it
+            assert all(
+                call[1]['string_to_render'] ==
+                u'{num, plural, one {chair} other {chairs}}'
+                for call in mock_render.call_args_list
+            )
@@ -1,3 +1,4 @@
+import threading
 import time
 
 from mock import patch
@@ -54,3 +55,52 @@ class TestFetchingDaemon(object):
             'Fetching daemon exception: Something went wrong'
         )
         daemon.stop_daemon()
+
+    @patch('transifex.native.daemon.time.sleep')
+    @patch('transifex.native.daemon.tx')
+    def test_daemon_delay(self, patched_tx, patched_sleep):
+        daemon = DaemonicThread()
+        fetches = []
+
+        def sleep(seconds):
+            fetches.append(patched_tx.fetch_translations.call_count)
+            if len(fetches) == 2:
+                daemon.should_exit = True
+
+        patched_sleep.side_effect = sleep
+        daemon.start_daemon(interval=1, delay=5)
+        daemon.join(5)
+
+        # Nothing is fetched before the initial delay
+        assert [c[0][0] for c in patched_sleep.call_args_list] == [5, 1]
+        assert fetches == [0, 1]
+
+    @patch('transifex.native.daemon.time.sleep')
+    @patch('transifex.native.daemon.tx')
+    def test_daemon_waits_for_startup_fetch(self, patched_tx, patched_sleep):
+        for ready, sleeps in ((True, [5, 1]), (False, [1])):
+            daemon = DaemonicThread()
+            fetching = threading.Event()
+            startup_fetch = threading.Thread(target=fetching.wait, args=(5,))
+            startup_fetch.start()
+            patched_tx.reset_mock()
+            patched_tx.translations_ready.is_set.return_value = ready
+
+            def sleep(seconds):
+                if seconds == 1:
+                    daemon.should_exit = True
+
+            patched_sleep.reset_mock()
+            patched_sleep.side_effect = sleep
+            daemon.start_daemon(
+                interval=1, delay=5, startup_fetch=startup_fetch,
+            )
+            # Nothing is fetched while translations are fetched at startup
+            daemon.join(0.05)
+            assert patched_tx.fetch_translations.call_count == 0
+            fetching.set()
+            daemon.join(5)
+
+            # The delay is skipped if the startup fetch did not succeed
+            assert [c[0][0] for c in patched_sleep.call_args_list] == sleeps
+            assert patched_tx.fetch_translations.call_count == 1
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
+
+# Dependencies that should only be imported when they are first used
+DEFERRED_MODULES = ('requests', 'pyseeyou', 'parsimonious', 'pytz', 'sqlite3')
+
+# `-X importtime` is ignored by older versions
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason='requires -X importtime',
+)
+
+
+def measure(module):
+    """Import the given module in a fresh interpreter.
+
+    :param str module: the module to import
+    :return: a tuple of the cumulative import time of the module, in
+        milliseconds, and the names of all modules imported
+    :rtype: tuple
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.STDOUT, cwd=ROOT,
+    ).decode('utf-8')
+    cumulative, imported = None, set()
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total, name = [
+            part.strip() for part in line[len('import time:'):].split('|')
+        ]
+        imported.add(name)
+        if name == module:
+            cumulative = int(total) / 1000.0
+    return cumulative, imported
+
+
+def test_heavy_dependencies_are_deferred():
+    for module in ('transifex.native',
+                   'transifex.native.django.templatetags.utils'):
+        cumulative, imported = measure(module)
+        assert cumulative is not None, module
+        assert not imported & set(DEFERRED_MODULES), module
+
+
+@pytest.mark.skipif(
+    not os.environ.get('TRANSIFEX_IMPORT_TIME_BUDGET'),
+    reason='set TRANSIFEX_IMPORT_TIME_BUDGET (in ms) to check import time',
+)
+def test_import_time_budget():
+    # Best of three runs, to smooth out noise
+    best = min(measure('transifex.native')[0] for _ in range(3))
+    assert best < float(os.environ['TRANSIFEX_IMPORT_TIME_BUDGET'])
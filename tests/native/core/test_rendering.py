@@ -1,11 +1,20 @@
 # -*- coding: utf-8 -*-
+import random
+import xml.sax.saxutils as saxutils
+
 import pytest
 from mock import patch
-from transifex.native.rendering import (ChainedPolicy, ExtraLengthPolicy,
+from pyseeyou import format
+from pyseeyou.grammar import ICUMessageFormat
+from transifex.native.core import TxNative
+from transifex.native.rendering import (TEMPLATE_CACHE_SIZE, ChainedPolicy,
+                                        ExtraLengthPolicy,
                                         PseudoTranslationPolicy,
                                         SourceStringErrorPolicy,
-                                        SourceStringPolicy, StringRenderer,
-                                        WrappedStringPolicy)
+                                        SimpleTemplate, SourceStringPolicy,
+                                        StringRenderer, WrappedStringPolicy,
+                                        compiled_templates, html_escape,
+                                        logged_errors, throttle_error)
 from transifex.native.settings import parse_rendering_policy
 
 COMPLEX_STRINGS = u"""{gender_of_host, select,
@@ -274,3 +283,233 @@ class TestParsing(object):
         assert parsed._policies[2].__dict__ == {
             'extra_percentage': 0.5, 'extra_str': 'foo',
         }
+
+
+class TestCompiledTemplates(object):
+    """Tests the compiled template cache of the StringRenderer class."""
+
+    def setup_method(self):
+        StringRenderer.invalidate()
+
+    def test_template_is_parsed_once(self):
+        with patch('pyseeyou.grammar.ICUMessageFormat.parse',
+                   side_effect=ICUMessageFormat.parse) as mock_parse:
+            self._render_three_times()
+        assert mock_parse.call_count == 1
+        info = StringRenderer.cache_info()
+        assert info['hits'] == 2
+        assert info['misses'] == 1
+        assert info['currsize'] == 1
+
+    def _render_three_times(self):
+        for _ in range(3):
+            translation = StringRenderer.render(
+                u'{cnt, plural, one {One table} other {# tables}}',
+                u'{cnt, plural, one {Ένα τραπέζι} other {# τραπέζια}}',
+                'el', escape=False, missing_policy=SourceStringPolicy(),
+                params={'cnt': 2},
+            )
+            assert translation == u'2 τραπέζια'
+
+    def test_invalid_template_is_parsed_once(self):
+        with patch('pyseeyou.grammar.ICUMessageFormat.parse',
+                   side_effect=ICUMessageFormat.parse) as mock_parse:
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    StringRenderer.compile(u'{cnt, plural, one {', 'en')
+        assert mock_parse.call_count == 1
+
+    def test_invalidate_language(self):
+        StringRenderer.compile(u'Hello', 'en')
+        StringRenderer.compile(u'Γεια', 'el')
+        StringRenderer.invalidate(['el'])
+        assert set(compiled_templates._data) == {(u'Hello', 'en')}
+
+    def test_resize_from_init(self):
+        mytx = TxNative()
+        mytx.init(['en'], 'token', template_cache_size=1)
+        try:
+            StringRenderer.compile(u'One', 'en')
+            StringRenderer.compile(u'Two', 'en')
+            assert StringRenderer.cache_info()['currsize'] == 1
+        finally:
+            compiled_templates.resize(TEMPLATE_CACHE_SIZE)
+
+
+class TestFastPathRendering(object):
+    """Tests that the fast paths of StringRenderer.format_template() render
+    exactly like the ICU formatter."""
+
+    TEMPLATES = [
+        u'', u' ', u'Hello', u"It's", u"It''s", u'a # b', u'a\\b',
+        u'line\nbreak', u'tab\t', u'é ü 中', u'&#x27;a&amp;&lt;',
+        u'{name}', u'Hi {name}!', u'{ name }', u'{\tname\n}', u'{name}{other}',
+        u'{name} and {name}', u'{ñ}', u'{x²}', u'{x½}', u'{name_2}', u'{1}',
+        u"'{name}'", u"a '' {name}", u'{name} # x', u'#{name}#', u'{missing}',
+        u'{na-me}', u'{}', u'{ }', u'x}', u'{x', u'}{', u'{{name}}',
+        u'{name, number}', u'{name, select, J {Jay} other {Other}}',
+        u'{cnt, plural, one {# table} other {# tables}}',
+        u'Hi {name}, {cnt, plural, =0 {none} other {# left}}',
+        u'{ cnt\t, plural, one {# table} other {{cnt} tables}}',
+        u'{name, select, J {{name}!} other {{other}}} {cnt}',
+        u'{???, plural, one {# table} other {# tables}}',
+        u'{???, select, J {Jay} other {Other}}',
+        COMPLEX_STRINGS,
+    ]
+
+    PARAMS = [
+        {},
+        {'name': u'J', 'other': 3, u'ñ': u'x', u'x²': 2, u'x½': 0.5,
+         'name_2': 'y', '1': 'o',
+         'cnt': 1, 'gender_of_host': 'female', 'total_guests': 3,
+         'host': 'Ann', 'guest': 'Bob'},
+        {'name': None, 'other': 0.5, 'cnt': 0},
+        {'name': 2.50, 'other': True, 'cnt': 5},
+        {'name': [u'a'], 'other': {'b': 1}, 'cnt': 1.5},
+        {'name': u'<b>"quoted"</b>', 'other': b'bytes', 'cnt': -1},
+    ]
+
+    def setup_method(self):
+        StringRenderer.invalidate()
+
+    def _assert_same_output(self, template, params, language_code='en'):
+        try:
+            expected = format(template, params, language_code)
+        except Exception:
+            with pytest.raises(Exception):
+                StringRenderer.format_template(template, params, language_code)
+        else:
+            result = StringRenderer.format_template(
+                template, params, language_code,
+            )
+            assert type(result) == type(expected)
+            assert result == expected, (template, params)
+
+    def test_known_templates(self):
+        for template in self.TEMPLATES:
+            for params in self.PARAMS:
+                # Render twice, to exercise both the classification and
+                # the compiled template
+                self._assert_same_output(template, params)
+                self._assert_same_output(template, params)
+                self._assert_same_output(html_escape(template), params)
+
+    def test_random_templates(self):
+        alphabet = u'ab _-#\'"{}{}{}\n\té中1,²'
+        rand = random.Random(1234)
+        params = dict(self.PARAMS[1], a=u'A', b=u'B', ab=u'AB', a1=u'A1')
+        params.update({u'a²': u'A2', u'b²': u'B2'})
+        for _ in range(2000):
+            template = u''.join(
+                rand.choice(alphabet)
+                for _ in range(rand.randint(0, 12))
+            )
+            self._assert_same_output(template, params)
+
+    def test_classification(self):
+        StringRenderer.format_template(u'Plain', {}, 'en')
+        assert StringRenderer.cache_info()['currsize'] == 0
+
+        compiled = StringRenderer.compile(u'Hi {name} and { other }', 'en')
+        assert isinstance(compiled, SimpleTemplate)
+        assert compiled.texts == [u'Hi ', u' and ', u'']
+        assert compiled.names == [u'name', u'other']
+
+        compiled = StringRenderer.compile(u'{\t\r\nname\n}', 'en')
+        assert isinstance(compiled, SimpleTemplate)
+        # Whitespace other than the ASCII one is left to the ICU grammar
+        for template in (u'{a\x1c}', u'{\x1ca}', u'{a\xa0}'):
+            assert SimpleTemplate.parse(template) is None
+            self._assert_same_output(template, {'a': u'A'})
+
+        compiled = StringRenderer.compile(
+            u'{cnt, plural, one {# table} other {# tables}}', 'en',
+        )
+        assert not isinstance(compiled, SimpleTemplate)
+
+    def test_leading_argument_is_compiled_once(self):
+        cds_template = u'{???, plural, one {# table} other {{cnt} tables}}'
+        StringRenderer.compile(cds_template, 'en')
+        with patch('pyseeyou.grammar.ICUMessageFormat.parse') as mock_parse:
+            for name in ('cnt', 'num'):
+                template = u'{' + name + cds_template[4:]
+                assert StringRenderer.format_template(
+                    template, {name: 2, 'cnt': 2}, 'en',
+                ) == u'2 tables'
+            assert mock_parse.call_count == 0
+        assert StringRenderer.cache_info()['currsize'] == 1
+
+    @patch('pyseeyou.format_tree')
+    def test_icu_formatter_only_used_for_icu_constructs(self, mock_format):
+        StringRenderer.format_template(u'Plain', {}, 'en')
+        StringRenderer.format_template(u'Hi {name}', {'name': 'J'}, 'en')
+        assert mock_format.call_count == 0
+        StringRenderer.format_template(
+            u'{cnt, plural, one {# table} other {# tables}}', {'cnt': 1}, 'en',
+        )
+        assert mock_format.call_count == 1
+
+
+def test_html_escape_matches_saxutils():
+    for item in [u'', u'plain', u'<a href="x">Tom & Jerry\'s</a>', u'&amp;',
+                 u'"\'<>&']:
+        assert html_escape(item) == saxutils.escape(
+            item, {'"': "&quot;", "'": "&#x27;"},
+        )
+    assert html_escape(5) == 5
+
+
+class TestErrorLogging(object):
+    """Tests the throttling of rendering error logs."""
+
+    def setup_method(self):
+        logged_errors.clear()
+
+    def test_throttle_error(self):
+        with patch('transifex.native.rendering.time.time') as mock_time:
+            mock_time.return_value = 1000
+            assert throttle_error(('key',)) == 0
+            assert throttle_error(('key',)) is None
+            assert throttle_error(('key',)) is None
+            assert throttle_error(('other',)) == 0
+            mock_time.return_value = 1060
+            assert throttle_error(('key',)) == 2
+            assert throttle_error(('key',)) is None
+
+    @patch('transifex.native.rendering.logger')
+    def test_render_errors_are_logged_once(self, mock_logger):
+        for _ in range(3):
+            with pytest.raises(Exception):
+                StringRenderer.render(
+                    u'{cnt} tables', u'{cnt, plural, one {', 'el',
+                    escape=False, missing_policy=SourceStringPolicy(),
+                    params={'cnt': 1},
+                )
+        assert mock_logger.error.call_count == 1
+
+    def test_validate(self):
+        StringRenderer.invalidate()
+        assert StringRenderer.validate(u'Plain', 'en')
+        assert StringRenderer.validate(u'{cnt} tables', 'en')
+        assert StringRenderer.validate(
+            u'{cnt, plural, one {Table} other {Tables}}', 'en')
+        assert not StringRenderer.validate(u'{cnt, plural, one {', 'en')
+        assert not StringRenderer.validate(u'Broken }', 'en')
+        # Validated templates are not parsed again when rendered
+        with patch('pyseeyou.grammar.ICUMessageFormat.parse') as mock_parse:
+            StringRenderer.compile(
+                u'{cnt, plural, one {Table} other {Tables}}', 'en')
+            assert mock_parse.call_count == 0
+        StringRenderer.invalidate()
+
+    def test_validate_does_not_evict(self):
+        StringRenderer.invalidate()
+        try:
+            compiled_templates.resize(1)
+            StringRenderer.compile(u'{cnt} chairs', 'en')
+            assert StringRenderer.validate(u'{cnt} tables', 'en')
+            assert (u'{cnt} chairs', 'en') in compiled_templates._data
+            assert (u'{cnt} tables', 'en') not in compiled_templates._data
+        finally:
+            compiled_templates.resize(4096)
+            StringRenderer.invalidate()
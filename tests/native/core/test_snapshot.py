@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import struct
+
+import pytest
+from mock import MagicMock, patch
+from transifex.native.snapshot import (HEADER, MAGIC, SLOT, Snapshot,
+                                       SnapshotError, write_snapshot)
+
+
+class TestSnapshot(object):
+    """Tests the snapshot file format."""
+
+    def test_write_and_read(self, tmpdir):
+        path = str(tmpdir.join('el.txs'))
+        table = {
+            u'key{}'.format(i): u'Τραπέζι {}'.format(i) for i in range(100)
+        }
+        table[u''] = u'empty key'
+        write_snapshot(path, table)
+
+        snapshot = Snapshot(path)
+        assert len(snapshot) == 101
+        for key, string in table.items():
+            assert snapshot.get(key) == string
+        assert snapshot.get(u'missing') is None
+        assert snapshot.get(u'missing', u'default') == u'default'
+        assert dict(snapshot.items()) == table
+        assert tmpdir.listdir() == [tmpdir.join('el.txs')]
+
+    def test_empty_table(self, tmpdir):
+        path = str(tmpdir.join('el.txs'))
+        write_snapshot(path, {})
+        snapshot = Snapshot(path)
+        assert len(snapshot) == 0
+        assert snapshot.get(u'key') is None
+        assert list(snapshot.items()) == []
+
+    def test_replacing_keeps_open_snapshots_valid(self, tmpdir):
+        path = str(tmpdir.join('el.txs'))
+        write_snapshot(path, {u'key': u'old'})
+        old = Snapshot(path)
+        write_snapshot(path, {u'key': u'new'})
+        assert old.get(u'key') == u'old'
+        assert Snapshot(path).get(u'key') == u'new'
+
+    @pytest.mark.parametrize('content', [
+        b'', b'TXS1', b'XXXX' + b'\0' * 100, b'TXS1\0\0\0\0\x08\0\0\0',
+    ])
+    def test_malformed_files(self, tmpdir, content):
+        path = tmpdir.join('el.txs')
+        path.write(content, mode='wb')
+        with pytest.raises(SnapshotError):
+            Snapshot(str(path))
+
+    def test_full_hash_table(self, tmpdir):
+        path = tmpdir.join('el.txs')
+        # A valid header, followed by slots that are all taken
+        path.write(
+            HEADER.pack(MAGIC, 0, 8) + SLOT.pack(0, 0, 0, 0, 0) * 8,
+            mode='wb',
+        )
+        with pytest.raises(SnapshotError):
+            Snapshot(str(path)).get(u'missing')
+
+    def test_table_too_large(self, tmpdir):
+        path = str(tmpdir.join('el.txs'))
+        # Offsets beyond 4GB cannot be packed
+        slot = MagicMock(size=SLOT.size)
+        slot.pack.side_effect = struct.error('argument out of range')
+        with patch('transifex.native.snapshot.SLOT', slot):
+            with pytest.raises(SnapshotError):
+                write_snapshot(path, {u'key': u'string'})
+        assert tmpdir.listdir() == []
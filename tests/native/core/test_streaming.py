@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+from transifex.native.streaming import iter_translations
+
+DOCUMENT = {
+    'meta': {'count': 4, 'next': None, 'cursor': 12.5, 'done': True},
+    'data': {
+        'hello': {'string': u'Γεια σου'},
+        'quoted': {'string': u'"Quoted" \\ {cnt} ☃ \U0001f600'},
+        'empty': {'string': ''},
+        'no_string': {'meta': [1, 2, {'a': None}]},
+    },
+    'total': 1234567,
+}
+
+
+def chunked(content, size):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def decode(content, size=7):
+    return list(iter_translations(chunked(content, size)))
+
+
+class TestIterTranslations(object):
+    """Tests the incremental decoding of CDS responses."""
+
+    def test_chunk_boundaries(self):
+        expected = [
+            (key, entry.get('string'))
+            for key, entry in DOCUMENT['data'].items()
+        ]
+        for indent in (None, 2):
+            content = json.dumps(
+                DOCUMENT, indent=indent, ensure_ascii=False,
+            ).encode('utf-8')
+            # Every chunk size splits values, keys, escapes and multibyte
+            # characters at a different place
+            for size in range(1, 40):
+                assert decode(content, size) == expected
+
+    def test_escaped_content(self):
+        content = json.dumps(DOCUMENT).encode('utf-8')
+        assert dict(decode(content, 3))['quoted'] == \
+            DOCUMENT['data']['quoted']['string']
+
+    def test_empty_data(self):
+        assert decode(b'{"data": {}}') == []
+        assert decode(b' { "data" : { } , "meta" : 1 } \n') == []
+
+    def test_missing_data(self):
+        with pytest.raises(KeyError):
+            decode(b'{}')
+        with pytest.raises(KeyError):
+            decode(b'{"meta": {"data": {}}}')
+        with pytest.raises(KeyError):
+            decode(b'{"data": null}')
+
+    @pytest.mark.parametrize('content', [
+        b'',
+        b'[]',
+        b'{"data": {"hello": {"string": "x"}',
+        b'{"data": {"hello": {"string": "x"}}',
+        b'{"data": {"hello": {"string": "x"}}}}',
+        b'{"data": {"hello" {"string": "x"}}}',
+        b'{"data": {"hello": {"string": "x"} "bye": {}}}',
+        b'{"data": {1: {"string": "x"}}}',
+        b'{"data": {"hello": {"string": "\xff"}}}',
+        b'{"data": {"hello": {"string": "\xce"}}}',
+    ])
+    def test_malformed_content(self, content):
+        with pytest.raises(ValueError):
+            decode(content)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.cache import caches
+from mock import patch
+from transifex.common.utils import generate_hashed_key
+from transifex.native.django.cache import DjangoCache
+from transifex.native.settings import parse_cache
+
+
+class TestDjangoCache(object):
+    """Tests the functionality of the DjangoCache class."""
+
+    def setup_method(self):
+        caches['default'].clear()
+
+    def test_update_and_get(self):
+        cache = DjangoCache(batch_size=2)
+        assert cache.get('Table', 'el') is None
+        with patch.object(caches['default'], 'set_many',
+                          wraps=caches['default'].set_many) as mock_set_many:
+            cache.update({
+                'el': (True, {
+                    'Table': {'string': 'Τραπέζι'},
+                    'Chair': {'string': 'Καρέκλα'},
+                    'Sofa': {'string': ''},
+                }),
+                'fr': (False, {}),
+            })
+            # Two keys and their aliases, in batches of two
+            assert mock_set_many.call_count == 2
+        assert cache.get('Table', 'el') == 'Τραπέζι'
+        assert cache.get('Sofa', 'el') is None
+        assert cache.get('Table', 'fr') is None
+        assert cache.get_aliased(
+            'Table', generate_hashed_key('Table'), 'el',
+        ) == 'Τραπέζι'
+        assert cache.get_many(
+            [('Table', generate_hashed_key('Table')), ('Chair', None),
+             ('Sofa', None)], 'el',
+        ) == ['Τραπέζι', 'Καρέκλα', None]
+        assert cache.get_many([('Table', None)], 'fr') == [None]
+
+    def test_updates_are_shared_between_processes(self):
+        writer, reader = DjangoCache(), DjangoCache(reload_interval=3600)
+        writer.update({'el': (True, {'Table': {'string': 'Τραπέζι'}})})
+        assert reader.get('Table', 'el') == 'Τραπέζι'
+        version = reader.version
+
+        writer.update({'el': (True, {'Table': {'string': 'Τραπεζάκι'}})})
+        # Published versions are picked up once per reload interval
+        assert reader.get('Table', 'el') == 'Τραπέζι'
+        reader.reload()
+        assert reader.version == version + 1
+        assert reader.get('Table', 'el') == 'Τραπεζάκι'
+
+    def test_has_language(self):
+        writer, reader = DjangoCache(), DjangoCache(reload_interval=3600)
+        assert not reader.has_language('el')
+        writer.update({'el': (True, {'Table': {'string': 'Τραπέζι'}})})
+        # Languages published by other processes are held as well
+        assert reader.has_language('el')
+        assert not reader.has_language('fr')
+
+    def test_obsolete_versions_are_deleted(self):
+        cache = DjangoCache()
+        for string in ('first', 'second', 'third'):
+            cache.update({'el': (True, {'Table': {'string': string}})})
+        first, second, third = [
+            cache._make_translation_key('el', version, 'Table')
+            for version in (1, 2, 3)
+        ]
+        assert caches['default'].get(first) is None
+        assert caches['default'].get(second) == 'second'
+        assert caches['default'].get(third) == 'third'
+
+    def test_removed_strings_are_deleted(self):
+        cache = DjangoCache(batch_size=1)
+        cache.update({'el': (True, {
+            'Table': {'string': 'Τραπέζι'}, 'Chair': {'string': 'Καρέκλα'},
+        })})
+        cache.update({'el': (True, {'Table': {'string': 'Τραπέζι'}})})
+        cache.update({'el': (True, {'Table': {'string': 'Τραπέζι'}})})
+        assert caches['default'].get(
+            cache._make_translation_key('el', 1, 'Chair'),
+        ) is None
+        assert caches['default'].get(
+            cache._make_translation_key('el', 1, 'Table'),
+        ) is None
+        # The key lists of the deleted version are deleted as well
+        assert caches['default'].get(cache._make_key('el', 1, 'keys')) is None
+        assert caches['default'].get(
+            cache._make_key('el', 1, 'keys', 0),
+        ) is None
+        assert caches['default'].get(cache._make_key('el', 2, 'keys')) == 2
+
+    def test_concurrent_updates_are_published(self):
+        first, second = DjangoCache(), DjangoCache()
+        lock_key = first._make_key('versions', 'lock')
+        caches['default'].add(lock_key, 'other', timeout=None)
+
+        def release(seconds):
+            # Another process publishes its update in the meantime
+            caches['default'].delete(lock_key)
+            second.update({'fr': (True, {'Table': {'string': 'Table'}})})
+
+        with patch('transifex.native.django.cache.time.sleep',
+                   side_effect=release) as mock_sleep:
+            first.update({'el': (True, {'Table': {'string': 'Τραπέζι'}})})
+            assert mock_sleep.call_count == 1
+        assert caches['default'].get(lock_key) is None
+        first.reload()
+        assert first.get('Table', 'el') == 'Τραπέζι'
+        assert first.get('Table', 'fr') == 'Table'
+
+    def test_fetch_lock(self):
+        leader, follower = DjangoCache(), DjangoCache()
+        with leader.fetch_lock() as should_fetch:
+            assert should_fetch
+            leader.update({'el': (True, {'Table': {'string': 'Τραπέζι'}})})
+        with follower.fetch_lock() as should_fetch:
+            assert not should_fetch
+        assert follower.get('Table', 'el') == 'Τραπέζι'
+
+    def test_parse_from_settings(self):
+        cache = parse_cache((
+            'transifex.native.django.cache.DjangoCache',
+            {'alias': 'default', 'key_prefix': 'tx'},
+        ))
+        assert isinstance(cache, DjangoCache)
+        assert cache.key_prefix == 'tx'
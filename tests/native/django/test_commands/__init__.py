@@ -34,5 +34,8 @@ def get_transifex_command():
 
         # Invalidate
         'purge',
+
+        # Bundle
+        'output',
     )
     return command
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import mock
+from django.core.management import call_command
+from tests.native.django.test_commands import get_transifex_command
+from transifex.common.console import Color
+
+PATH_SAVE_BUNDLE = ('transifex.native.django.management.utils.bundle.tx.'
+                    'save_bundle')
+
+
+@mock.patch(PATH_SAVE_BUNDLE)
+@mock.patch('transifex.common.console.Color.echo')
+def test_bundle_success(mock_echo, mock_save_bundle):
+    mock_save_bundle.return_value = ['el', 'fr'], []
+
+    command = get_transifex_command()
+    call_command(command, 'bundle', output='/tmp/bundle.json.gz')
+    mock_save_bundle.assert_called_once_with('/tmp/bundle.json.gz')
+    expected = Color.format(
+        '[green]\nSuccessfully saved translation bundle.[end]\n'
+        '[high]File:[end] [file]/tmp/bundle.json.gz[end]\n'
+        '[high]Languages:[end] el, fr\n'
+    )
+    assert mock_echo.call_count == 2
+    assert Color.format(mock_echo.call_args_list[1][0][0]) == expected
+
+
+@mock.patch(PATH_SAVE_BUNDLE)
+@mock.patch('transifex.common.console.Color.echo')
+def test_bundle_partial_failure(mock_echo, mock_save_bundle):
+    mock_save_bundle.return_value = ['el'], ['fr']
+
+    command = get_transifex_command()
+    call_command(command, 'bundle')
+    mock_save_bundle.assert_called_once_with('transifex-bundle.json.gz')
+    expected = Color.format(
+        '[error]Could not download the translations of: fr[end]\n'
+    )
+    assert Color.format(mock_echo.call_args_list[2][0][0]) == expected
@@ -1,10 +1,12 @@
 from __future__ import unicode_literals
 
+import pytest
 from django.template import Context, Template
 from django.utils import translation
 from transifex.common.utils import generate_hashed_key, generate_key
 from transifex.native import tx
-from transifex.native.django.templatetags.utils import get_icu_keys
+from transifex.native.django.templatetags.utils import (IcuKeysVisitor,
+                                                        get_icu_keys)
 from transifex.native.rendering import SourceStringPolicy
 
 
@@ -479,3 +481,13 @@ def test_get_icu_keys():
 
     # Return empty on error
     assert get_icu_keys("{{{") == set()
+
+
+def test_icu_keys_visitor_is_deprecated():
+    from pyseeyou.grammar import ICUMessageFormat
+
+    with pytest.deprecated_call():
+        visitor = IcuKeysVisitor()
+    visitor.visit(ICUMessageFormat.parse("{gender, select, other {{user}}}"))
+    assert visitor.keys == get_icu_keys("{gender, select, other {{user}}}")
+    assert {"gender", "user"} <= visitor.keys
@@ -3,7 +3,8 @@ from __future__ import unicode_literals
 
 from mock import patch
 from transifex.common.strings import LazyString
-from transifex.native.django.utils import lazy_translate, translate
+from transifex.native.django.utils import (lazy_translate, translate,
+                                         translate_many)
 
 
 def test_translate_without_translation():
@@ -28,3 +29,19 @@ def test_lazy_translate_with_translation(mock_get_translation):
     mock_get_translation.return_value = 'Γεια σου, {user}!'
     string = lazy_translate("Doesn't matter", user='John')
     assert string == 'Γεια σου, John!'
+
+
+@patch('transifex.native.core.TxNative.translate_many')
+def test_translate_many_uses_current_locale(mock_translate_many):
+    items = [('A string', None, None, None)]
+    translate_many(items)
+    mock_translate_many.assert_called_once_with(
+        items, 'en_US', is_source=True, escape=True,
+    )
+
+
+def test_translate_many_without_translation():
+    assert translate_many([
+        ('A string', None, None, None),
+        ('<b>Hello {user}</b>', {'user': 'John'}, None, None),
+    ]) == ['A string', '&lt;b&gt;Hello John&lt;/b&gt;']
@@ -1,10 +1,10 @@
 import importlib
 import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from hashlib import md5
 
-import pytz
-
 
 def generate_key(string=None, context=None):
     """Return a unique key based on the given source string and context.
@@ -71,6 +71,7 @@ def now():
 
     :rtype: datetime
     """
+    import pytz
     return datetime.utcnow().replace(tzinfo=pytz.utc)  # pragma no cover
 
 
@@ -105,6 +106,111 @@ def make_hashable(data):
         return data
 
 
+class LRUCache(object):
+    """A thread-safe, bounded mapping that evicts the least recently used
+    entry when it grows beyond `maxsize`.
+
+    Keeps hit/miss counters so that callers can expose statistics about
+    the effectiveness of the cache. A `maxsize` of 0 disables caching
+    altogether, while `None` makes the cache unbounded.
+    """
+
+    def __init__(self, maxsize=1024):
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def get(self, key, default=None):
+        """Return the value stored for `key`, marking it as recently used.
+
+        :param object key: a hashable key
+        :param object default: the value to return if the key is missing
+        :return: the stored value or `default`
+        :rtype: object
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, evict=True):
+        """Store `value` under `key`, evicting old entries if necessary.
+
+        :param object key: a hashable key
+        :param object value: the value to store
+        :param bool evict: if False, the value is only stored if the cache
+            has room for it, leaving the existing entries in place
+        """
+        if self._maxsize == 0:
+            return
+        with self._lock:
+            if not evict and self._maxsize is not None and \
+                    key not in self._data and \
+                    len(self._data) >= self._maxsize:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self._maxsize is not None:
+                while len(self._data) > self._maxsize:
+                    self._data.popitem(last=False)
+
+    def discard(self, predicate):
+        """Remove all entries whose key satisfies the given predicate.
+
+        :param callable predicate: a function that accepts a key and returns
+            True if the entry should be removed
+        """
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def resize(self, maxsize):
+        """Change the maximum size of the cache, evicting entries if needed.
+
+        :param int maxsize: the new maximum size
+        """
+        with self._lock:
+            self._maxsize = maxsize
+            if maxsize is not None:
+                while len(self._data) > maxsize:
+                    self._data.popitem(last=False)
+
+    def info(self):
+        """Return statistics about the cache.
+
+        :return: a dictionary with the `hits`, `misses`, `maxsize` and
+            `currsize` of the cache
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'maxsize': self._maxsize,
+                'currsize': len(self._data),
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
 def parse_plurals(string):
     """ Tries to parse an ICU (possibly pluralized) string, returning its
         plurals separated. It only works if `string` is the simplest possible
@@ -5,7 +5,9 @@ def init(
     token, languages, secret=None,
     cds_host=None, missing_policy=None,
     error_policy=None, cache=None,
-    fetch_all_langs=False,
+    fetch_all_langs=False, template_cache_size=None, key_index_size=None,
+    render_cache_size=None, lazy_languages=False, bundle=None, warmup=False,
+    cds_pool_size=None, cds_timeout=None, stream_translations=False,
 ):
     """Initialize the framework.
 
@@ -21,6 +23,25 @@ def init(
         for defining how to handle translation rendering errors
     :param AbstractCache cache: an optional cache
     :param bool fetch_all_langs: force pull all remote languages
+    :param int template_cache_size: an optional maximum number of compiled
+        ICU templates to keep in memory; 0 disables the cache
+    :param int key_index_size: an optional maximum number of source strings
+        whose keys are kept in memory; 0 disables the index
+    :param int render_cache_size: an optional maximum number of rendered
+        translations without parameters to keep in memory; memoizing
+        rendered strings is disabled by default
+    :param bool lazy_languages: if True, each language is fetched the first
+        time a translation is requested for it
+    :param str bundle: the path of an optional translation bundle to
+        populate the cache with
+    :param bool warmup: if True, fetched translations are compiled in a
+        background thread ahead of rendering them
+    :param int cds_pool_size: an optional maximum number of connections to
+        the CDS to keep open for reuse
+    :param cds_timeout: an optional timeout for each request to the CDS, in
+        seconds, either a number or a (connect, read) tuple
+    :param bool stream_translations: if True, fetched translations are
+        decoded while being downloaded, lowering the peak memory of fetching
     """
     if not tx.initialized:
         tx.init(
@@ -32,6 +53,15 @@ def init(
             error_policy=error_policy,
             cache=cache,
             fetch_all_langs=fetch_all_langs,
+            template_cache_size=template_cache_size,
+            key_index_size=key_index_size,
+            render_cache_size=render_cache_size,
+            lazy_languages=lazy_languages,
+            bundle=bundle,
+            warmup=warmup,
+            cds_pool_size=cds_pool_size,
+            cds_timeout=cds_timeout,
+            stream_translations=stream_translations,
         )
 
 
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""A file format for shipping prebuilt translations along with an
+application, so that it can start serving them without contacting the CDS.
+
+A bundle is a gzipped JSON document like:
+{
+    "format": 1,
+    "created_at": "2021-01-01T00:00:00Z",
+    "languages": {
+        "fr": {"etag": "...", "data": {"key1": "...", "key2": "..."}},
+        ...
+    }
+}
+"""
+import gzip
+import json
+import os
+import tempfile
+
+from transifex.common._compat import text_type
+from transifex.common.utils import now
+
+# The version of the bundle format; bundles of other versions are rejected
+BUNDLE_FORMAT = 1
+
+
+class BundleError(Exception):
+    """Raised when a bundle cannot be read."""
+    pass
+
+
+def write_bundle(path, translations, etags=None):
+    """Write the given translations to a bundle file.
+
+    The file is written to a temporary file next to `path` and then moved
+    in place, so readers never see a partially written bundle.
+
+    :param str path: the path of the bundle file
+    :param dict translations: the translations of each language, as returned
+        by the CDS, e.g. {'fr': {'key1': {'string': '...'}, ...}, ...}, or
+        as streamed by the CDS handler, e.g. {'fr': {'key1': '...'}, ...}
+    :param dict etags: an optional dictionary of the ETag of each language
+    """
+    etags = etags or {}
+    languages = {}
+    for language_code, language_translations in translations.items():
+        data = {}
+        for key, entry in language_translations.items():
+            if isinstance(entry, dict):
+                entry = entry.get('string')
+            if entry and isinstance(entry, text_type):
+                data[key] = entry
+        languages[language_code] = {
+            'etag': etags.get(language_code) or '',
+            'data': data,
+        }
+    content = json.dumps({
+        'format': BUNDLE_FORMAT,
+        'created_at': now().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'languages': languages,
+    }, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+                gz.write(content.encode('utf-8'))
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_bundle(path):
+    """Read the translations of a bundle file.
+
+    :param str path: the path of the bundle file
+    :return: a tuple of the translations, formatted as expected by
+        `AbstractCache.update()`, and the ETag of each language
+    :rtype: tuple
+    :raise BundleError: if the file cannot be read or is not a valid bundle
+    """
+    try:
+        with gzip.open(path, 'rb') as f:
+            content = json.loads(f.read().decode('utf-8'))
+        if content.get('format') != BUNDLE_FORMAT:
+            raise BundleError(
+                'Unsupported bundle format: {}'.format(content.get('format'))
+            )
+        data, etags = {}, {}
+        for language_code, language in content['languages'].items():
+            data[language_code] = (True, {
+                key: {'string': string}
+                for key, string in language['data'].items()
+            })
+            etags[language_code] = language.get('etag') or ''
+    except BundleError:
+        raise
+    except (IOError, OSError, ValueError, KeyError, AttributeError,
+            TypeError) as e:
+        raise BundleError('Could not read bundle `{}`: {}'.format(path, e))
+    return data, etags
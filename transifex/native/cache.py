@@ -1,4 +1,161 @@
-from transifex.common.utils import now
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from transifex.common._compat import text_type
+from transifex.common.utils import LRUCache, generate_hashed_key, now
+from transifex.native.cds import FileEtagStore
+from transifex.native.rendering import StringRenderer, throttle_error
+from transifex.native.snapshot import Snapshot, SnapshotError, write_snapshot
+
+try:
+    import fcntl
+except ImportError:  # pragma no cover
+    fcntl = None
+
+logger = logging.getLogger('transifex.native.cache')
+
+# The file extension of the snapshot files of FileCache
+SNAPSHOT_EXTENSION = '.txs'
+
+# The name of the file that FileCache stores the ETags of its languages in
+ETAGS_FILENAME = 'etags.json'
+
+# The default number of translations kept in memory by TieredCache
+L1_CACHE_SIZE = 10000
+
+# The default number of translations kept in memory by SQLiteCache
+HOT_CACHE_SIZE = 1000
+
+# The maximum number of parameters of a single SQLite query
+SQLITE_MAX_PARAMS = 500
+
+# The table of languages that have not been loaded; shared so that looking
+# up a missing language does not allocate a new dictionary
+EMPTY_TABLE = {}
+
+# Marks translations that are not in an in-memory cache, as None is a valid
+# cached value
+MISSING = object()
+
+
+def get_key_aliases(key):
+    """Return the hashed keys that the given source based key corresponds to.
+
+    A source based key looks like `<string>` or `<string>::<context>`,
+    so both interpretations are considered when the key contains `::`.
+
+    :param unicode key: a source based key
+    :return: a set of hashed keys
+    :rtype: set
+    """
+    aliases = {generate_hashed_key(string=key)}
+    if '::' in key:
+        string, context = key.rsplit('::', 1)
+        if string:
+            aliases.add(generate_hashed_key(string=string, context=context))
+    return aliases
+
+
+def build_alias_table(translations, alias_memo=None, string_pool=None):
+    """Return a table that maps both the source based and the hashed key
+    of each translation to its translation string.
+
+    Source based keys take precedence over hashed keys, mirroring the
+    lookup order of `TxNative.get_translation()`, so looking up the hashed
+    key of a string in the table is enough to find its translation.
+
+    Only non-empty translations are kept, so that the table doubles as the
+    negative lookup structure of the language: a key that is not in the
+    table is known to be untranslated.
+
+    Keys are interned, so that tables of different languages share the
+    same key objects, and translation strings are de-duplicated through
+    `string_pool`, if given.
+
+    :param dict translations: the translations of a language, as returned
+        by the CDS, e.g. {'key1': {'string': '...'}, ...}, or as streamed
+        by the CDS handler, e.g. {'key1': '...', ...}
+    :param dict alias_memo: an optional dictionary used for memoizing the
+        aliases of each key, useful when building tables for multiple
+        languages that share the same keys
+    :param dict string_pool: an optional dictionary used for sharing
+        identical translation strings between tables
+    :return: a dictionary of translation strings keyed by all their keys
+    :rtype: dict
+    """
+    if alias_memo is None:
+        alias_memo = {}
+    if string_pool is None:
+        string_pool = {}
+    table = {}
+    aliased = []
+    for key, entry in translations.items():
+        if isinstance(entry, text_type):
+            # Streamed translations hold their strings directly
+            string = entry
+        else:
+            try:
+                string = entry.get('string')
+            except AttributeError:
+                continue
+        if not string:
+            continue
+        key = intern_string(key)
+        string = string_pool.setdefault(string, string)
+        table[key] = string
+        aliased.append((key, string))
+
+    # Aliases are applied after all keys, so that a source based key
+    # overrides any hashed key it corresponds to
+    for key, string in aliased:
+        aliases = alias_memo.get(key)
+        if aliases is None:
+            aliases = alias_memo[key] = [
+                intern_string(alias) for alias in get_key_aliases(key)
+                if alias != key
+            ]
+        for alias in aliases:
+            table[alias] = string
+    return table
+
+
+def intern_string(string):
+    """Return the interned version of the given string, if possible.
+
+    :param unicode string: the string to intern
+    :rtype: unicode
+    """
+    try:
+        return sys.intern(string)
+    except TypeError:
+        # Only `str` objects can be interned
+        return string
+
+
+def get_table_size(table, seen=None):
+    """Return the approximate memory footprint of a translation table,
+    in bytes.
+
+    :param dict table: a table of translation strings
+    :param set seen: an optional set of the ids of objects that have
+        already been counted, e.g. keys shared with other tables; it is
+        updated with the objects of the given table
+    :return: the size of the table in bytes
+    :rtype: int
+    """
+    if seen is None:
+        seen = set()
+    size = sys.getsizeof(table)
+    for key, string in table.items():
+        for item in (key, string):
+            if id(item) not in seen:
+                seen.add(id(item))
+                size += sys.getsizeof(item)
+    return size
 
 
 class AbstractCache(object):
@@ -7,8 +164,15 @@ class AbstractCache(object):
 
     Implementors can use any type of storage for saving and retrieving
     the translations.
+
+    Implementors should increase `version` every time `update()` changes
+    the stored translations, which allows clients to memoize content
+    derived from them. A `version` of None means that the cache does not
+    track its changes and nothing derived from it should be memoized.
     """
 
+    version = None
+
     def get(self, key, language_code):
         """Return the translation stored in the cache for the specific
         key and language.
@@ -27,6 +191,74 @@ class AbstractCache(object):
         #   '{num, gender, female {Her majesty} male {His majesty}}'
         pass
 
+    def get_aliased(self, key, alias, language_code):
+        """Return the translation stored for the given key, falling back
+        to the given alias.
+
+        This is used for looking up a source string by both its source based
+        key and its hashed key. Implementors that index both key styles
+        when updating (see `build_alias_table()`) can override this method
+        and resolve any key form with a single lookup.
+
+        :param unicode key: the preferred key of the translation
+        :param unicode alias: the key to use if there is no translation
+            for `key`
+        :param str language_code: the language code to retrieve the
+            translation for
+        :return: the stored translation or None if none found
+        :rtype: unicode
+        """
+        return (
+            self.get(key, language_code) or
+            self.get(alias, language_code)
+        )
+
+    def get_many(self, lookups, language_code):
+        """Return the translations for multiple keys of the same language.
+
+        Each lookup is a (key, alias) tuple, where `alias` is an optional key
+        to fall back to (see `get_aliased()`). Implementors that can fetch
+        multiple keys at once can override this method.
+
+        :param list lookups: a list of (key, alias) tuples
+        :param str language_code: the language code to retrieve the
+            translations for
+        :return: the stored translations (or None for each translation
+            that was not found), in the order of the given lookups
+        :rtype: list
+        """
+        return [
+            self.get_aliased(key, alias, language_code) if alias is not None
+            else self.get(key, language_code)
+            for key, alias in lookups
+        ]
+
+    def iter_strings(self, language_code):
+        """Return the distinct translation strings stored for the given
+        language.
+
+        Used for preparing translations ahead of rendering them. Caches that
+        cannot enumerate their content return nothing, which is the default.
+
+        :param str language_code: the language code to return the strings of
+        :return: an iterable of translation strings
+        :rtype: iterable
+        """
+        return ()
+
+    def has_language(self, language_code):
+        """Return whether the cache already holds translations for the
+        given language.
+
+        Used for not replacing content that may be newer than the content
+        to store, e.g. that of a bundle loaded by a restarted process. By
+        default, caches are assumed to hold nothing.
+
+        :param str language_code: the language code to check
+        :rtype: bool
+        """
+        return False
+
     def update(self, data):
         """Replace the cache with the given data.
 
@@ -51,33 +283,689 @@ class AbstractCache(object):
         """
         pass
 
+    @contextmanager
+    def fetch_lock(self):
+        """Coordinate fetching translations from the CDS.
+
+        Returns a context manager that yields whether the current process
+        should fetch fresh translations and `update()` the cache. Caches
+        shared between processes can use it so that only one of them
+        fetches translations at a time, while the rest load the fetched
+        content instead. By default, every process fetches translations.
+        """
+        yield True
+
+    def get_etag_store(self):
+        """Return a store for the ETags of the cached translations.
+
+        Caches that persist their translations can return an EtagStore that
+        persists the ETags as well, so that a restarted process only
+        downloads the translations that have changed. Its `save()` is called
+        after each `update()`. By default, ETags are kept in memory.
+
+        :return: an EtagStore or None, to keep ETags in memory
+        :rtype: transifex.native.cds.EtagStore
+        """
+        return None
+
 
 class MemoryCache(AbstractCache):
-    """A cache that stores translations in memory."""
+    """A cache that stores translations in memory.
+
+    Each language is stored as a flat table of translation strings, so that
+    both hits and misses cost a single dictionary lookup. Only the strings
+    are kept from the CDS payload, keys are shared between languages and
+    identical strings are stored once; see `memory_usage()`.
+
+    The tables of all languages are published together with a version number
+    as an immutable snapshot. Updates build the tables of the fresh languages
+    off to the side and then swap the snapshot with a single reference
+    assignment, so readers never block and never see a half-applied update.
+    """
 
     def __init__(self):
-        self._translations_by_lang = {}
+        # A (version, {language_code: table}) tuple; neither the dictionary
+        # nor the tables are mutated after being published
+        self._snapshot = (0, {})
+        self._update_lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    @property
+    def _translations_by_lang(self):
+        return self._snapshot[1]
+
+    @_translations_by_lang.setter
+    def _translations_by_lang(self, translations_by_lang):
+        with self._update_lock:
+            self._snapshot = (self._snapshot[0] + 1, translations_by_lang)
 
     def update(self, data):
         """Replace the cache with the given data.
 
+        Each translation is indexed by both its source based and its
+        hashed key, so that `get_aliased()` needs a single lookup.
+        Compiled templates of the updated languages are invalidated,
+        so that they are parsed again from the fresh content.
+
         :param dict data: the data to use in the cache, formatted as
             explained in AbstractCache.update()
         """
+        tables = {}
+        alias_memo, string_pool = {}, {}
         for lang_code, (should_update, translations) in data.items():
             if should_update:
-                self._translations_by_lang[lang_code] = {
-                    'translations': translations,
-                }
+                tables[lang_code] = build_alias_table(
+                    translations, alias_memo, string_pool,
+                )
+        if not tables:
+            return
+
+        # Concurrent updates are serialized, so that none of them is lost
+        with self._update_lock:
+            version, translations_by_lang = self._snapshot
+            translations_by_lang = dict(translations_by_lang)
+            translations_by_lang.update(tables)
+            self._snapshot = (version + 1, translations_by_lang)
+        StringRenderer.invalidate(list(tables))
 
     def get(self, key, language_code):
-        retrieved_translation = None
+        return self._snapshot[1].get(language_code, EMPTY_TABLE).get(key)
+
+    def iter_strings(self, language_code):
+        return set(self._snapshot[1].get(language_code, EMPTY_TABLE).values())
+
+    def has_language(self, language_code):
+        return language_code in self._snapshot[1]
+
+    def memory_usage(self):
+        """Return the approximate memory footprint of each language,
+        in bytes.
+
+        Objects shared between languages, like interned keys, are only
+        counted for the first language they appear in.
+
+        :return: a dictionary of sizes per language code
+        :rtype: dict
+        """
+        seen = set()
+        return {
+            lang_code: get_table_size(table, seen)
+            for lang_code, table in sorted(self._snapshot[1].items())
+        }
+
+    def get_aliased(self, key, alias, language_code):
+        """Return the translation for the given key or alias.
+
+        Since `update()` indexes source based keys under their hashed
+        aliases as well, looking up the alias is enough.
+        """
+        return self.get(alias, language_code)
+
+    def get_many(self, lookups, language_code):
+        table = self._snapshot[1].get(language_code, EMPTY_TABLE)
+        return [
+            table.get(alias if alias is not None else key)
+            for key, alias in lookups
+        ]
+
+
+class FileCache(AbstractCache):
+    """A cache that persists each language to a snapshot file on disk.
+
+    Snapshots are loaded with mmap when the cache is created, so a restarted
+    process can serve the translations of its previous run immediately,
+    even if the CDS is unreachable. Languages that fail to be fetched keep
+    their existing snapshot.
+
+    If a snapshot cannot be written, the fresh translations of the language
+    are kept in memory instead.
+
+    In Django, it can be selected with:
+        TRANSIFEX_CACHE = (
+            'transifex.native.cache.FileCache', {'path': '/var/cache/tx'},
+        )
+    """
+
+    def __init__(self, path):
+        """Constructor.
+
+        :param str path: the directory to store the snapshot files in;
+            it is created if it does not exist
+        """
+        self.path = path
+        # A (version, {language_code: table}) tuple, as in MemoryCache, where
+        # each table is a Snapshot or, if writing it failed, a dictionary
+        self._snapshot = (0, {})
+        self._update_lock = threading.Lock()
+        self.reload()
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    def _get_snapshot_path(self, language_code):
+        return os.path.join(
+            self.path, '{}{}'.format(language_code, SNAPSHOT_EXTENSION),
+        )
+
+    def _publish(self, tables):
+        """Publish the given tables, keeping those of other languages."""
+        if not tables:
+            return
+        with self._update_lock:
+            version, translations_by_lang = self._snapshot
+            translations_by_lang = dict(translations_by_lang)
+            translations_by_lang.update(tables)
+            self._snapshot = (version + 1, translations_by_lang)
+        StringRenderer.invalidate(list(tables))
+
+    def reload(self):
+        """Load the snapshots that have changed on disk, e.g. because
+        another process has updated them."""
+        try:
+            filenames = sorted(os.listdir(self.path))
+        except OSError:
+            return
+        loaded = self._snapshot[1]
+        tables = {}
+        for filename in filenames:
+            language_code, extension = os.path.splitext(filename)
+            if extension != SNAPSHOT_EXTENSION:
+                continue
+            path = os.path.join(self.path, filename)
+            try:
+                if Snapshot.get_signature(path) == getattr(
+                    loaded.get(language_code), 'signature', None,
+                ):
+                    continue
+                tables[language_code] = Snapshot(path)
+            except (OSError, SnapshotError) as e:
+                logger.warning(
+                    'Could not load translations of `{}` from disk: '
+                    '{}'.format(language_code, e)
+                )
+        self._publish(tables)
+
+    def update(self, data):
+        """Replace the cache with the given data and persist it to disk.
+
+        :param dict data: the data to use in the cache, formatted as
+            explained in AbstractCache.update()
+        """
+        tables = {}
+        alias_memo = {}
+        for lang_code, (should_update, translations) in data.items():
+            if not should_update:
+                continue
+            table = build_alias_table(translations, alias_memo)
+            path = self._get_snapshot_path(lang_code)
+            try:
+                if not os.path.isdir(self.path):
+                    os.makedirs(self.path)
+                write_snapshot(path, table)
+                tables[lang_code] = Snapshot(path)
+            except (OSError, SnapshotError) as e:
+                logger.error(
+                    'Could not save translations of `{}` to disk: '
+                    '{}'.format(lang_code, e)
+                )
+                tables[lang_code] = table
+        self._publish(tables)
+
+    def _lookup(self, table, key, language_code):
+        """Return the translation stored in the given table for the given
+        key.
+
+        A snapshot that turns out to be corrupted, e.g. because it was
+        modified on disk, is treated as missing the translation, so that
+        the source string is rendered instead of failing.
+        """
         try:
-            retrieved_translation = self._translations_by_lang\
-                .get(language_code, {})\
-                .get('translations', {})\
-                .get(key)\
-                .get('string', None)
-        except (ValueError, AttributeError):
-            pass
-        return retrieved_translation
+            return table.get(key)
+        except (SnapshotError, ValueError) as e:
+            if throttle_error(
+                ('snapshot', self.path, language_code),
+            ) is not None:
+                logger.error(
+                    'Could not read translations of `{}` from disk: '
+                    '{}'.format(language_code, e)
+                )
+            return None
+
+    def get(self, key, language_code):
+        return self._lookup(
+            self._snapshot[1].get(language_code, EMPTY_TABLE), key,
+            language_code,
+        )
+
+    def get_aliased(self, key, alias, language_code):
+        """Return the translation for the given key or alias.
+
+        As in MemoryCache, source based keys are stored under their hashed
+        aliases as well, so looking up the alias is enough.
+        """
+        return self.get(alias, language_code)
+
+    def get_many(self, lookups, language_code):
+        table = self._snapshot[1].get(language_code, EMPTY_TABLE)
+        return [
+            self._lookup(
+                table, alias if alias is not None else key, language_code,
+            )
+            for key, alias in lookups
+        ]
+
+    def iter_strings(self, language_code):
+        table = self._snapshot[1].get(language_code, EMPTY_TABLE)
+        return {string for _, string in table.items()}
+
+    def has_language(self, language_code):
+        # Snapshots written by other processes count as well
+        self.reload()
+        return language_code in self._snapshot[1]
+
+    def get_etag_store(self):
+        """Return a store that keeps the ETags in the snapshot directory.
+
+        Only the ETags of languages whose snapshot was written are used, so
+        languages kept in memory after failing to be written are downloaded
+        again. When another process saves new ETags, the snapshots are
+        reloaded before the ETags are used.
+        """
+        return FileEtagStore(
+            os.path.join(self.path, ETAGS_FILENAME),
+            is_stored=lambda language_code: isinstance(
+                self._snapshot[1].get(language_code), Snapshot,
+            ),
+            on_change=self.reload,
+        )
+
+
+class SharedFileCache(FileCache):
+    """A FileCache that is shared by multiple processes on the same host,
+    e.g. the workers of a gunicorn server.
+
+    Only one process fetches translations from the CDS and writes the
+    snapshots per `fetch_interval`; the rest of the processes map the
+    written snapshots instead, so the translations are stored once in the
+    page cache of the host regardless of the number of processes.
+
+    Fetching is coordinated through a lock file in the snapshot directory,
+    which also holds the time of the last fetch. Processes that find the
+    lock taken wait for the fetch in progress and then load its result.
+    """
+
+    LOCK_FILENAME = '.fetch.lock'
+
+    def __init__(self, path, fetch_interval=60):
+        """Constructor.
+
+        :param str path: the directory to store the snapshot files in;
+            it is created if it does not exist
+        :param int fetch_interval: the minimum number of seconds between
+            two fetches by any of the processes that share the cache
+        """
+        super(SharedFileCache, self).__init__(path)
+        self.fetch_interval = fetch_interval
+        # File locks are held per process, so the threads of each process
+        # are serialized separately
+        self._fetch_lock = threading.Lock()
+
+    @contextmanager
+    def fetch_lock(self):
+        with self._fetch_lock:
+            try:
+                if not os.path.isdir(self.path):
+                    os.makedirs(self.path)
+                lock_file = open(
+                    os.path.join(self.path, self.LOCK_FILENAME), 'a+',
+                )
+            except (IOError, OSError) as e:
+                logger.error(
+                    'Could not coordinate fetching translations: {}'.format(e)
+                )
+                yield True
+                return
+
+            with lock_file:
+                if fcntl is not None:
+                    fcntl.lockf(lock_file, fcntl.LOCK_EX)
+                try:
+                    lock_file.seek(0)
+                    try:
+                        fetched_at = float(lock_file.read() or 0)
+                    except ValueError:
+                        fetched_at = 0
+                    if time.time() - fetched_at < self.fetch_interval:
+                        # Fetched recently by another process
+                        self.reload()
+                        yield False
+                        return
+                    try:
+                        yield True
+                    finally:
+                        lock_file.seek(0)
+                        lock_file.truncate()
+                        lock_file.write(repr(time.time()))
+                        lock_file.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+
+class TieredCache(AbstractCache):
+    """A cache that keeps the most recently used translations in memory,
+    in front of another cache that holds all translations.
+
+    This allows using a backend that is slower to query but cheaper to
+    hold, e.g. a FileCache or a cache shared between processes, without
+    paying its cost for frequently used strings.
+
+    Translations kept in memory are tagged with the `version` of the
+    backend, so they are invalidated as soon as the backend is updated,
+    either through this cache or, for shared backends, by another process.
+    Backends without a `version` are only invalidated through this cache.
+
+    In Django, it can be selected with:
+        TRANSIFEX_CACHE = (
+            'transifex.native.cache.TieredCache',
+            {'backend': ('transifex.native.cache.FileCache',
+                         {'path': '/var/cache/tx'}),
+             'maxsize': 10000},
+        )
+    """
+
+    def __init__(self, backend, maxsize=L1_CACHE_SIZE):
+        """Constructor.
+
+        :param Union[AbstractCache, str, tuple(str, dict)] backend: the
+            cache that holds all translations, in any form accepted by
+            `transifex.native.settings.parse_cache()`
+        :param int maxsize: the maximum number of translations to keep
+            in memory
+        """
+        # Imported here, as the settings module depends on this one
+        from transifex.native.settings import parse_cache
+        self._backend = parse_cache(backend)
+        self._l1 = LRUCache(maxsize=maxsize)
+        # Used as the version of backends that do not track their changes
+        self._generation = 0
+
+    @property
+    def version(self):
+        return self._backend.version
+
+    def _get_generation(self):
+        version = self._backend.version
+        return self._generation if version is None else version
+
+    def get(self, key, language_code):
+        memo_key = (self._get_generation(), language_code, key, None)
+        translation = self._l1.get(memo_key, MISSING)
+        if translation is MISSING:
+            translation = self._backend.get(key, language_code)
+            self._l1.set(memo_key, translation)
+        return translation
+
+    def get_aliased(self, key, alias, language_code):
+        memo_key = (self._get_generation(), language_code, key, alias)
+        translation = self._l1.get(memo_key, MISSING)
+        if translation is MISSING:
+            translation = self._backend.get_aliased(key, alias, language_code)
+            self._l1.set(memo_key, translation)
+        return translation
+
+    def get_many(self, lookups, language_code):
+        generation = self._get_generation()
+        translations, missing = [], []
+        for index, (key, alias) in enumerate(lookups):
+            translation = self._l1.get(
+                (generation, language_code, key, alias), MISSING,
+            )
+            if translation is MISSING:
+                missing.append(index)
+            translations.append(translation)
+        if missing:
+            fetched = self._backend.get_many(
+                [lookups[index] for index in missing], language_code,
+            )
+            for index, translation in zip(missing, fetched):
+                key, alias = lookups[index]
+                self._l1.set(
+                    (generation, language_code, key, alias), translation,
+                )
+                translations[index] = translation
+        return translations
+
+    def iter_strings(self, language_code):
+        return self._backend.iter_strings(language_code)
+
+    def has_language(self, language_code):
+        return self._backend.has_language(language_code)
+
+    def update(self, data):
+        self._backend.update(data)
+        self._generation += 1
+
+    def fetch_lock(self):
+        return self._backend.fetch_lock()
+
+    def get_etag_store(self):
+        return self._backend.get_etag_store()
+
+    def cache_info(self):
+        """Return the statistics of the translations kept in memory.
+
+        :return: a dictionary with the number of hits and misses, the
+            maximum size and the current size of the in-memory cache
+        :rtype: dict
+        """
+        return self._l1.info()
+
+
+class SQLiteCache(AbstractCache):
+    """A cache that stores translations in a SQLite database.
+
+    Meant for projects too large to be held in memory: only the most
+    recently used translations are kept in memory, so the memory footprint
+    of the process does not depend on the number of translations.
+
+    The database uses write-ahead logging, so lookups are not blocked by
+    updates, either of the same or of other processes, and each update of a
+    language is applied in a single transaction. Each thread uses its own
+    connection, and so does each process forked after the cache was
+    created, e.g. the workers of a preforking server.
+
+    In Django, it can be selected with:
+        TRANSIFEX_CACHE = (
+            'transifex.native.cache.SQLiteCache',
+            {'path': '/var/cache/tx/translations.db'},
+        )
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS translations ('
+        ' language TEXT NOT NULL, key TEXT NOT NULL, string TEXT NOT NULL,'
+        ' PRIMARY KEY (language, key)'
+        ') WITHOUT ROWID',
+        'CREATE TABLE IF NOT EXISTS languages ('
+        ' language TEXT PRIMARY KEY, version INTEGER NOT NULL'
+        ')',
+    )
+
+    def __init__(self, path, maxsize=HOT_CACHE_SIZE):
+        """Constructor.
+
+        :param str path: the path of the database file; it is created
+            if it does not exist
+        :param int maxsize: the maximum number of translations to keep
+            in memory
+        """
+        self.path = path
+        self._local = threading.local()
+        # The connections inherited from the parent process, which must not
+        # be used or closed by a forked process
+        self._inherited_connections = []
+        self._hot = LRUCache(maxsize=maxsize)
+        # The versions of the languages in the database, as last loaded,
+        # and a version that changes whenever any of them changes
+        self._snapshot = (0, {})
+        self._update_lock = threading.Lock()
+        self.reload()
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    def _get_connection(self):
+        connection, pid = getattr(self._local, 'connection', None), os.getpid()
+        if connection is not None and self._local.pid != pid:
+            self._inherited_connections.append(connection)
+            connection = None
+        if connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            import sqlite3
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+            self._local.connection = connection
+            self._local.pid = pid
+        return connection
+
+    def reload(self):
+        """Load the versions of the languages, so that updates of the
+        database by other processes are picked up."""
+        versions = dict(self._get_connection().execute(
+            'SELECT language, version FROM languages'
+        ).fetchall())
+        with self._update_lock:
+            version, current = self._snapshot
+            if versions == current:
+                return
+            changed = [
+                language_code for language_code in set(versions) | set(current)
+                if versions.get(language_code) != current.get(language_code)
+            ]
+            self._snapshot = (version + 1, versions)
+        StringRenderer.invalidate(changed)
+
+    def update(self, data):
+        """Replace the translations of the given languages in the database.
+
+        :param dict data: the data to use in the cache, formatted as
+            explained in AbstractCache.update()
+        """
+        connection = self._get_connection()
+        alias_memo = {}
+        for lang_code, (should_update, translations) in data.items():
+            if not should_update:
+                continue
+            table = build_alias_table(translations, alias_memo)
+            with connection:
+                connection.execute(
+                    'DELETE FROM translations WHERE language = ?',
+                    (lang_code,),
+                )
+                connection.executemany(
+                    'INSERT INTO translations (language, key, string) '
+                    'VALUES (?, ?, ?)',
+                    (
+                        (lang_code, key, string)
+                        for key, string in table.items()
+                    ),
+                )
+                connection.execute(
+                    'INSERT OR REPLACE INTO languages (language, version) '
+                    'VALUES (?, COALESCE((SELECT version FROM languages '
+                    'WHERE language = ?), 0) + 1)',
+                    (lang_code, lang_code),
+                )
+        self.reload()
+
+    def get(self, key, language_code):
+        hot_key = (self._snapshot[0], language_code, key)
+        translation = self._hot.get(hot_key, MISSING)
+        if translation is MISSING:
+            row = self._get_connection().execute(
+                'SELECT string FROM translations '
+                'WHERE language = ? AND key = ?',
+                (language_code, key),
+            ).fetchone()
+            translation = row[0] if row else None
+            self._hot.set(hot_key, translation)
+        return translation
+
+    def get_aliased(self, key, alias, language_code):
+        """Return the translation for the given key or alias.
+
+        As in MemoryCache, source based keys are stored under their hashed
+        aliases as well, so looking up the alias is enough.
+        """
+        return self.get(alias, language_code)
+
+    def get_many(self, lookups, language_code):
+        version = self._snapshot[0]
+        keys = [alias if alias is not None else key for key, alias in lookups]
+        translations = {}
+        missing = []
+        for key in keys:
+            translation = self._hot.get((version, language_code, key), MISSING)
+            if translation is MISSING:
+                missing.append(key)
+            else:
+                translations[key] = translation
+
+        connection = self._get_connection()
+        for start in range(0, len(missing), SQLITE_MAX_PARAMS):
+            chunk = missing[start:start + SQLITE_MAX_PARAMS]
+            found = dict(connection.execute(
+                'SELECT key, string FROM translations '
+                'WHERE language = ? AND key IN ({})'.format(
+                    ', '.join('?' * len(chunk))
+                ),
+                [language_code] + chunk,
+            ).fetchall())
+            for key in chunk:
+                translation = found.get(key)
+                translations[key] = translation
+                self._hot.set((version, language_code, key), translation)
+        return [translations[key] for key in keys]
+
+    def iter_strings(self, language_code):
+        cursor = self._get_connection().execute(
+            'SELECT DISTINCT string FROM translations WHERE language = ?',
+            (language_code,),
+        )
+        return [row[0] for row in cursor]
+
+    def has_language(self, language_code):
+        self.reload()
+        return language_code in self._snapshot[1]
+
+    def get_etag_store(self):
+        """Return a store that keeps the ETags in a file next to the
+        database."""
+        return FileEtagStore(
+            '{}.etags.json'.format(self.path),
+            is_stored=lambda language_code: (
+                language_code in self._snapshot[1]
+            ),
+            on_change=self.reload,
+        )
+
+    def cache_info(self):
+        """Return the statistics of the translations kept in memory.
+
+        :return: a dictionary with the number of hits and misses, the
+            maximum size and the current size of the in-memory cache
+        :rtype: dict
+        """
+        return self._hot.info()
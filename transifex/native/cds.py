@@ -1,8 +1,11 @@
+import json
 import logging
+import os
 import sys
+import tempfile
+import threading
 import time
 
-import requests
 from transifex.native.consts import (KEY_CHARACTER_LIMIT,
                                      KEY_DEVELOPER_COMMENT, KEY_OCCURRENCES,
                                      KEY_TAGS)
@@ -17,6 +20,9 @@ TRANSIFEX_CDS_URLS = {
     'PURGE_CACHE': '/purge',
 }
 
+# Note: `requests` is imported by the methods that use it, as importing it
+# takes longer than importing the rest of the SDK
+
 logger = logging.getLogger('transifex.native.cds')
 logger.addHandler(logging.StreamHandler(sys.stderr))
 
@@ -35,9 +41,23 @@ MAPPING = {
 MAX_RETRIES = 3
 RETRY_DELAY_SEC = 2
 
+# The size of the chunks that streamed translations are read in
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# The default maximum number of connections to keep open to the CDS host,
+# which also bounds the number of languages fetched concurrently
+POOL_SIZE = 10
+
 
 class EtagStore(object):
-    """ Manges etags """
+    """ Manges etags
+
+    The ETag of each language identifies the version of its translations
+    that is cached, so that the CDS only responds with translations that
+    have changed since. This store keeps them in memory; persistent caches
+    provide a store that saves them along with the translations (see
+    `AbstractCache.get_etag_store()`).
+    """
 
     # Probably we need to a duration policy here
 
@@ -50,18 +70,128 @@ class EtagStore(object):
     def get(self, key):
         return self._mem.get(key, '')
 
+    def save(self):
+        """Persist the ETags set so far.
+
+        Called once the translations they refer to have been stored in the
+        cache, so that a persisted ETag never refers to translations that
+        are not stored.
+        """
+        pass
+
+
+class FileEtagStore(EtagStore):
+    """Stores ETags in a JSON file, so that a restarted process only
+    downloads the languages that have changed since they were cached.
+
+    The file is reloaded whenever it is changed by another process.
+    """
+
+    def __init__(self, path, is_stored=None, on_change=None):
+        """Constructor.
+
+        :param str path: the path of the file to store the ETags in
+        :param callable is_stored: an optional function that tells whether
+            the translations of a language code are persisted; the ETags of
+            languages it returns False for are neither used nor saved
+        :param callable on_change: an optional function to call, without
+            arguments, when another process has saved new ETags, before
+            they are used; e.g. to load the translations they refer to, so
+            that a 304 response never leaves older translations in place
+        """
+        super(FileEtagStore, self).__init__()
+        self.path = path
+        self.is_stored = is_stored
+        self.on_change = on_change
+        self._signature = None
+        self._saved = {}
+        # Loaded right away, so that saving before any lookup, e.g. when
+        # loading a bundle, keeps the ETags of the other languages
+        self._reload()
+
+    def _reload(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                saved = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError) as e:
+            logger.warning('Could not load ETags from `{}`: {}'.format(
+                self.path, e,
+            ))
+            saved = {}
+        self._signature = signature
+        if saved != self._saved and self.on_change is not None:
+            # The translations are saved before their ETags, so they are
+            # at least as recent as the ETags once loaded
+            self.on_change()
+        # ETags loaded from the file replace those set by this process, as
+        # they refer to translations stored by a later update
+        for key, value in saved.items():
+            if self._saved.get(key) != value:
+                self._mem[key] = value
+        self._saved = saved
+
+    def get(self, key):
+        self._reload()
+        if self.is_stored is not None and not self.is_stored(key):
+            return ''
+        return super(FileEtagStore, self).get(key)
+
+    def save(self):
+        """Write the ETags of the stored languages to the file."""
+        etags = {
+            key: value for key, value in self._mem.items()
+            if value and (self.is_stored is None or self.is_stored(key))
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(json.dumps(etags, sort_keys=True).encode('utf-8'))
+                os.replace(tmp_path, self.path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except (IOError, OSError) as e:
+            logger.error('Could not save ETags to `{}`: {}'.format(
+                self.path, e,
+            ))
+            return
+        self._saved = etags
+        self._signature = None
+
 
 class CDSHandler(object):
     """Handles communication with the Content Delivery Service."""
 
     def __init__(self, configured_languages, token, secret=None,
-                 host=TRANSIFEX_CDS_HOST, fetch_all_langs=False):
+                 host=TRANSIFEX_CDS_HOST, fetch_all_langs=False,
+                 pool_size=None, timeout=None, stream=False):
         """Constructor.
 
         :param list configured_languages: a list of language codes for the
             configured languages in the application
         :param str token: the API token to use for connecting to the CDS
         :param str host: the host of the Content Delivery Service
+        :param int pool_size: an optional maximum number of connections to
+            the CDS to keep open for reuse and of languages to fetch
+            concurrently, defaults to POOL_SIZE
+        :param timeout: an optional timeout for each request, in seconds,
+            either a number or a (connect timeout, read timeout) tuple
+        :param bool stream: if True, the translations of each language are
+            decoded while being downloaded and only their strings are kept,
+            e.g. {'key1': '...'} instead of {'key1': {'string': '...'}};
+            this keeps the memory used by fetching large languages close to
+            the size of their translations
         """
         self.configured_language_codes = configured_languages
         self.fetch_all_langs = fetch_all_langs
@@ -69,15 +199,67 @@ class CDSHandler(object):
         self.secret = secret
         self.host = host or TRANSIFEX_CDS_HOST
         self.etags = EtagStore()
+        self.pool_size = pool_size or POOL_SIZE
+        self.timeout = timeout
+        self.stream = stream
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The HTTP session used for all requests to the CDS.
+
+        Connections are kept alive and reused across requests, so that
+        fetching many languages does not open a new connection each time.
+        A forked process must not share the connections of its parent, so
+        the session is recreated whenever it is used by a new process.
+
+        :rtype: requests.Session
+        """
+        session, pid = self._session, os.getpid()
+        if session is not None and self._session_pid == pid:
+            return session
+        with self._session_lock:
+            if self._session is None or self._session_pid != pid:
+                self._session = self._create_session()
+                self._session_pid = pid
+            return self._session
+
+    def _create_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _request(self, method, url, **kwargs):
+        """Make a request to the CDS using the shared session.
+
+        :param str method: the HTTP method
+        :param str url: the URL of the request
+        :return: the HTTP response object
+        :rtype: requests.Response
+        """
+        if self.timeout is not None:
+            kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
 
-    def fetch_languages(self):
+    def fetch_languages(self, deadline=None):
         """Fetch the languages defined in the CDS for the specific project.
 
         Contains the source language and all target languages.
 
+        :param float deadline: an optional timestamp (as returned by
+            `time.time()`) by which the request must complete
         :return: a list of language information
         :rtype: dict
         """
+        import requests
 
         cds_url = TRANSIFEX_CDS_URLS['FETCH_AVAILABLE_LANGUAGES']
         languages = []
@@ -86,6 +268,7 @@ class CDSHandler(object):
             response = self.retry_get_request(
                 self.host + cds_url,
                 headers=self._get_headers(),
+                deadline=deadline,
             )
 
             if not response.ok:
@@ -113,7 +296,8 @@ class CDSHandler(object):
 
         return languages
 
-    def fetch_translations(self, language_code=None):
+    def fetch_translations(self, language_code=None, language_codes=None,
+                           deadline=None, failed=None):
         """Fetch all translations for the given organization/project/(resource)
         associated with the current token.
 
@@ -121,19 +305,60 @@ class CDSHandler(object):
         translations per language. Refresh flag is going to be True whenever
         fresh data has been acquired, False otherwise.
 
+        Languages are fetched concurrently, up to `pool_size` at a time.
+
+        :param str language_code: an optional language code to fetch the
+            translations of, instead of all remote languages
+        :param list language_codes: an optional list of language codes to
+            fetch the translations of, instead of all remote languages
+        :param float deadline: an optional timestamp (as returned by
+            `time.time()`) by which all requests must complete; languages
+            that cannot be fetched in time are not refreshed
+        :param set failed: an optional set to add the codes of the
+            languages that could not be fetched to, as they are reported
+            as not refreshed, like those that have not changed
         :return: a dictionary of (refresh_flag, translations) tuples
         :rtype: dict
         """
-
-        cds_url = TRANSIFEX_CDS_URLS['FETCH_TRANSLATIONS_FOR_LANGUAGE']
-
-        translations = {}
-
-        if not language_code:
-            languages = [lang['code'] for lang in self.fetch_languages()]
-        else:
+        if language_code:
             languages = [language_code]
+        elif language_codes is not None:
+            languages = language_codes
+        else:
+            languages = [
+                lang['code'] for lang in self.fetch_languages(deadline)
+            ]
+            if not languages and failed is not None:
+                # Projects have at least a source language
+                failed.update(self.configured_language_codes)
+
+        languages = self._scope_languages(languages)
+        if len(languages) <= 1:
+            return {
+                language_code: self._fetch_language(
+                    language_code, deadline, failed,
+                )
+                for language_code in languages
+            }
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(
+            max_workers=min(self.pool_size, len(languages)),
+        ) as executor:
+            results = executor.map(
+                lambda language_code: self._fetch_language(
+                    language_code, deadline, failed,
+                ),
+                languages,
+            )
+            return dict(zip(languages, results))
+
+    def _scope_languages(self, languages):
+        """Return the given languages that should be fetched.
 
+        :param list languages: a list of language codes
+        :rtype: list
+        """
         # All remote languages
         languages = set(languages)
 
@@ -141,16 +366,57 @@ class CDSHandler(object):
         if not self.fetch_all_langs:
             languages &= set(self.configured_language_codes)
 
-        for language_code in languages:
+        return list(languages)
 
-            try:
-                response = self.retry_get_request(
-                    (self.host + cds_url.format(language_code=language_code)),
-                    headers=self._get_headers(
-                        etag=self.etags.get(language_code)
-                    )
-                )
+    def _read_streamed_translations(self, response):
+        """Decode the translations of a streamed response.
+
+        The translations are collected before returning, instead of being
+        passed on lazily to the cache, so that a malformed response is
+        detected while the language can still be reported as not
+        refreshed, and the connection is released before the cache is
+        updated. Only the non-empty strings are kept, and neither the
+        response body nor the decoded document are held in memory.
 
+        :param requests.Response response: the response
+        :return: a dictionary of the non-empty translation strings
+        :rtype: dict
+        :raise ValueError: if the response is malformed
+        """
+        from transifex.native.streaming import iter_translations
+        return {
+            key: string for key, string in iter_translations(
+                response.iter_content(STREAM_CHUNK_SIZE),
+            ) if string
+        }
+
+    def _fetch_language(self, language_code, deadline=None, failed=None):
+        """Fetch the translations of a single language.
+
+        Errors are logged and reported as a language that was not refreshed,
+        so that they do not affect the rest of the languages.
+
+        :param str language_code: the code of the language to fetch
+        :param float deadline: an optional timestamp by which the request
+            must complete
+        :param set failed: an optional set to add the language code to,
+            if the language cannot be fetched
+        :return: a (refresh_flag, translations) tuple
+        :rtype: tuple
+        """
+        import requests
+
+        cds_url = TRANSIFEX_CDS_URLS['FETCH_TRANSLATIONS_FOR_LANGUAGE']
+        try:
+            response = self.retry_get_request(
+                (self.host + cds_url.format(language_code=language_code)),
+                headers=self._get_headers(
+                    etag=self.etags.get(language_code)
+                ),
+                deadline=deadline,
+                stream=self.stream,
+            )
+            try:
                 if not response.ok:
                     logger.error(
                         'Error retrieving translations from CDS: `{}`'.format(
@@ -161,33 +427,34 @@ class CDSHandler(object):
 
                 # etags indicate that no translation have been updated
                 if response.status_code == 304:
-                    translations[language_code] = (False, {})
+                    return False, {}
+                if self.stream:
+                    data = self._read_streamed_translations(response)
                 else:
-                    self.etags.set(
-                        language_code, response.headers.get('ETag', ''))
                     json_content = response.json()
-                    translations[language_code] = (
-                        True, json_content['data']
-                    )
+                    data = json_content['data']
+            finally:
+                # Streamed responses hold their connection until closed
+                response.close()
+            self.etags.set(language_code, response.headers.get('ETag', ''))
+            return True, data
 
-            except (KeyError, ValueError):
-                # Compatibility with python2.7 where `JSONDecodeError` doesn't
-                # exist
-                logger.error('Error retrieving translations from CDS: '
-                             'Malformed response')  # pragma no cover
-                translations[language_code] = (False, {})  # pragma no cover
-            except requests.ConnectionError:
-                logger.error(
-                    'Error retrieving translations from CDS: ConnectionError')
-                translations[language_code] = (False, {})
-            except Exception as e:
-                logger.error(
-                    'Error retrieving translations from CDS: UnknownError '
-                    '(`{}`)'.format(str(e))
-                )  # pragma no cover
-                translations[language_code] = (False, {})
-
-        return translations
+        except (KeyError, ValueError):
+            # Compatibility with python2.7 where `JSONDecodeError` doesn't
+            # exist
+            logger.error('Error retrieving translations from CDS: '
+                         'Malformed response')  # pragma no cover
+        except requests.ConnectionError:
+            logger.error(
+                'Error retrieving translations from CDS: ConnectionError')
+        except Exception as e:
+            logger.error(
+                'Error retrieving translations from CDS: UnknownError '
+                '(`{}`)'.format(str(e))
+            )  # pragma no cover
+        if failed is not None:
+            failed.add(language_code)
+        return False, {}
 
     def push_source_strings(self, strings, purge=False):
         """Push source strings to CDS.
@@ -200,6 +467,7 @@ class CDSHandler(object):
         :return: the HTTP response object
         :rtype: requests.Response
         """
+        import requests
         if not self.secret:
             raise Exception('You need to use `TRANSIFEX_SECRET` when pushing '
                             'source content')
@@ -210,7 +478,8 @@ class CDSHandler(object):
         response = None
 
         try:
-            response = requests.post(
+            response = self._request(
+                'POST',
                 self.host + cds_url,
                 headers=self._get_headers(use_secret=True),
                 json={
@@ -236,13 +505,15 @@ class CDSHandler(object):
         :return: the HTTP response object
         :rtype: requests.Response
         """
+        import requests
         if not self.secret:
             raise Exception('You need to use `TRANSIFEX_SECRET` when polling '
                             'source content push')
 
         response = None
         try:
-            response = requests.get(
+            response = self._request(
+                'GET',
                 self.host + job_path,
                 headers=self._get_headers(use_secret=True),
             )
@@ -266,6 +537,7 @@ class CDSHandler(object):
         :return: the HTTP response object
         :rtype: requests.Response
         """
+        import requests
         if not self.secret:
             raise Exception('You need to use `TRANSIFEX_SECRET` when '
                             'invalidating cache')
@@ -275,7 +547,8 @@ class CDSHandler(object):
 
         response = None
         try:
-            response = requests.post(
+            response = self._request(
+                'POST',
                 self.host + cds_url,
                 headers=self._get_headers(use_secret=True),
                 json={}
@@ -291,6 +564,22 @@ class CDSHandler(object):
 
         return response
 
+    def _limit_timeout(self, remaining):
+        """Return the configured timeout, limited to the given number of
+        seconds.
+
+        :param float remaining: the maximum number of seconds
+        :return: a timeout suitable for `requests`
+        """
+        if self.timeout is None:
+            return remaining
+        if isinstance(self.timeout, tuple):
+            return tuple(
+                remaining if value is None else min(value, remaining)
+                for value in self.timeout
+            )
+        return min(self.timeout, remaining)
+
     def _serialize(self, source_string):
         """Serialize the given source string to a format suitable for the CDS.
 
@@ -336,17 +625,395 @@ class CDSHandler(object):
         return headers
 
     def retry_get_request(self, *args, **kwargs):
-        """ Resilient function for GET requests """
+        """ Resilient function for GET requests
+
+        Accepts an optional `deadline` keyword argument, a timestamp (as
+        returned by `time.time()`) after which no more attempts are made;
+        each attempt is also limited to the time left until the deadline.
+
+        :raise requests.Timeout: if the deadline has passed before a response
+            is received
+        """
+        import requests
+        deadline = kwargs.pop('deadline', None)
         retries, last_response_status = 0, 202
+        response = None
         while (last_response_status == 202 or
                 500 <= last_response_status < 600 and
                 retries < MAX_RETRIES):
 
+            if response is not None:
+                # Release the connection of a response that is retried
+                response.close()
+
             if 500 <= last_response_status < 600:
                 retries += 1
-                time.sleep(retries * RETRY_DELAY_SEC)
-
-            response = requests.get(*args, **kwargs)
+                delay = retries * RETRY_DELAY_SEC
+                if deadline is not None and time.time() + delay >= deadline:
+                    break
+                time.sleep(delay)
+
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise requests.Timeout('Deadline exceeded')
+                kwargs['timeout'] = self._limit_timeout(remaining)
+
+            response = self._request('GET', *args, **kwargs)
             last_response_status = response.status_code
 
         return response
+
+
+class AsyncCDSHandler(CDSHandler):
+    """Handles communication with the Content Delivery Service using asyncio.
+
+    Has the same methods as CDSHandler, as coroutines, so that it can be used
+    without blocking an event loop. Requires aiohttp, e.g. installed with
+    `pip install transifex-python[async]`.
+
+    The session is bound to the event loop that created it, so it is
+    recreated when the handler is used from another event loop, releasing
+    the previous one. Use `close()` to close it once done.
+
+    Translations are decoded once downloaded, regardless of `stream`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncCDSHandler, self).__init__(*args, **kwargs)
+        self._session_loop = None
+
+    @property
+    def session(self):
+        """The HTTP session used for all requests to the CDS.
+
+        :rtype: aiohttp.ClientSession
+        """
+        import asyncio
+        loop, pid = asyncio.get_event_loop(), os.getpid()
+        session = self._session
+        if session is None or session.closed or \
+                self._session_loop is not loop or self._session_pid != pid:
+            self._release_session()
+            self._session = self._create_session()
+            self._session_loop = loop
+            self._session_pid = pid
+        return self._session
+
+    def _release_session(self):
+        """Release the session of another event loop or process, if any.
+
+        The session can only be closed by the loop it belongs to, which is
+        asked to do so if it is still running, e.g. in another thread.
+        Otherwise the connections of the session have been closed along
+        with its loop, or belong to the parent process, so the session is
+        only detached from them.
+        """
+        import asyncio
+        session = self._session
+        if session is None or session.closed:
+            return
+        loop = self._session_loop
+        if self._session_pid == os.getpid() and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            session.detach()
+
+    def _create_session(self):
+        import aiohttp
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+        )
+
+    async def close(self):
+        """Close the session of the handler, if any."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _request(self, method, url, **kwargs):
+        """Make a request to the CDS using the shared session.
+
+        The body of the response is read before returning it.
+
+        :param str method: the HTTP method
+        :param str url: the URL of the request
+        :return: the HTTP response object
+        :rtype: aiohttp.ClientResponse
+        """
+        import aiohttp
+        timeout = kwargs.pop('timeout', self.timeout)
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        kwargs['timeout'] = aiohttp.ClientTimeout(
+            sock_connect=timeout[0], sock_read=timeout[1],
+        )
+        async with self.session.request(method, url, **kwargs) as response:
+            await response.read()
+        return response
+
+    async def fetch_languages(self, deadline=None):
+        """Fetch the languages defined in the CDS for the specific project.
+
+        :param float deadline: an optional timestamp (as returned by
+            `time.time()`) by which the request must complete
+        :return: a list of language information
+        :rtype: dict
+        """
+        import aiohttp
+
+        cds_url = TRANSIFEX_CDS_URLS['FETCH_AVAILABLE_LANGUAGES']
+        languages = []
+
+        try:
+            response = await self.retry_get_request(
+                self.host + cds_url,
+                headers=self._get_headers(),
+                deadline=deadline,
+            )
+
+            if not response.ok:
+                logger.error(
+                    'Error retrieving languages from CDS: `{}`'.format(
+                        response.reason
+                    )
+                )
+                response.raise_for_status()
+
+            json_content = await response.json(content_type=None)
+            languages = json_content['data']
+
+        except (KeyError, ValueError):
+            logger.error(
+                'Error retrieving languages from CDS: Malformed response')
+        except aiohttp.ClientConnectionError:
+            logger.error(
+                'Error retrieving languages from CDS: ConnectionError')
+        except Exception as e:
+            logger.error('Error retrieving languages from CDS: UnknownError '
+                         '(`{}`)'.format(str(e)))
+
+        return languages
+
+    async def fetch_translations(self, language_code=None,
+                                 language_codes=None, deadline=None,
+                                 failed=None):
+        """Fetch the translations of all languages, or the given ones,
+        concurrently.
+
+        :param str language_code: an optional language code to fetch the
+            translations of, instead of all remote languages
+        :param list language_codes: an optional list of language codes to
+            fetch the translations of, instead of all remote languages
+        :param float deadline: an optional timestamp (as returned by
+            `time.time()`) by which all requests must complete
+        :param set failed: an optional set to add the codes of the
+            languages that could not be fetched to, as in
+            `CDSHandler.fetch_translations()`
+        :return: a dictionary of (refresh_flag, translations) tuples, as
+            returned by `CDSHandler.fetch_translations()`
+        :rtype: dict
+        """
+        import asyncio
+
+        if language_code:
+            languages = [language_code]
+        elif language_codes is not None:
+            languages = language_codes
+        else:
+            languages = [
+                lang['code'] for lang in await self.fetch_languages(deadline)
+            ]
+            if not languages and failed is not None:
+                # Projects have at least a source language
+                failed.update(self.configured_language_codes)
+
+        languages = self._scope_languages(languages)
+        # The connector of the session limits the number of concurrent
+        # requests to `pool_size`
+        results = await asyncio.gather(*(
+            self._fetch_language(language_code, deadline, failed)
+            for language_code in languages
+        ))
+        return dict(zip(languages, results))
+
+    async def _fetch_language(self, language_code, deadline=None,
+                              failed=None):
+        """Fetch the translations of a single language.
+
+        :param str language_code: the code of the language to fetch
+        :param float deadline: an optional timestamp by which the request
+            must complete
+        :param set failed: an optional set to add the language code to,
+            if the language cannot be fetched
+        :return: a (refresh_flag, translations) tuple
+        :rtype: tuple
+        """
+        import aiohttp
+
+        cds_url = TRANSIFEX_CDS_URLS['FETCH_TRANSLATIONS_FOR_LANGUAGE']
+        try:
+            response = await self.retry_get_request(
+                (self.host + cds_url.format(language_code=language_code)),
+                headers=self._get_headers(
+                    etag=self.etags.get(language_code)
+                ),
+                deadline=deadline,
+            )
+
+            if not response.ok:
+                logger.error(
+                    'Error retrieving translations from CDS: `{}`'.format(
+                        response.reason
+                    )
+                )
+                response.raise_for_status()
+
+            # etags indicate that no translation have been updated
+            if response.status == 304:
+                return False, {}
+            json_content = await response.json(content_type=None)
+            data = json_content['data']
+            self.etags.set(language_code, response.headers.get('ETag', ''))
+            return True, data
+
+        except (KeyError, ValueError):
+            logger.error('Error retrieving translations from CDS: '
+                         'Malformed response')
+        except aiohttp.ClientConnectionError:
+            logger.error(
+                'Error retrieving translations from CDS: ConnectionError')
+        except Exception as e:
+            logger.error(
+                'Error retrieving translations from CDS: UnknownError '
+                '(`{}`)'.format(str(e))
+            )
+        if failed is not None:
+            failed.add(language_code)
+        return False, {}
+
+    async def push_source_strings(self, strings, purge=False):
+        """Push source strings to CDS.
+
+        :param list(SourceString) strings: a list of `SourceString` objects
+            holding source strings
+        :param bool purge: True deletes destination source content not included
+            in pushed content. False appends the pushed content to destination
+            source content.
+        :return: the HTTP response object
+        :rtype: aiohttp.ClientResponse
+        """
+        if not self.secret:
+            raise Exception('You need to use `TRANSIFEX_SECRET` when pushing '
+                            'source content')
+
+        cds_url = TRANSIFEX_CDS_URLS['PUSH_SOURCE_STRINGS']
+        data = {k: v for k, v in [self._serialize(item) for item in strings]}
+        return await self._send(
+            'POST', self.host + cds_url,
+            'Error pushing source strings to CDS',
+            json={
+                'data': data,
+                'meta': {'purge': purge},
+            },
+        )
+
+    async def get_push_status(self, job_path):
+        """Get source string push job status
+
+        :param str job_path: Job url path
+        :return: the HTTP response object
+        :rtype: aiohttp.ClientResponse
+        """
+        if not self.secret:
+            raise Exception('You need to use `TRANSIFEX_SECRET` when polling '
+                            'source content push')
+
+        return await self._send(
+            'GET', self.host + job_path,
+            'Error polling source strings push to CDS',
+        )
+
+    async def invalidate_cache(self, purge=False):
+        """Invalidate CDS cache.
+
+        :param bool purge: True deletes CDS cache entirely instead of
+            triggering a job to re-cache content.
+        :return: the HTTP response object
+        :rtype: aiohttp.ClientResponse
+        """
+        if not self.secret:
+            raise Exception('You need to use `TRANSIFEX_SECRET` when '
+                            'invalidating cache')
+
+        cds_url = TRANSIFEX_CDS_URLS['PURGE_CACHE'] if purge else \
+            TRANSIFEX_CDS_URLS['INVALIDATE_CACHE']
+        return await self._send(
+            'POST', self.host + cds_url, 'Error invalidating CDS', json={},
+        )
+
+    async def _send(self, method, url, error_message, **kwargs):
+        """Make an authenticated request that uses the secret, logging
+        any errors.
+
+        :param str method: the HTTP method
+        :param str url: the URL of the request
+        :param str error_message: the message to log errors with
+        :return: the HTTP response object, or None if no response was
+            received
+        :rtype: aiohttp.ClientResponse
+        """
+        import aiohttp
+
+        response = None
+        try:
+            response = await self._request(
+                method, url, headers=self._get_headers(use_secret=True),
+                **kwargs
+            )
+            response.raise_for_status()
+
+        except aiohttp.ClientConnectionError:
+            logger.error('{}: ConnectionError'.format(error_message))
+        except Exception as e:
+            logger.error('{}: UnknownError (`{}`)'.format(
+                error_message, str(e),
+            ))
+
+        return response
+
+    async def retry_get_request(self, *args, **kwargs):
+        """Resilient coroutine for GET requests, as in
+        `CDSHandler.retry_get_request()`.
+
+        Each attempt is cancelled once the optional `deadline` has passed.
+
+        :raise asyncio.TimeoutError: if the deadline has passed before a
+            response is received
+        """
+        import asyncio
+        deadline = kwargs.pop('deadline', None)
+        retries, last_response_status = 0, 202
+        while (last_response_status == 202 or
+                500 <= last_response_status < 600 and
+                retries < MAX_RETRIES):
+
+            if 500 <= last_response_status < 600:
+                retries += 1
+                delay = retries * RETRY_DELAY_SEC
+                if deadline is not None and time.time() + delay >= deadline:
+                    break
+                await asyncio.sleep(delay)
+
+            request = self._request('GET', *args, **kwargs)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    request.close()
+                    raise asyncio.TimeoutError('Deadline exceeded')
+                request = asyncio.wait_for(request, remaining)
+
+            response = await request
+            last_response_status = response.status
+
+        return response
@@ -1,14 +1,48 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import copy
 import json
-
-from transifex.common.utils import (generate_hashed_key, generate_key,
-                                    parse_plurals)
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from transifex.common.utils import (LRUCache, generate_hashed_key,
+                                    generate_key, parse_plurals)
+from transifex.native.bundle import BundleError, read_bundle, write_bundle
 from transifex.native.cache import MemoryCache
-from transifex.native.cds import CDSHandler
+from transifex.native.cds import AsyncCDSHandler, CDSHandler, EtagStore
 from transifex.native.rendering import (SourceStringErrorPolicy,
-                                        SourceStringPolicy, StringRenderer)
+                                        SourceStringPolicy, StringRenderer,
+                                        compiled_templates, html_escape,
+                                        split_leading_argument,
+                                        throttle_error)
+
+logger = logging.getLogger('transifex.native.core')
+
+# The default number of source strings whose keys are kept in memory
+KEY_INDEX_SIZE = 10000
+
+# The default number of rendered parameterless translations kept in memory;
+# memoizing rendered strings is opt-in
+RENDER_CACHE_SIZE = 0
+
+# Warming up compiled templates pauses for WARMUP_PAUSE seconds after every
+# WARMUP_BATCH_SIZE templates, so that it does not starve request threads
+WARMUP_BATCH_SIZE = 50
+WARMUP_PAUSE = 0.01
+
+# Warming up fills at most this share of the compiled template cache, so
+# that it does not evict the templates that are being rendered
+WARMUP_CACHE_SHARE = 0.5
+
+# The result of resolving a (source_string, context) pair, i.e. whether the
+# source string is pluralized, the name of its plural variable (if any),
+# its source based key and its hashed key
+ResolvedKeys = namedtuple(
+    'ResolvedKeys', ('pluralized', 'variable', 'key', 'hashed_key'),
+)
 
 
 class NotInitializedError(Exception):
@@ -35,12 +69,35 @@ class TxNative(object):
         self._error_policy = None
         self._missing_policy = None
         self._cds_handler = None
+        self._async_cds_handler = None
+        self._key_index = LRUCache(maxsize=KEY_INDEX_SIZE)
+        self._rendered = LRUCache(maxsize=RENDER_CACHE_SIZE)
+        self._lazy_languages = False
+        # The languages fetched so far in lazy mode and the events of the
+        # languages currently being fetched, guarded by `_loading_lock`
+        self._loaded_languages = set()
+        self._loading_languages = {}
+        self._loading_lock = threading.Lock()
+        # Set once translations have been fetched from the CDS
+        self.translations_ready = threading.Event()
+        self._warmup = False
+        # The languages waiting to be warmed up and the thread warming them
+        # up, guarded by `_warmup_lock`
+        self._warmup_pending = set()
+        self._warmup_thread = None
+        self._warmup_lock = threading.Lock()
+        # The templates of each language that cannot be compiled, as found
+        # by `validate()`; replaced as a whole, never mutated
+        self._invalid_templates = {}
         self.initialized = False
 
     def init(
         self, languages, token, secret=None, cds_host=None,
         missing_policy=None, error_policy=None, cache=None,
-        fetch_all_langs=False,
+        fetch_all_langs=False, template_cache_size=None,
+        key_index_size=None, render_cache_size=None, lazy_languages=False,
+        bundle=None, warmup=False, cds_pool_size=None, cds_timeout=None,
+        stream_translations=False,
     ):
         """Create an instance of the core framework class.
 
@@ -59,16 +116,65 @@ class TxNative(object):
             to determine how to handle rendering errors
         :param AbstractCache cache: an optional cache
         :param bool fetch_all_langs: force pull all remote languages
+        :param int template_cache_size: an optional maximum number of
+            compiled ICU templates to keep in memory; 0 disables the cache
+        :param int key_index_size: an optional maximum number of source
+            strings whose keys are kept in memory; 0 disables the index
+        :param int render_cache_size: an optional maximum number of rendered
+            translations without parameters to keep in memory; memoizing
+            rendered strings is disabled by default
+        :param bool lazy_languages: if True, each language is fetched the
+            first time a translation is requested for it, instead of all
+            languages being fetched by `fetch_translations()`
+        :param str bundle: the path of an optional bundle file (see
+            `save_bundle()`) to populate the cache with, so that only
+            languages updated since the bundle was created are downloaded
+        :param bool warmup: if True, the translations of each language are
+            compiled in a background thread whenever they are fetched, so
+            that rendering them for the first time does not parse them
+        :param int cds_pool_size: an optional maximum number of connections
+            to the CDS to keep open for reuse
+        :param cds_timeout: an optional timeout for each request to the CDS,
+            in seconds, either a number or a (connect, read) tuple
+        :param bool stream_translations: if True, fetched translations are
+            decoded while being downloaded, which lowers the peak memory
+            used by fetching large languages; the cache then receives
+            translation strings instead of the entries of the CDS (see
+            `CDSHandler`)
         """
         self._languages = languages
         self._cache = cache or MemoryCache()
         self._missing_policy = missing_policy or SourceStringPolicy()
         self._error_policy = error_policy or SourceStringErrorPolicy()
-        self._cds_handler = CDSHandler(
-            self._languages, token, secret=secret, host=cds_host,
-            fetch_all_langs=fetch_all_langs,
+        cds_options = dict(
+            secret=secret, host=cds_host,
+            fetch_all_langs=fetch_all_langs, pool_size=cds_pool_size,
+            timeout=cds_timeout, stream=stream_translations,
+        )
+        self._cds_handler = CDSHandler(self._languages, token, **cds_options)
+        self._async_cds_handler = AsyncCDSHandler(
+            self._languages, token, **cds_options
         )
+        # Both handlers keep track of the same versions of the translations,
+        # persisted along with them if the cache supports it
+        etags = self._cache.get_etag_store() or EtagStore()
+        self._cds_handler.etags = self._async_cds_handler.etags = etags
+        if template_cache_size is not None:
+            compiled_templates.resize(template_cache_size)
+        if key_index_size is not None:
+            self._key_index.resize(key_index_size)
+        if render_cache_size is not None:
+            self._rendered.resize(render_cache_size)
+        self._rendered.clear()
+        self._lazy_languages = lazy_languages
+        self._warmup = warmup
+        with self._loading_lock:
+            self._loaded_languages = set()
+        self.translations_ready.clear()
+        self._invalid_templates = {}
         self.initialized = True
+        if bundle:
+            self.load_bundle(bundle)
 
     def translate(
         self, source_string, language_code, is_source=False,
@@ -99,6 +205,20 @@ class TxNative(object):
 
         self._check_initialization()
 
+        # Translations without parameters always render to the same string
+        # for a given version of the cache, so they can be memoized
+        memo_key = version = None
+        if not params and self._rendered.maxsize:
+            version = self._cache.version
+            if version is not None:
+                memo_key = self._get_memo_key(
+                    source_string, language_code, is_source, _context,
+                    escape, _key,
+                )
+                memoized = self._rendered.get(memo_key)
+                if memoized is not None and memoized[0] == version:
+                    return memoized[1]
+
         translation_template = self.get_translation(
             source_string=source_string,
             language_code=language_code,
@@ -107,13 +227,85 @@ class TxNative(object):
             _key=_key,
         )
 
-        return self.render_translation(
+        rendered = self.render_translation(
             translation_template=translation_template,
             params=params,
             source_string=source_string,
             language_code=language_code,
             escape=escape,
         )
+        if memo_key is not None:
+            self._rendered.set(memo_key, (version, rendered))
+        return rendered
+
+    def translate_many(self, items, language_code, is_source=False,
+                       escape=True):
+        """Translate multiple strings to the provided language at once.
+
+        All keys are resolved in a single pass against the cache, and all
+        strings are rendered with the same policies, which is cheaper than
+        calling `translate()` for each string separately.
+
+        :param iterable items: (source_string, params, _context, _key) tuples,
+            with the same meaning as the respective arguments of
+            `translate()`; `params`, `_context` and `_key` can be None
+        :param str language_code: the language to translate to
+        :param bool is_source: a boolean indicating whether `translate_many`
+            is being used for the source language
+        :param bool escape: if True, the returned strings will be
+            HTML-escaped, otherwise they won't
+        :return: the rendered strings, in the order of the given items
+        :rtype: list
+        """
+        self._check_initialization()
+        if self._lazy_languages:
+            self.ensure_language(language_code)
+
+        items = list(items)
+        results = [None] * len(items)
+        version = self._cache.version if self._rendered.maxsize else None
+
+        pending, lookups = [], []
+        for index, (source_string, params, _context, _key) in \
+                enumerate(items):
+            memo_key = None
+            if not params and version is not None:
+                memo_key = self._get_memo_key(
+                    source_string, language_code, is_source, _context,
+                    escape, _key,
+                )
+                memoized = self._rendered.get(memo_key)
+                if memoized is not None and memoized[0] == version:
+                    results[index] = memoized[1]
+                    continue
+
+            resolved = self.resolve_keys(source_string, _context)
+            if _key is not None:
+                lookups.append((_key, None))
+            elif resolved.key is None:
+                raise ValueError("You need to specify at least a `string`")
+            else:
+                lookups.append((resolved.key, resolved.hashed_key))
+            pending.append((index, resolved, memo_key))
+
+        templates = self._cache.get_many(lookups, language_code)
+        for (index, resolved, memo_key), translation_template in \
+                zip(pending, templates):
+            source_string, params, _context, _key = items[index]
+            rendered = self.render_translation(
+                translation_template=self._finalize_translation(
+                    translation_template, resolved, source_string, is_source,
+                ),
+                params=params or {},
+                source_string=source_string,
+                language_code=language_code,
+                escape=escape,
+            )
+            if memo_key is not None:
+                self._rendered.set(memo_key, (version, rendered))
+            results[index] = rendered
+
+        return results
 
     def get_translation(self, source_string, language_code, _context,
                         is_source=False, _key=None):
@@ -129,26 +321,42 @@ class TxNative(object):
         for the source language, it will be used instead of the
         original source_string provided here.
         """
-        pluralized, plurals = parse_plurals(source_string)
+        if self._lazy_languages:
+            self.ensure_language(language_code)
+        resolved = self.resolve_keys(source_string, _context)
 
         if _key is not None:
             # Custom key
             translation_template = self._cache.get(_key, language_code)
         else:
-            # Source based key
-            _key = generate_key(string=source_string, context=_context)
-            translation_template = self._cache.get(_key, language_code)
-            if not translation_template:
-                # Fallback to hashed based key
-                _key = generate_hashed_key(
-                    string=source_string, context=_context)
-                translation_template = self._cache.get(_key, language_code)
+            if resolved.key is None:
+                raise ValueError("You need to specify at least a `string`")
+            # Source based key, falling back to the hashed based key
+            translation_template = self._cache.get_aliased(
+                resolved.key, resolved.hashed_key, language_code,
+            )
 
-        if (translation_template is not None and pluralized and
+        return self._finalize_translation(
+            translation_template, resolved, source_string, is_source,
+        )
+
+    def _finalize_translation(self, translation_template, resolved,
+                              source_string, is_source):
+        """Return the translation template to render for a cached
+        translation.
+
+        :param unicode translation_template: the translation found in the
+            cache, if any
+        :param ResolvedKeys resolved: the resolved keys of the source string
+        :param unicode source_string: the source string
+        :param bool is_source: whether the source language is rendered
+        :return: the translation template
+        :rtype: unicode
+        """
+        if (translation_template is not None and resolved.pluralized and
                 translation_template.startswith('{???')):
-            variable_name = source_string[1:source_string.index(',')].strip()
             translation_template = '{{{var}{content}'.format(
-                var=variable_name,
+                var=resolved.variable,
                 content=translation_template[4:],
             )
 
@@ -160,13 +368,82 @@ class TxNative(object):
 
         return translation_template
 
+    def _get_memo_key(self, source_string, language_code, is_source,
+                      _context, escape, _key):
+        """Return the key under which a rendered translation without
+        parameters is memoized."""
+        return (
+            _key, source_string,
+            tuple(_context) if isinstance(_context, list) else _context,
+            language_code, escape, is_source,
+        )
+
+    def resolve_keys(self, source_string, context=None):
+        """Return the keys and plural information of the given source string.
+
+        Resolving a source string requires parsing its plurals and hashing
+        its content, so the results are kept in a bounded, per-process index
+        that all translation entry points share.
+
+        :param unicode source_string: the source string to resolve
+        :param Union[unicode, list] context: an optional context that
+            accompanies the string
+        :return: the resolved keys of the source string
+        :rtype: ResolvedKeys
+        """
+        if not source_string:
+            # Empty strings can only be looked up with a custom key
+            return ResolvedKeys(False, None, None, None)
+
+        index_key = (
+            source_string,
+            tuple(context) if isinstance(context, list) else context,
+        )
+        resolved = self._key_index.get(index_key)
+        if resolved is None:
+            pluralized, _ = parse_plurals(source_string)
+            resolved = ResolvedKeys(
+                pluralized=pluralized,
+                variable=(
+                    source_string[1:source_string.index(',')].strip()
+                    if pluralized else None
+                ),
+                key=generate_key(string=source_string, context=context),
+                hashed_key=generate_hashed_key(
+                    string=source_string, context=context,
+                ),
+            )
+            self._key_index.set(index_key, resolved)
+        return resolved
+
     def render_translation(self, translation_template, params, source_string,
                            language_code, escape=False):
         """Replace the variables in the ICU translation and return the final
         string in the given language.
 
         If any error occurs during rendering, the error policy is invoked.
+        Translations that are known to be invalid (see `validate()`) are
+        passed to the error policy without attempting to render them.
         """
+        if self._invalid_templates and \
+                split_leading_argument(translation_template)[0] in \
+                self._invalid_templates.get(language_code, ()):
+            if throttle_error(
+                ('invalid', translation_template, language_code),
+            ) is not None:
+                logger.warning(
+                    'Translation `{}` in language `{}` is invalid, '
+                    'using the error policy instead'.format(
+                        translation_template, language_code,
+                    )
+                )
+            return self._error_policy.get(
+                source_string=source_string,
+                translation=translation_template,
+                language_code=language_code,
+                escape=escape,
+                params=params,
+            )
 
         try:
             return StringRenderer.render(
@@ -186,10 +463,423 @@ class TxNative(object):
                 params=params,
             )
 
-    def fetch_translations(self):
-        """Fetch fresh content from the CDS."""
+    def fetch_translations(self, timeout=None):
+        """Fetch fresh content from the CDS.
+
+        In lazy mode, only the languages that have already been requested
+        are refreshed. Caches that are shared between processes may skip
+        fetching, if another process has fetched them recently (see
+        `AbstractCache.fetch_lock()`).
+
+        The languages that have changed are validated (see `validate()`)
+        and, if enabled, warmed up in the background (see `warm_up()`).
+        Sets `translations_ready` once done; if fetching raises an error or
+        any of the languages cannot be fetched, e.g. because the timeout
+        was reached, `translations_ready` is left as it was.
+
+        :param float timeout: an optional number of seconds after which
+            languages that have not been fetched yet are given up on, until
+            the next fetch
+        """
+        self._check_initialization()
+        version = self._cache.version
+        kwargs = self._get_fetch_kwargs(timeout)
+        if kwargs is None:
+            self.translations_ready.set()
+            return
+        data, failed = None, set()
+        with self._cache.fetch_lock() as should_fetch:
+            if should_fetch:
+                data = self._cds_handler.fetch_translations(
+                    failed=failed, **kwargs
+                )
+                self._update_cache(data)
+        language_codes = self._get_changed_languages(
+            kwargs.get('language_codes') or self._languages,
+            version, self._cache.version, data,
+        )
+        if language_codes:
+            self.validate(language_codes)
+        if not failed:
+            self.translations_ready.set()
+        if self._warmup:
+            self._schedule_warmup(language_codes)
+
+    async def afetch_translations(self, timeout=None):
+        """Fetch fresh content from the CDS without blocking the event loop.
+
+        The asyncio counterpart of `fetch_translations()`: translations are
+        fetched with an AsyncCDSHandler, which requires aiohttp, while
+        accessing the cache runs in the default executor of the loop. The
+        fetch lock of the cache is held by an executor thread until the
+        fetched translations are stored.
+
+        :param float timeout: an optional number of seconds after which
+            languages that have not been fetched yet are given up on, until
+            the next fetch
+        """
+        import asyncio
+
+        self._check_initialization()
+        loop = asyncio.get_event_loop()
+        version = await loop.run_in_executor(
+            None, lambda: self._cache.version,
+        )
+        kwargs = self._get_fetch_kwargs(timeout)
+        if kwargs is None:
+            self.translations_ready.set()
+            return
+        failed = set()
+
+        def fetch():
+            # The lock is acquired and released by the same thread, while
+            # translations are fetched on the event loop
+            with self._cache.fetch_lock() as should_fetch:
+                if not should_fetch:
+                    return None
+                data = asyncio.run_coroutine_threadsafe(
+                    self._async_cds_handler.fetch_translations(
+                        failed=failed, **kwargs
+                    ),
+                    loop,
+                ).result()
+                self._update_cache(data)
+                return data
+
+        data = await loop.run_in_executor(None, fetch)
+        new_version = await loop.run_in_executor(
+            None, lambda: self._cache.version,
+        )
+        language_codes = self._get_changed_languages(
+            kwargs.get('language_codes') or self._languages,
+            version, new_version, data,
+        )
+        if language_codes:
+            await loop.run_in_executor(
+                None, self.validate, language_codes,
+            )
+        if not failed:
+            self.translations_ready.set()
+        if self._warmup:
+            self._schedule_warmup(language_codes)
+
+    def _get_changed_languages(self, language_codes, version, new_version,
+                               data):
+        """Return the languages whose translations a refresh has changed.
+
+        If translations were fetched, these are the languages that the CDS
+        returned fresh content for. Otherwise, the cache may still have
+        changed, e.g. because another process has updated a shared cache;
+        as it is not known which languages changed then, all of the given
+        ones are returned.
+
+        :param list language_codes: the languages that were refreshed
+        :param int version: the version of the cache before the refresh
+        :param int new_version: the version of the cache after it
+        :param dict data: the fetched translations, if any, formatted as
+            explained in AbstractCache.update()
+        :rtype: list
+        """
+        if data is not None:
+            return sorted(
+                language_code
+                for language_code, (refreshed, _) in data.items()
+                if refreshed
+            )
+        if version is None or new_version != version:
+            return list(language_codes)
+        return []
+
+    def _update_cache(self, data):
+        """Store the given translations in the cache, followed by the ETags
+        they were fetched with.
+
+        :param dict data: the translations, formatted as explained in
+            AbstractCache.update()
+        """
+        self._cache.update(data)
+        self._cds_handler.etags.save()
+
+    def _get_fetch_kwargs(self, timeout):
+        """Return the arguments to fetch translations from the CDS with.
+
+        :param float timeout: an optional number of seconds to fetch for
+        :return: the keyword arguments of `CDSHandler.fetch_translations()`,
+            or None if there is nothing to fetch
+        :rtype: dict
+        """
+        kwargs = {}
+        if timeout is not None:
+            kwargs['deadline'] = time.time() + timeout
+        if self._lazy_languages:
+            with self._loading_lock:
+                kwargs['language_codes'] = sorted(self._loaded_languages)
+            if not kwargs['language_codes']:
+                return None
+        return kwargs
+
+    def fetch_translations_in_background(self, timeout=None, callback=None):
+        """Fetch fresh content from the CDS in a background thread.
+
+        Allows an application to start serving before translations are
+        fetched, using the source strings or any content already in the
+        cache, e.g. a bundle or a persistent cache. `translations_ready` is
+        set once translations have been fetched successfully, while
+        `callback` is called once fetching has finished, whether it
+        succeeded or not.
+
+        :param float timeout: an optional number of seconds after which
+            fetching is given up on, as in `fetch_translations()`
+        :param callable callback: an optional function to call once
+            fetching has finished, with the exception that was raised or
+            None if fetching succeeded
+        :return: the thread that fetches the translations
+        :rtype: threading.Thread
+        """
+        self._check_initialization()
+
+        def fetch():
+            error = None
+            try:
+                self.fetch_translations(timeout=timeout)
+            except Exception as e:
+                error = e
+                logger.exception('Error fetching translations in background')
+            if callback is not None:
+                callback(error)
+
+        thread = threading.Thread(target=fetch, name='transifex-fetch')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def validate(self, language_codes):
+        """Find the translations of the given languages that cannot be
+        compiled.
+
+        Rendering such translations would fail every time, so they are
+        passed to the error policy directly instead. Each invalid
+        translation is logged once per validation.
+
+        The CDS serves pluralized translations as `{???, plural, ...}`,
+        which are only rendered once `{???` is replaced by the variable of
+        the source string. Translations are therefore validated and kept
+        in the form that is rendered regardless of that variable (see
+        `split_leading_argument()`).
+
+        :param list language_codes: the language codes to validate
+        :return: a dictionary of the invalid translations per language code
+        :rtype: dict
+        """
+        found = {}
+        for language_code in language_codes:
+            invalid = set(
+                string for string in self._cache.iter_strings(language_code)
+                if not StringRenderer.validate(string, language_code)
+            )
+            for template in sorted(invalid):
+                logger.warning(
+                    'Translation `{}` in language `{}` is invalid and will '
+                    'not be rendered'.format(template, language_code)
+                )
+            found[language_code] = frozenset(
+                split_leading_argument(template)[0] for template in invalid
+            )
+
+        with self._loading_lock:
+            invalid_templates = dict(self._invalid_templates)
+            for language_code, invalid in found.items():
+                if invalid:
+                    invalid_templates[language_code] = invalid
+                else:
+                    invalid_templates.pop(language_code, None)
+            self._invalid_templates = invalid_templates
+        return found
+
+    def warm_up(self, language_codes):
+        """Compile the translations of the given languages ahead of
+        rendering them.
+
+        Both the raw and the HTML-escaped form of each translation are
+        compiled, as either may be rendered. Translations that cannot be
+        compiled are logged, and are then rendered through the error policy
+        without being parsed again.
+
+        Stops once a share of the compiled template cache has been filled
+        (see WARMUP_CACHE_SHARE), so that the templates already in use are
+        not evicted, and pauses regularly, so that it does not starve other
+        threads.
+
+        :param list language_codes: the language codes to warm up
+        :return: a list of (language_code, template) tuples for the
+            templates that could not be compiled
+        :rtype: list
+        """
+        limit = compiled_templates.maxsize
+        if limit is not None:
+            limit = int(limit * WARMUP_CACHE_SHARE)
+        compiled, failed = 0, []
+        for language_code in language_codes:
+            for string in self._cache.iter_strings(language_code):
+                for template in {string, html_escape(string)}:
+                    if '{' not in template and '}' not in template:
+                        # Rendered without compiling
+                        continue
+                    if limit is not None and compiled >= limit:
+                        return failed
+                    try:
+                        StringRenderer.compile(template, language_code)
+                    except Exception as e:
+                        logger.warning(
+                            'Translation `{}` in language `{}` could not be '
+                            'compiled: {}'.format(template, language_code, e)
+                        )
+                        failed.append((language_code, template))
+                    compiled += 1
+                    if compiled % WARMUP_BATCH_SIZE == 0:
+                        time.sleep(WARMUP_PAUSE)
+        return failed
+
+    def _schedule_warmup(self, language_codes):
+        """Warm up the given languages in a background thread.
+
+        Languages scheduled while a warm-up is running are warmed up by the
+        same thread once it is done with the current ones.
+        """
+        if not language_codes:
+            return
+        with self._warmup_lock:
+            self._warmup_pending.update(language_codes)
+            if self._warmup_thread is not None:
+                return
+            thread = self._warmup_thread = threading.Thread(
+                target=self._run_warmup, name='transifex-warmup',
+            )
+            thread.daemon = True
+        thread.start()
+
+    def _run_warmup(self):
+        while True:
+            with self._warmup_lock:
+                if not self._warmup_pending:
+                    self._warmup_thread = None
+                    return
+                language_codes = sorted(self._warmup_pending)
+                self._warmup_pending.clear()
+            try:
+                self.warm_up(language_codes)
+            except Exception:
+                logger.exception('Error warming up translations')
+
+    def load_bundle(self, path):
+        """Populate the cache with the translations of a bundle file.
+
+        The ETags of the bundled languages are kept as well, so that the
+        next fetch from the CDS only downloads languages that have changed.
+        Languages that the cache already holds, e.g. because it persists
+        its content or is shared with other processes, are left as they
+        are along with their ETags, as they may be newer than the bundle.
+        Errors are logged, leaving the cache intact.
+
+        :param str path: the path of the bundle file
+        :return: True if the bundle was loaded, False otherwise
+        :rtype: bool
+        """
+        self._check_initialization()
+        try:
+            data, etags = read_bundle(path)
+        except BundleError as e:
+            logger.error('Error loading translation bundle: {}'.format(e))
+            return False
+        seeded = {
+            language_code: translations
+            for language_code, translations in data.items()
+            if not self._cache.has_language(language_code)
+        }
+        if seeded:
+            for language_code in seeded:
+                self._cds_handler.etags.set(
+                    language_code, etags[language_code],
+                )
+            self._update_cache(seeded)
+            self.validate(list(seeded))
+        with self._loading_lock:
+            self._loaded_languages.update(data)
+        return True
+
+    def save_bundle(self, path):
+        """Fetch all translations from the CDS and write them to a bundle
+        file, which can later be loaded with `load_bundle()`.
+
+        :param str path: the path of the bundle file
+        :return: a tuple of the language codes that were bundled and of those
+            that could not be fetched
+        :rtype: tuple
+        """
         self._check_initialization()
-        self._cache.update(self._cds_handler.fetch_translations())
+        # Use a handler without any ETags, so that all content is downloaded
+        cds_handler = copy.copy(self._cds_handler)
+        cds_handler.etags = EtagStore()
+        data = cds_handler.fetch_translations()
+        translations = {
+            language_code: language_translations
+            for language_code, (refreshed, language_translations)
+            in data.items() if refreshed
+        }
+        write_bundle(path, translations, {
+            language_code: cds_handler.etags.get(language_code)
+            for language_code in translations
+        })
+        return (
+            sorted(translations),
+            sorted(set(data) - set(translations)),
+        )
+
+    def ensure_language(self, language_code):
+        """Fetch the translations of the given language, unless they have
+        already been fetched.
+
+        Used in lazy mode, where languages are fetched on first use.
+        Concurrent calls for the same language result in a single request
+        to the CDS; the rest of the callers wait for it to complete.
+        Once fetched, the language is refreshed by `fetch_translations()`.
+
+        :param str language_code: the language code to fetch
+        """
+        if language_code in self._loaded_languages:
+            return
+        with self._loading_lock:
+            if language_code in self._loaded_languages:
+                return
+            event = self._loading_languages.get(language_code)
+            is_leader = event is None
+            if is_leader:
+                event = self._loading_languages[language_code] = \
+                    threading.Event()
+        if not is_leader:
+            event.wait()
+            return
+
+        try:
+            data = self._cds_handler.fetch_translations(
+                language_code=language_code,
+            )
+            self._update_cache(data)
+            language_codes = self._get_changed_languages(
+                [language_code], None, None, data,
+            )
+            if language_codes:
+                self.validate(language_codes)
+            if self._warmup:
+                self._schedule_warmup(language_codes)
+        finally:
+            # The language is marked as loaded even if fetching failed,
+            # so that it is retried by the next refresh instead of on
+            # every lookup
+            with self._loading_lock:
+                self._loaded_languages.add(language_code)
+                del self._loading_languages[language_code]
+            event.set()
 
     def push_source_strings(self, strings, purge=False):
         """Push the given source strings to the CDS.
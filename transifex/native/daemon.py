@@ -12,18 +12,31 @@ class DaemonicThread(threading.Thread):
     translations periodically."""
     daemon = True
     should_exit = False
+    delay = 0
+    startup_fetch = None
 
-    def start_daemon(self, interval):
+    def start_daemon(self, interval, delay=0, startup_fetch=None):
         """Start the daemon.
 
         Calls `threading.Thread.start()` to schedule execution in a different thread.
 
         :param int interval: the interval the daemon will use when fetching
             translations.
+        :param int delay: the seconds to wait before the first fetch, e.g.
+            when translations have just been fetched at startup; it only
+            applies if all translations have been fetched successfully
+            (see `TxNative.translations_ready`), otherwise the daemon
+            fetches them right away
+        :param threading.Thread startup_fetch: an optional thread that
+            fetches translations at startup (see
+            `TxNative.fetch_translations_in_background()`), which the
+            daemon waits for before the first fetch
         """
         if self.is_daemon_running(log_errors=False):
             return False
         self.interval = interval
+        self.delay = delay
+        self.startup_fetch = startup_fetch
         self.start()
         return True
 
@@ -32,6 +45,10 @@ class DaemonicThread(threading.Thread):
         Fetches translations in an interval. Will not stop if exceptions are
         raised.
         """
+        if self.startup_fetch is not None:
+            self.startup_fetch.join()
+        if self.delay and tx.translations_ready.is_set():
+            time.sleep(self.delay)
         while not self.should_exit:
             logger.debug('Will fetch translations')
             try:
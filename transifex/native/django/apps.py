@@ -92,15 +92,37 @@ class NativeConfig(AppConfig):
             error_policy=error_policy,
             cache=cache,
             fetch_all_langs=native_settings.TRANSIFEX_FETCH_ALL_LANGUAGES,
+            template_cache_size=native_settings.TRANSIFEX_TEMPLATE_CACHE_SIZE,
+            key_index_size=native_settings.TRANSIFEX_KEY_INDEX_SIZE,
+            render_cache_size=native_settings.TRANSIFEX_RENDER_CACHE_SIZE,
+            lazy_languages=native_settings.TRANSIFEX_LAZY_LANGUAGES,
+            bundle=native_settings.TRANSIFEX_BUNDLE,
+            warmup=native_settings.TRANSIFEX_WARMUP,
+            cds_pool_size=native_settings.TRANSIFEX_CDS_POOL_SIZE,
+            cds_timeout=native_settings.TRANSIFEX_CDS_TIMEOUT,
+            stream_translations=(
+                native_settings.TRANSIFEX_STREAM_TRANSLATIONS
+            ),
         )
 
         if fetch_translations:
-            logger.info(
-                'Fetching translations for languages: {}'.format(
-                    ', '.join(languages)
+            timeout = native_settings.TRANSIFEX_STARTUP_TIMEOUT
+            if native_settings.TRANSIFEX_BLOCKING_STARTUP:
+                logger.info(
+                    'Fetching translations for languages: {}'.format(
+                        ', '.join(languages)
+                    )
+                )
+                tx.fetch_translations(timeout=timeout)
+                startup_fetch = None
+            else:
+                logger.info(
+                    'Fetching translations in the background for '
+                    'languages: {}'.format(', '.join(languages))
+                )
+                startup_fetch = tx.fetch_translations_in_background(
+                    timeout=timeout,
                 )
-            )
-            tx.fetch_translations()
 
             if native_settings.TRANSIFEX_SYNC_INTERVAL != 0:
                 logger.info('Starting daemon for OTA translations update')
@@ -108,7 +130,13 @@ class NativeConfig(AppConfig):
                     native_settings.TRANSIFEX_SYNC_INTERVAL
                     or 30*60
                 )
-                daemon.start_daemon(interval=sync_interval)
+                # Translations are already being fetched at startup, so
+                # the daemon only has to fetch them after an interval, unless
+                # fetching them fails
+                daemon.start_daemon(
+                    interval=sync_interval, delay=sync_interval,
+                    startup_fetch=startup_fetch,
+                )
                 request_finished.connect(daemon.is_daemon_running)
             else:
                 logger.info('Syncing daemon will not be started')
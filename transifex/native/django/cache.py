@@ -0,0 +1,267 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from hashlib import md5
+
+from django.core.cache import caches
+from transifex.native.cache import AbstractCache, build_alias_table
+from transifex.native.rendering import StringRenderer
+
+# The number of seconds after which the lock for publishing versions
+# expires, and how often a process waiting for it checks it
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+
+class DjangoCache(AbstractCache):
+    """A cache that stores translations in a cache of the Django cache
+    framework, e.g. memcached or redis, so that they are fetched once and
+    shared by all processes that use the same cache.
+
+    Each update of a language is written under a new version of the
+    language, in batches, and is published by switching the version of the
+    language in a single entry afterwards, so readers never see a partially
+    written language. The entries of older versions are deleted on the next
+    update, allowing processes that still read them to catch up.
+
+    Publishing reads and writes the versions of all languages, so it is
+    serialized across processes with a lock in the Django cache, held only
+    while the versions entry is updated.
+
+    Processes check for versions published by others at most once per
+    `reload_interval` seconds. Every lookup queries the Django cache, so it
+    is best used as the backend of a TieredCache:
+        TRANSIFEX_CACHE = (
+            'transifex.native.cache.TieredCache',
+            {'backend': ('transifex.native.django.cache.DjangoCache',
+                         {'alias': 'default'})},
+        )
+
+    Note that the Django cache should not evict entries on its own, e.g.
+    because of being too small, or evicted translations will be reported
+    as missing.
+    """
+
+    def __init__(self, alias='default', key_prefix='transifex',
+                 batch_size=1000, fetch_interval=60, reload_interval=10):
+        """Constructor.
+
+        :param str alias: the alias of the Django cache to use, as defined
+            in the CACHES setting
+        :param str key_prefix: the prefix of all keys of the Django cache
+        :param int batch_size: the maximum number of translations to write
+            with a single request
+        :param int fetch_interval: the minimum number of seconds between
+            two fetches by any of the processes that share the cache
+        :param int reload_interval: the number of seconds after which the
+            versions of the languages are checked for updates by others
+        """
+        self.alias = alias
+        self.key_prefix = key_prefix
+        self.batch_size = batch_size
+        self.fetch_interval = fetch_interval
+        self.reload_interval = reload_interval
+        # A (version, {language_code: [current, previous]}) tuple, where
+        # `version` changes whenever any of the languages changes
+        self._snapshot = (0, {})
+        self._checked_at = None
+        self._update_lock = threading.Lock()
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    @property
+    def version(self):
+        self._check_versions()
+        return self._snapshot[0]
+
+    def _make_key(self, *parts):
+        return ':'.join((self.key_prefix,) + tuple(
+            str(part) for part in parts
+        ))
+
+    def _make_translation_key(self, language_code, language_version, key):
+        return self._make_key(
+            language_code, language_version,
+            md5(key.encode('utf-8')).hexdigest(),
+        )
+
+    def _check_versions(self):
+        """Reload the versions of the languages, if they have not been
+        checked for `reload_interval` seconds."""
+        checked_at = self._checked_at
+        if checked_at is None or \
+                time.time() - checked_at >= self.reload_interval:
+            self.reload()
+
+    def reload(self):
+        """Load the versions of the languages published by any process."""
+        self._checked_at = time.time()
+        versions = self._cache.get(self._make_key('versions')) or {}
+        with self._update_lock:
+            version, current = self._snapshot
+            if versions == current:
+                return
+            changed = [
+                language_code for language_code in set(versions) | set(current)
+                if versions.get(language_code) != current.get(language_code)
+            ]
+            self._snapshot = (version + 1, versions)
+        StringRenderer.invalidate(changed)
+
+    def get(self, key, language_code):
+        versions = self._get_language_versions(language_code)
+        if versions is None:
+            return None
+        return self._cache.get(
+            self._make_translation_key(language_code, versions[0], key),
+        )
+
+    def get_aliased(self, key, alias, language_code):
+        """Return the translation for the given key or alias.
+
+        As in MemoryCache, source based keys are stored under their hashed
+        aliases as well, so looking up the alias is enough.
+        """
+        return self.get(alias, language_code)
+
+    def get_many(self, lookups, language_code):
+        versions = self._get_language_versions(language_code)
+        if versions is None:
+            return [None] * len(lookups)
+        keys = [
+            self._make_translation_key(
+                language_code, versions[0],
+                alias if alias is not None else key,
+            )
+            for key, alias in lookups
+        ]
+        found = self._cache.get_many(keys)
+        return [found.get(key) for key in keys]
+
+    def has_language(self, language_code):
+        self.reload()
+        return language_code in self._snapshot[1]
+
+    def _get_language_versions(self, language_code):
+        self._check_versions()
+        return self._snapshot[1].get(language_code)
+
+    def update(self, data):
+        """Write the given data to the Django cache and publish it.
+
+        The keys written for each language version are recorded along with
+        it, so that the entries of obsolete versions can be deleted even if
+        their keys are not part of newer versions.
+
+        :param dict data: the data to use in the cache, formatted as
+            explained in AbstractCache.update()
+        """
+        cache = self._cache
+        alias_memo = {}
+        published = {}
+        for language_code, (should_update, translations) in data.items():
+            if not should_update:
+                continue
+            table = build_alias_table(translations, alias_memo)
+            language_version = self._next_language_version()
+            items = list(table.items())
+            chunks = 0
+            for start in range(0, len(items), self.batch_size):
+                entries = {
+                    self._make_translation_key(
+                        language_code, language_version, key,
+                    ): string
+                    for key, string in items[start:start + self.batch_size]
+                }
+                cache.set_many(entries, timeout=None)
+                cache.set(
+                    self._make_key(
+                        language_code, language_version, 'keys', chunks,
+                    ),
+                    list(entries), timeout=None,
+                )
+                chunks += 1
+            cache.set(
+                self._make_key(language_code, language_version, 'keys'),
+                chunks, timeout=None,
+            )
+            published[language_code] = language_version
+        if not published:
+            return
+
+        versions_key = self._make_key('versions')
+        obsolete = []
+        # Other processes may publish their own updates, e.g. of lazily
+        # loaded languages, so the versions are read and written under a
+        # lock shared by all processes
+        with self._versions_lock():
+            versions = dict(cache.get(versions_key) or {})
+            for language_code, language_version in published.items():
+                previous = versions.get(language_code)
+                versions[language_code] = [
+                    language_version, previous[0] if previous else None,
+                ]
+                if previous and previous[1] is not None:
+                    obsolete.append((language_code, previous[1]))
+            cache.set(versions_key, versions, timeout=None)
+        for language_code, language_version in obsolete:
+            self._delete_language_version(language_code, language_version)
+        self.reload()
+
+    def _delete_language_version(self, language_code, language_version):
+        """Delete the entries written for the given language version."""
+        cache = self._cache
+        count_key = self._make_key(language_code, language_version, 'keys')
+        chunk_keys = [
+            self._make_key(language_code, language_version, 'keys', index)
+            for index in range(cache.get(count_key) or 0)
+        ]
+        for chunk_key in chunk_keys:
+            keys = cache.get(chunk_key) or []
+            for start in range(0, len(keys), self.batch_size):
+                cache.delete_many(keys[start:start + self.batch_size])
+        cache.delete_many(chunk_keys + [count_key])
+
+    @contextmanager
+    def _versions_lock(self):
+        """Serialize publishing versions across processes.
+
+        The lock expires after LOCK_TIMEOUT seconds, so that a process that
+        dies while holding it does not block the rest.
+        """
+        cache = self._cache
+        lock_key = self._make_key('versions', 'lock')
+        token = uuid.uuid4().hex
+        while not cache.add(lock_key, token, timeout=LOCK_TIMEOUT):
+            time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    def _next_language_version(self):
+        """Return a new version number, unique among all processes."""
+        counter_key = self._make_key('counter')
+        self._cache.add(counter_key, 0, timeout=None)
+        try:
+            return self._cache.incr(counter_key)
+        except ValueError:
+            # The counter was evicted in the meantime
+            self._cache.add(counter_key, 0, timeout=None)
+            return self._cache.incr(counter_key)
+
+    @contextmanager
+    def fetch_lock(self):
+        """Allow a single process to fetch translations per
+        `fetch_interval`, while the rest load its result."""
+        if self._cache.add(
+            self._make_key('fetch'), time.time(), timeout=self.fetch_interval,
+        ):
+            yield True
+        else:
+            self.reload()
+            yield False
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 
 from django.core.management import BaseCommand, CommandParser
+from transifex.native.django.management.utils.bundle import Bundle
 from transifex.native.django.management.utils.invalidate import Invalidate
 from transifex.native.django.management.utils.migrate import Migrate
 from transifex.native.django.management.utils.push import Push
@@ -18,6 +19,9 @@ class Command(BaseCommand):
         - invalidate: Invalidate CDS, forcing it to re-cache fresh
                 translations.
 
+        - bundle: Downloads the translations of all languages from CDS
+                  and saves them to a bundle file.
+
         - migrate: Migrates files using the Django i18n syntax to Transifex
                    Native syntax.
 
@@ -33,6 +37,7 @@ class Command(BaseCommand):
         self.subcommands = {'migrate': Migrate(),
                             'push': Push(),
                             'invalidate': Invalidate(),
+                            'bundle': Bundle(),
                             'try-templatetag': TryTemplatetag()}
 
     def add_arguments(self, parser):
@@ -0,0 +1,42 @@
+from __future__ import absolute_import, unicode_literals
+
+from transifex.common.console import Color
+from transifex.native import tx
+from transifex.native.django.management.utils.base import CommandMixin
+
+
+class Bundle(CommandMixin):
+
+    def add_arguments(self, subparsers):
+        parser = subparsers.add_parser(
+            'bundle',
+            help=('Download the translations of all languages from CDS and '
+                  'save them to a bundle file, which can be loaded on '
+                  'startup through the TRANSIFEX_BUNDLE setting.'),
+        )
+        parser.add_argument(
+            '--output', '-o', dest='output',
+            default='transifex-bundle.json.gz',
+            help=('The path of the bundle file '
+                  '(default: "transifex-bundle.json.gz").'),
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        Color.echo('Downloading translations...')
+
+        bundled, failed = tx.save_bundle(output)
+
+        Color.echo(
+            '[green]\nSuccessfully saved translation bundle.[end]\n'
+            '[high]File:[end] [file]{output}[end]\n'
+            '[high]Languages:[end] {languages}\n'.format(
+                output=output,
+                languages=', '.join(bundled) or '-',
+            )
+        )
+        if failed:
+            Color.echo(
+                '[error]Could not download the translations of: '
+                '{languages}[end]\n'.format(languages=', '.join(failed))
+            )
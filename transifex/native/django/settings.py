@@ -14,3 +14,28 @@ TRANSIFEX_SYNC_INTERVAL = getattr(settings,
 TRANSIFEX_FETCH_ALL_LANGUAGES = getattr(settings,
                                         'TRANSIFEX_FETCH_ALL_LANGUAGES',
                                         False)
+TRANSIFEX_TEMPLATE_CACHE_SIZE = getattr(settings,
+                                        'TRANSIFEX_TEMPLATE_CACHE_SIZE',
+                                        None)
+TRANSIFEX_KEY_INDEX_SIZE = getattr(settings,
+                                   'TRANSIFEX_KEY_INDEX_SIZE',
+                                   None)
+TRANSIFEX_RENDER_CACHE_SIZE = getattr(settings,
+                                      'TRANSIFEX_RENDER_CACHE_SIZE',
+                                      None)
+TRANSIFEX_LAZY_LANGUAGES = getattr(settings,
+                                   'TRANSIFEX_LAZY_LANGUAGES',
+                                   False)
+TRANSIFEX_BUNDLE = getattr(settings, 'TRANSIFEX_BUNDLE', None)
+TRANSIFEX_WARMUP = getattr(settings, 'TRANSIFEX_WARMUP', False)
+TRANSIFEX_BLOCKING_STARTUP = getattr(settings,
+                                     'TRANSIFEX_BLOCKING_STARTUP',
+                                     True)
+TRANSIFEX_STARTUP_TIMEOUT = getattr(settings,
+                                    'TRANSIFEX_STARTUP_TIMEOUT',
+                                    None)
+TRANSIFEX_CDS_POOL_SIZE = getattr(settings, 'TRANSIFEX_CDS_POOL_SIZE', None)
+TRANSIFEX_CDS_TIMEOUT = getattr(settings, 'TRANSIFEX_CDS_TIMEOUT', None)
+TRANSIFEX_STREAM_TRANSLATIONS = getattr(settings,
+                                        'TRANSIFEX_STREAM_TRANSLATIONS',
+                                        False)
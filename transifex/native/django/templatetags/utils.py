@@ -1,42 +1,64 @@
-from parsimonious.nodes import NodeVisitor
-from pyseeyou.grammar import ICUMessageFormat
+import warnings
 
 
-class IcuKeysVisitor(NodeVisitor):
-    """ This visits ASTs produced by the ICUMessageFormat grammar. Its goal is
-        to extract all parameter names that it will need to compile. For this,
-        it implements the `visit_id` method which captures the 'id' rule of the
-        grammar, which applies to parameter names.
+def get_icu_keys(msg):
+    """ Get the names of the parameters that the 'msg' ICU template needs in
+        order to compile.
+
+        This walks the AST produced by the ICUMessageFormat grammar and
+        captures the 'id' rule of the grammar, which applies to parameter
+        names.
 
         Unfortunately, it also captures some other strings, like the names of
         the plural rules in plural statements. So, if what you want is the set
         of all parameter names the ICU template can accept, be aware that you
         will get a "slightly bigger superset" of that.
-    """
-
-    def __init__(self):
-        self.keys = set()
-
-    def generic_visit(self, node, visited_children):
-        return visited_children or node
-
-    def visit_id(self, node, *args, **kwargs):
-        self.keys.add(str(node.text))
-
-
-def get_icu_keys(msg):
-    """ Get the names of the parameters that the 'msg' ICU template needs in
-        order to compile.
 
         :param str msg: The ICU template to be parsed
         :return: A "slightly bigger superset" of the parameter names
         :rtype: set
     """
+    # Imported on first use, as building the grammar is slow
+    from pyseeyou.grammar import ICUMessageFormat
 
-    v = IcuKeysVisitor()
     try:
         ast = ICUMessageFormat.parse(msg)
-        v.visit(ast)
     except Exception:
         return set()
-    return v.keys
+
+    return {str(node.text) for node in _iter_id_nodes(ast)}
+
+
+def _iter_id_nodes(ast):
+    """Yield the nodes of the given ICU AST that match the 'id' rule."""
+    nodes = [ast]
+    while nodes:
+        node = nodes.pop()
+        if node.expr_name == 'id':
+            yield node
+        nodes.extend(node.children)
+
+
+class IcuKeysVisitor(object):
+    """ Collects the parameter names of the ASTs produced by the
+        ICUMessageFormat grammar into `keys`, as `get_icu_keys()` does.
+
+        Deprecated: kept for backwards compatibility, use `get_icu_keys()`
+        instead. It is no longer a parsimonious NodeVisitor, so that
+        importing this module does not import parsimonious.
+    """
+
+    def __init__(self):
+        warnings.warn(
+            'IcuKeysVisitor is deprecated, use get_icu_keys() instead',
+            DeprecationWarning, stacklevel=2,
+        )
+        self.keys = set()
+
+    def visit(self, node):
+        for id_node in _iter_id_nodes(node):
+            self.visit_id(id_node)
+        return node
+
+    def visit_id(self, node, *args, **kwargs):
+        self.keys.add(str(node.text))
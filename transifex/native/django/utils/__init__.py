@@ -31,6 +31,27 @@ def translate(_string, _context=None, _escape=True, **params):
     )
 
 
+def translate_many(items, _escape=True):
+    """Translate multiple source strings to the current language at once.
+
+    A convenience wrapper of `TxNative.translate_many()` that uses the current
+    language of a Django app.
+
+    :param iterable items: (source_string, params, _context, _key) tuples;
+        `params`, `_context` and `_key` can be None
+    :param bool _escape: if True, the returned strings will be HTML-escaped,
+        otherwise they won't
+    :return: the final translations in the current language, in the order
+        of the given items
+    :rtype: list
+    """
+    is_source = get_language() == settings.LANGUAGE_CODE
+    locale = to_locale(get_language())  # e.g. from en-us to en_US
+    return tx.translate_many(
+        items, locale, is_source=is_source, escape=_escape,
+    )
+
+
 def lazy_translate(_string, _context=None, _escape=True, **params):
     """Lazily translate the given source string to the current language.
 
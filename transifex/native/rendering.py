@@ -1,16 +1,146 @@
 # -*- coding: utf-8 -*-
 import logging
+import re
 import sys
-import xml.sax.saxutils as saxutils
+import time
 from math import ceil
 
-from pyseeyou import format
 from transifex.common._compat import string_types, text_type
-from transifex.common.utils import import_to_python
+from transifex.common.utils import LRUCache, import_to_python
 
 logger = logging.getLogger('transifex.rendering')
 logger.addHandler(logging.StreamHandler(sys.stdout))
 
+# The default number of compiled ICU templates kept in memory
+TEMPLATE_CACHE_SIZE = 4096
+
+# Holds the compiled ICU templates, keyed by (template, language_code), so
+# that hot strings are parsed once per process instead of on every render
+compiled_templates = LRUCache(maxsize=TEMPLATE_CACHE_SIZE)
+
+# Errors about the same template are logged at most once per
+# ERROR_LOG_INTERVAL seconds; `logged_errors` holds the time each error was
+# last logged and the number of times it has been suppressed since
+ERROR_LOG_INTERVAL = 60
+logged_errors = LRUCache(maxsize=1024)
+
+# Matches the `{name}` placeholders of ICU templates, following the
+# `"{" _ id _ "}"` rule of the ICU grammar. Only ASCII whitespace and names
+# are matched, as the grammar rejects some of the characters that `\s` and
+# `\w` match, e.g. `\x1c` and `²`; templates with any other characters are
+# left to the full parser
+SIMPLE_PLACEHOLDER = re.compile(r'\{[ \t\r\n]*([A-Za-z0-9_]+)[ \t\r\n]*\}')
+
+# The CDS serves the translations of pluralized strings as
+# `{???, plural, ...}`, as the name of their variable is only known from the
+# source string they are rendered for, e.g. as `{cnt, plural, ...}`.
+# Templates that start with an argument, like these, are compiled under an
+# anonymous form, so that both forms share a single compiled template.
+LEADING_ARGUMENT = re.compile(r'\{[ \t\r\n]*([A-Za-z0-9_]+|\?\?\?),')
+ANONYMOUS_ARGUMENT = u'{???'
+# The name that the anonymous argument is parsed and rendered with
+ARGUMENT_NAME = u'tx_anonymous_argument'
+
+
+class SimpleTemplate(object):
+    """A compiled ICU template that only contains text and flat `{name}`
+    placeholders, without any plural, select or other formatting.
+
+    Such templates are rendered by a plain substitution routine that
+    produces the same output as the full ICU formatter.
+    """
+
+    __slots__ = ('texts', 'names')
+
+    def __init__(self, texts, names):
+        """Constructor.
+
+        :param list texts: the literal parts of the template; there is always
+            one more literal part than there are placeholders
+        :param list names: the names of the placeholders
+        """
+        self.texts = texts
+        self.names = names
+
+    @classmethod
+    def parse(cls, template):
+        """Return a SimpleTemplate for the given template, or None if the
+        template contains ICU constructs other than flat placeholders.
+
+        :param unicode template: the ICU template
+        :rtype: SimpleTemplate
+        """
+        parts = SIMPLE_PLACEHOLDER.split(template)
+        texts, names = parts[0::2], parts[1::2]
+        for text in texts:
+            if '{' in text or '}' in text:
+                return None
+        return cls(texts, names)
+
+    def format(self, params):
+        """Replace the placeholders with the given parameters.
+
+        :param dict params: the values of the placeholders
+        :return: the rendered string
+        :rtype: unicode
+        :raise KeyError: if the value of a placeholder is missing
+        """
+        texts = self.texts
+        result = [texts[0]]
+        for index, name in enumerate(self.names):
+            result.append(text_type(params[name]))
+            result.append(texts[index + 1])
+        return u''.join(result)
+
+
+def throttle_error(key):
+    """Return whether the error identified by the given key should be logged,
+    which happens at most once per ERROR_LOG_INTERVAL seconds.
+
+    :param tuple key: identifies the error, e.g. by template and language
+    :return: None if the error should not be logged, otherwise the number
+        of times it was suppressed since it was last logged
+    :rtype: int
+    """
+    now = time.time()
+    entry = logged_errors.get(key)
+    if entry is not None and now - entry[0] < ERROR_LOG_INTERVAL:
+        # Not synchronized, as an occasional miscount is harmless
+        entry[1] += 1
+        return None
+    logged_errors.set(key, [now, 0])
+    return entry[1] if entry is not None else 0
+
+
+class InvalidTemplate(object):
+    """The compiled form of a template that the ICU grammar cannot parse.
+
+    Keeps the parsing error, so that the template fails again without being
+    parsed again.
+    """
+
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def split_leading_argument(template):
+    """Return the anonymous form of the given template and the name of its
+    leading argument.
+
+    :param unicode template: the ICU template
+    :return: a (template, name) tuple; templates that do not start with an
+        argument are returned as they are, along with None
+    :rtype: tuple
+    """
+    match = LEADING_ARGUMENT.match(template)
+    if match is None:
+        return template, None
+    return (
+        ANONYMOUS_ARGUMENT + template[match.end() - 1:], match.group(1),
+    )
+
 
 def html_escape(item):
     """Escape certain HTML entities for security reasons.
@@ -23,17 +153,138 @@ def html_escape(item):
     if not isinstance(item, string_types):
         return item
 
-    html_escape_table = {
-        '"': "&quot;",
-        "'": "&#x27;"
-    }
-    return saxutils.escape(item, html_escape_table)
+    # Equivalent to `xml.sax.saxutils.escape()` with quotes added,
+    # without importing the XML machinery
+    return (
+        item.replace('&', '&amp;')
+        .replace('>', '&gt;')
+        .replace('<', '&lt;')
+        .replace('"', '&quot;')
+        .replace("'", '&#x27;')
+    )
 
 
 class StringRenderer(object):
     """Takes a translation string template and optional parameters
     and returns the final translation string."""
 
+    @classmethod
+    def compile(cls, template, language_code, evict=True):
+        """Return the compiled form of the given ICU template.
+
+        Templates that only contain flat `{name}` placeholders are compiled
+        to a SimpleTemplate, while all others are parsed to a syntax tree
+        by the ICU grammar. Compiled templates are kept in a bounded LRU
+        cache, so subsequent calls for the same template and language skip
+        classification and parsing altogether. Templates that cannot be
+        parsed are cached as well and fail with the original parsing error.
+
+        Templates that start with an argument are compiled in their
+        anonymous form (see `split_leading_argument()`), so e.g.
+        `{???, plural, ...}` and `{cnt, plural, ...}` are parsed once.
+
+        :param unicode template: the ICU string to compile
+        :param str language_code: the language code the template belongs to
+        :param bool evict: if False, the compiled template is only cached if
+            the cache has room for it, so that no other template is evicted
+        :return: the compiled template
+        :rtype: Union[SimpleTemplate, parsimonious.nodes.Node]
+        """
+        template, name = split_leading_argument(template)
+        key = (template, language_code)
+        compiled = compiled_templates.get(key)
+        if compiled is None:
+            compiled = SimpleTemplate.parse(template)
+            if compiled is None:
+                if name is not None:
+                    template = u'{' + ARGUMENT_NAME + template[4:]
+                # Imported on first use, as building the grammar is slow
+                from pyseeyou.grammar import ICUMessageFormat
+                try:
+                    compiled = ICUMessageFormat.parse(template)
+                except Exception as e:
+                    compiled = InvalidTemplate(e)
+            compiled_templates.set(key, compiled, evict=evict)
+        if isinstance(compiled, InvalidTemplate):
+            raise compiled.error.with_traceback(None)
+        return compiled
+
+    @classmethod
+    def validate(cls, template, language_code):
+        """Return whether the given ICU template can be compiled.
+
+        Templates are compiled with `compile()`, so that they are not parsed
+        again when rendered or warmed up, without evicting the templates
+        that are already cached.
+
+        :param unicode template: the ICU string to validate
+        :param str language_code: the language code the template belongs to
+        :rtype: bool
+        """
+        if '{' not in template and '}' not in template:
+            return True
+        try:
+            cls.compile(template, language_code, evict=False)
+        except Exception:
+            return False
+        return True
+
+    @classmethod
+    def format_template(cls, template, params, language_code):
+        """Render the given ICU template with the given parameters.
+
+        Plain strings without any placeholders are returned as they are and
+        simple placeholders are substituted directly; the ICU formatter is
+        only used for templates with plural, select or other constructs.
+
+        :param unicode template: the ICU string to render
+        :param dict params: the values of the placeholders
+        :param str language_code: the language code to use for plurals
+        :return: the rendered string
+        :rtype: unicode
+        """
+        if '{' not in template and '}' not in template:
+            return template
+        compiled = cls.compile(template, language_code)
+        if isinstance(compiled, SimpleTemplate):
+            return compiled.format(params)
+        name = split_leading_argument(template)[1]
+        if name == ANONYMOUS_ARGUMENT[1:]:
+            # `???` is not a name in the ICU grammar, so such templates can
+            # only be compiled, e.g. when warming up, but not rendered
+            raise ValueError(
+                'Template `{}` has no argument name'.format(template)
+            )
+        if name is not None and name in params:
+            params = dict(params)
+            params[ARGUMENT_NAME] = params[name]
+        from pyseeyou import format_tree
+        return format_tree(compiled, params, language_code)
+
+    @classmethod
+    def invalidate(cls, language_codes=None):
+        """Remove compiled templates from the cache.
+
+        :param list language_codes: an optional list of language codes
+            whose templates should be removed; if omitted, all compiled
+            templates are removed
+        """
+        if language_codes is None:
+            compiled_templates.clear()
+        else:
+            language_codes = set(language_codes)
+            compiled_templates.discard(lambda key: key[1] in language_codes)
+
+    @classmethod
+    def cache_info(cls):
+        """Return statistics about the compiled template cache.
+
+        :return: a dictionary with the `hits`, `misses`, `maxsize` and
+            `currsize` of the cache
+        :rtype: dict
+        """
+        return compiled_templates.info()
+
     @classmethod
     def render(
         cls, source_string, string_to_render, language_code, escape,
@@ -47,6 +298,9 @@ class StringRenderer(object):
         If the given `string_to_render` is None, it returns a rendered
         string based on the given `missing_policy`.
 
+        Errors are logged at most once per ERROR_LOG_INTERVAL seconds for
+        each string and language.
+
         :param unicode source_string: the full ICU string in the source
             language
         :param unicode string_to_render: the full ICU string to render as a
@@ -77,21 +331,35 @@ class StringRenderer(object):
                 if escape:
                     source_string = html_escape(source_string)
                 return missing_policy.get(
-                    format(source_string, params, language_code)
+                    cls.format_template(source_string, params, language_code)
                 )
 
             if escape:
                 string_to_render = html_escape(string_to_render)
 
-            rendered = format(string_to_render, params, language_code)
+            rendered = cls.format_template(
+                string_to_render, params, language_code,
+            )
             return rendered
         except Exception as e:
-            logger.error(
-                "RenderingError: Could not render string `%s` in language `%s` "
-                "with parameters `%s` (Error: %s, Source String: %s)",
-                string_to_render, language_code, str(params),
-                str(e), source_string
+            suppressed = throttle_error(
+                ('render', string_to_render, language_code),
             )
+            if suppressed == 0:
+                logger.error(
+                    "RenderingError: Could not render string `%s` in language "
+                    "`%s` with parameters `%s` (Error: %s, Source String: %s)",
+                    string_to_render, language_code, str(params),
+                    str(e), source_string
+                )
+            elif suppressed is not None:
+                logger.error(
+                    "RenderingError: Could not render string `%s` in language "
+                    "`%s` with parameters `%s` (Error: %s, Source String: %s, "
+                    "%d similar errors suppressed)",
+                    string_to_render, language_code, str(params),
+                    str(e), source_string, suppressed
+                )
             raise e
 
 
@@ -277,12 +545,13 @@ class SourceStringErrorPolicy(AbstractErrorPolicy):
                 params=params,
             )
         except Exception as e:
-            logger.error(
-                'ErrorPolicyError: Could not render string `{string}` '
-                'with parameters `{parameters}`'.format(
-                    string=source_string, parameters=str(params)
+            if throttle_error(('error_policy', source_string)) is not None:
+                logger.error(
+                    'ErrorPolicyError: Could not render string `{string}` '
+                    'with parameters `{parameters}`'.format(
+                        string=source_string, parameters=str(params)
+                    )
                 )
-            )
 
         # if all fails, return the default text
         return self.default_text
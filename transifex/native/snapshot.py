@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""A compact, read-only file format for the translation table of a language.
+
+A snapshot file consists of:
+- a header, holding a magic number, the number of entries and the number
+  of slots of the hash table
+- an open addressing hash table, where each slot holds the hash of a key
+  and the offsets and lengths of the key and its translation string
+- the UTF-8 encoded keys and strings
+
+Snapshots are written once and loaded with mmap, so opening one is instant
+regardless of its size and its pages are shared by all processes that
+load the same file.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+
+MAGIC = b'TXS1'
+HEADER = struct.Struct('<4sII')
+SLOT = struct.Struct('<IIIII')
+
+# The offset of the key of empty slots
+EMPTY = 0xFFFFFFFF
+
+# The minimum number of slots of the hash table
+MIN_SLOTS = 8
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is malformed."""
+    pass
+
+
+def hash_key(key):
+    """Return the hash of the given UTF-8 encoded key.
+
+    :param bytes key: the encoded key
+    :rtype: int
+    """
+    return zlib.crc32(key) & 0xFFFFFFFF
+
+
+def write_snapshot(path, table):
+    """Write the given translation table to a snapshot file.
+
+    The file is written to a temporary file next to `path` and then moved
+    in place, so readers never see a partially written snapshot.
+
+    :param str path: the path of the snapshot file
+    :param dict table: a {key: string} dictionary
+    :raise SnapshotError: if the table is too large for the format, whose
+        offsets are 32-bit
+    """
+    slot_count = MIN_SLOTS
+    while slot_count < len(table) * 2:
+        slot_count *= 2
+    mask = slot_count - 1
+
+    slots = [None] * slot_count
+    blob = []
+    offset = HEADER.size + SLOT.size * slot_count
+    for key, string in table.items():
+        key, string = key.encode('utf-8'), string.encode('utf-8')
+        key_hash = hash_key(key)
+        index = key_hash & mask
+        while slots[index] is not None:
+            index = (index + 1) & mask
+        slots[index] = (
+            key_hash, offset, len(key), offset + len(key), len(string),
+        )
+        blob.extend((key, string))
+        offset += len(key) + len(string)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            try:
+                f.write(HEADER.pack(MAGIC, len(table), slot_count))
+                for slot in slots:
+                    f.write(SLOT.pack(*(slot or (0, EMPTY, 0, 0, 0))))
+            except struct.error as e:
+                raise SnapshotError(
+                    'Translations too large for a snapshot: {}'.format(e)
+                )
+            f.write(b''.join(blob))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class Snapshot(object):
+    """A memory-mapped snapshot file, supporting dictionary-like lookups."""
+
+    def __init__(self, path):
+        """Constructor.
+
+        :param str path: the path of the snapshot file
+        :raise SnapshotError: if the file is not a valid snapshot
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # Identifies the file that was loaded, so that it can be told
+            # apart from a newer file written at the same path
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError('Empty snapshot file: {}'.format(path))
+        try:
+            magic, self._count, self._slot_count = HEADER.unpack_from(
+                self._map,
+            )
+        except struct.error:
+            raise SnapshotError('Truncated snapshot file: {}'.format(path))
+        if magic != MAGIC or (
+            not self._slot_count or
+            self._slot_count & (self._slot_count - 1) or
+            self._count * 2 > self._slot_count or
+            len(self._map) < HEADER.size + SLOT.size * self._slot_count
+        ):
+            raise SnapshotError('Malformed snapshot file: {}'.format(path))
+        self._mask = self._slot_count - 1
+
+    @staticmethod
+    def get_signature(path):
+        """Return the signature of the file currently at the given path.
+
+        :param str path: the path of the snapshot file
+        :rtype: tuple
+        """
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def __len__(self):
+        return self._count
+
+    def get(self, key, default=None):
+        """Return the string stored for the given key.
+
+        :param unicode key: the key to look up
+        :param default: the value to return if the key is not found
+        :rtype: unicode
+        :raise SnapshotError: if the hash table has no empty slot, which
+            only happens if the file is corrupted
+        """
+        key = key.encode('utf-8')
+        key_hash = hash_key(key)
+        index = key_hash & self._mask
+        data = self._map
+        for _ in range(self._slot_count):
+            slot_hash, key_offset, key_length, string_offset, \
+                string_length = SLOT.unpack_from(
+                    data, HEADER.size + SLOT.size * index,
+                )
+            if key_offset == EMPTY:
+                return default
+            if slot_hash == key_hash and \
+                    data[key_offset:key_offset + key_length] == key:
+                return data[
+                    string_offset:string_offset + string_length
+                ].decode('utf-8')
+            index = (index + 1) & self._mask
+        raise SnapshotError('Corrupted snapshot file: {}'.format(self.path))
+
+    def items(self):
+        """Iterate over all (key, string) pairs of the snapshot."""
+        data = self._map
+        for index in range(self._slot_count):
+            _, key_offset, key_length, string_offset, string_length = \
+                SLOT.unpack_from(data, HEADER.size + SLOT.size * index)
+            if key_offset != EMPTY:
+                yield (
+                    data[key_offset:key_offset + key_length].decode('utf-8'),
+                    data[
+                        string_offset:string_offset + string_length
+                    ].decode('utf-8'),
+                )
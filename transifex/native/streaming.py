@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Incremental decoding of the translations returned by the CDS.
+
+The translations of a language are returned as a JSON document like:
+{
+    "data": {
+        "key1": {"string": "..."},
+        "key2": {"string": "..."},
+        ...
+    },
+    ...
+}
+
+`iter_translations()` decodes such a document as it is downloaded, one
+entry of `data` at a time, so that neither the whole response body nor the
+decoded document have to be held in memory.
+"""
+import codecs
+import json
+import re
+
+from transifex.common._compat import text_type
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+DECODER = json.JSONDecoder()
+
+
+class JSONStreamReader(object):
+    """Reads JSON values from a stream of UTF-8 encoded chunks."""
+
+    def __init__(self, chunks):
+        """Constructor.
+
+        :param iterable chunks: an iterable of bytes
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = u''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Append the next chunk to the buffer.
+
+        :return: False if the stream has ended, True otherwise
+        :rtype: bool
+        """
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            # Drop the part of the buffer that has been read
+            self._buffer = self._buffer[self._pos:] + \
+                self._decoder.decode(chunk)
+            self._pos = 0
+            return True
+        if not self._eof:
+            self._buffer += self._decoder.decode(b'', final=True)
+            self._eof = True
+        return False
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it.
+
+        :return: the next character or an empty string at the end of
+            the stream
+        :rtype: unicode
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def expect(self, characters):
+        """Consume the next non-whitespace character, which must be one of
+        the given ones.
+
+        :param unicode characters: the allowed characters
+        :return: the consumed character
+        :rtype: unicode
+        :raise ValueError: if the next character is not allowed
+        """
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError('Expected one of `{}` but found `{}`'.format(
+                characters, character or 'end of stream',
+            ))
+        self._pos += 1
+        return character
+
+    def read_value(self):
+        """Consume and return the next JSON value.
+
+        :raise ValueError: if the next value is not valid JSON
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # Numbers and literals may continue in the next chunk
+            if end == len(self._buffer) and \
+                    not isinstance(value, (dict, list, text_type)) and \
+                    self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def read_key(self):
+        """Consume the next key of an object, along with its colon.
+
+        :rtype: unicode
+        :raise ValueError: if the next value is not a key
+        """
+        key = self.read_value()
+        if not isinstance(key, text_type):
+            raise ValueError('Expected an object key, found `{}`'.format(key))
+        self.expect(u':')
+        return key
+
+
+def iter_translations(chunks):
+    """Decode the translations of a language from the given chunks.
+
+    Yields (key, string) tuples, where `string` is the translation string
+    of the entry or None if it has none. As entries are yielded before the
+    whole document is decoded, callers must discard them if an error is
+    raised.
+
+    :param iterable chunks: the response body, as an iterable of bytes
+    :raise ValueError: if the document is not valid JSON
+    :raise KeyError: if the document does not contain translations
+    """
+    reader = JSONStreamReader(chunks)
+    found = False
+    reader.expect(u'{')
+    if reader.peek() == u'}':
+        reader.expect(u'}')
+    else:
+        while True:
+            key = reader.read_key()
+            if key == u'data' and reader.peek() == u'{':
+                found = True
+                reader.expect(u'{')
+                if reader.peek() == u'}':
+                    reader.expect(u'}')
+                else:
+                    while True:
+                        entry_key = reader.read_key()
+                        entry = reader.read_value()
+                        string = entry.get(u'string') \
+                            if isinstance(entry, dict) else None
+                        yield entry_key, string
+                        if reader.expect(u',}') == u'}':
+                            break
+            else:
+                reader.read_value()
+            if reader.expect(u',}') == u'}':
+                break
+    if reader.peek():
+        raise ValueError('Unexpected content after the end of the document')
+    if not found:
+        raise KeyError('data')